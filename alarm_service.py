@@ -0,0 +1,107 @@
+# 경보음 재생 서비스
+# - 레벨별 소리(wav)는 start()에서 한 번만 읽어 메모리에 보관 (알림마다 디스크를 읽지 않음)
+# - 재생은 스레드 하나가 우선순위 큐에서 꺼내 순서대로 처리 (알림마다 스레드를 만들지 않음)
+# - 같은 카메라의 같은 레벨 알림은 camera_window 초 안에 한 번만,
+#   카메라가 달라도 같은 레벨은 global_window 초 안에 한 번만 재생 (나머지는 합쳐서 버림)
+# - 낮은 레벨 소리를 재생하는 중에 더 높은 레벨 알림이 오면 끊고 바로 재생
+import heapq
+import itertools
+import threading
+import time
+
+
+class AlarmService:
+    def __init__(self, sounds: dict, levels, camera_window: float = 10.0, global_window: float = 3.0,
+                 clock=time.monotonic):
+        # sounds: {레벨: wav 경로}, levels: 우선순위 순서 (앞쪽이 높음), clock: 창 계산용 시계 (테스트에서 교체)
+        self.paths = dict(sounds)
+        self.priority = {level: i for i, level in enumerate(levels)}
+        self.camera_window = camera_window
+        self.global_window = global_window
+        self.clock = clock
+        self.sounds = {}  # 레벨 -> simpleaudio.WaveObject (디코딩된 PCM)
+        self.played = 0
+        self.coalesced = 0  # 창 안에서 합쳐져 재생하지 않은 알림 수
+        self._queue = []  # (우선순위, 순번, 레벨, cam_id)
+        self._counter = itertools.count()
+        self._last_camera = {}  # (cam_id, 레벨) -> 마지막으로 받은 시각
+        self._last_level = {}  # 레벨 -> 마지막으로 받은 시각 (카메라 무관)
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        # 아직 불러오지 않은 레벨만 디코딩 (다시 start()해도 디스크를 읽지 않음)
+        missing = {level: path for level, path in self.paths.items() if level not in self.sounds}
+        if missing:
+            self._load(missing)
+        with self._cond:
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name="alarm", daemon=True)
+        self._thread.start()
+
+    def _load(self, paths: dict):
+        import simpleaudio as sa  # playsound 대신 simpleaudio 사용 (wav만 지원, audio.py로 변환)
+
+        loaded = {}  # 여러 레벨이 같은 파일을 쓰면 한 번만 디코딩
+        for level, path in paths.items():
+            try:
+                if path not in loaded:
+                    loaded[path] = sa.WaveObject.from_wave_file(path)
+                self.sounds[level] = loaded[path]
+            except Exception as e:
+                print(f"경보음 {path}을 불러올 수 없습니다: {e}")
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def trigger(self, cam_id, level: str) -> bool:
+        # 알림 등록, 창 안의 중복 알림이라 합쳐졌으면 False
+        now = self.clock()
+        with self._cond:
+            if (now - self._last_camera.get((cam_id, level), -float("inf")) < self.camera_window
+                    or now - self._last_level.get(level, -float("inf")) < self.global_window):
+                self.coalesced += 1
+                return False
+            self._last_camera[(cam_id, level)] = now
+            self._last_level[level] = now
+            # 같은 레벨이 이미 대기 중이면 소리는 한 번이면 충분
+            if any(queued_level == level for _, _, queued_level, _ in self._queue):
+                self.coalesced += 1
+                return False
+            heapq.heappush(self._queue, (self.priority.get(level, len(self.priority)), next(self._counter), level, cam_id))
+            self._cond.notify()
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                priority, _, level, cam_id = heapq.heappop(self._queue)
+            sound = self.sounds.get(level)
+            if sound is None:
+                continue
+            try:
+                play = sound.play()
+                self.played += 1
+                with self._cond:
+                    # 재생이 끝나거나, 더 높은 레벨 알림이 들어오거나, stop()될 때까지 대기
+                    while play.is_playing():
+                        if not self._running or (self._queue and self._queue[0][0] < priority):
+                            play.stop()
+                            break
+                        self._cond.wait(0.05)
+            except Exception as e:
+                print(f"알람 재생 중 오류 발생: {e}")
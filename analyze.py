@@ -0,0 +1,288 @@
+# 녹화 영상 일괄 분석 CLI (사건 발생 후 저장된 영상 전체를 검색할 때 사용)
+# - 긴 영상은 config.ANALYZE_CHUNK_SECONDS 길이의 구간으로 나눠 분석 프로세스 풀에 분배
+#   (프로세스마다 torch 스레드 1개 -> 코어 수만큼 프로세스를 늘리면 처리량이 거의 선형으로 증가)
+# - 구간 안에서는 프레임을 config.ANALYZE_BATCH_SIZE개씩 묶어서 사람/나이프 탐지 (pipeline.detect_batch)
+# - 탐지 결과와 칼 알림(K-of-M 확정)을 영상 내 시각과 함께 JSONL로 저장, --render면 박스를 그린 영상도 저장
+# - 구간 결과는 임시 파일에 다 쓴 뒤 이름을 바꾸므로, 중단 후 같은 명령으로 다시 실행하면 끝난 구간은 건너뜀
+# - 결과는 입력 영상들의 공통 폴더 기준 상대 경로로 저장 (camA/0001.mp4 -> analysis/camA/0001.jsonl)
+# 사용 예:
+#   python analyze.py web/ --output-dir analysis
+#   python analyze.py cam1.mp4 cam2.mp4 --render --processes 8 --stride 2
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+import config
+import pipeline
+from motion_gate import MotionGate
+from tracker import Tracker
+
+VIDEO_EXTS = (".mp4", ".avi", ".mkv", ".mov")
+
+
+class Chunk(NamedTuple):
+    video: str
+    index: int
+    start: int  # 시작 프레임 번호
+    end: int  # 끝 프레임 번호 (포함하지 않음, -1이면 영상 끝까지)
+    fps: float
+    part_path: str  # 구간 결과 JSONL (이 파일이 있으면 끝난 구간)
+    stride: int
+    motion_gate: bool
+    render: bool
+
+
+def find_videos(paths):
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in sorted(os.walk(path)):
+                videos += [os.path.join(directory, name) for name in sorted(names) if name.lower().endswith(VIDEO_EXTS)]
+        else:
+            videos.append(path)
+    return videos
+
+
+def output_base(video, input_root, output_dir) -> str:
+    # 결과 파일 경로 (확장자 제외): 입력 영상들의 공통 폴더 기준 상대 경로를 그대로 유지
+    # (camA/0001.mp4와 camB/0001.mp4처럼 이름이 같은 영상도 서로 덮어쓰지 않음)
+    relative = os.path.relpath(os.path.abspath(video), input_root)
+    return os.path.join(output_dir, os.path.splitext(relative)[0])
+
+
+def settings_key(video, args) -> str:
+    # 영상 파일이나 분석 설정이 바뀌면 이전 구간 결과를 재사용하지 않음
+    stat = os.stat(video)
+    settings = [os.path.abspath(video), stat.st_size, stat.st_mtime, args.chunk_seconds, args.stride,
+                not args.no_motion_gate, args.render, config.INFERENCE_BACKEND, config.MODEL_SPECS,
+                config.CASCADE_MODE, config.KNIFE_CONFIRM_K, config.KNIFE_CONFIRM_M]
+    return hashlib.sha1(json.dumps(settings, default=str).encode()).hexdigest()[:10]
+
+
+def split_video(video, args):
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        print(f"영상을 열 수 없습니다: {video}")
+        return []
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    stem = os.path.splitext(os.path.basename(video))[0]
+    part_dir = os.path.join(args.output_dir, ".parts", f"{stem}-{settings_key(video, args)}")
+    os.makedirs(part_dir, exist_ok=True)
+
+    # 프레임 수를 알 수 없는 영상은 통째로 하나의 구간
+    length = max(int(args.chunk_seconds * fps), 1)
+    bounds = [(start, min(start + length, total)) for start in range(0, total, length)] if total > 0 else [(0, -1)]
+    return [
+        Chunk(video, i, start, end, fps, os.path.join(part_dir, f"chunk_{i:05d}.jsonl"),
+              args.stride, not args.no_motion_gate, args.render)
+        for i, (start, end) in enumerate(bounds)
+    ]
+
+
+def _scaled(boxes, sx, sy):
+    # 320x240 기준 박스 -> 원본 해상도
+    boxes = np.array(boxes, dtype=np.float32).reshape(-1, 5)
+    boxes[:, [0, 2]] *= sx
+    boxes[:, [1, 3]] *= sy
+    return boxes
+
+
+def _box_list(boxes):
+    return [[round(float(v), 2) for v in box[:4]] + [round(float(box[4]), 3)] for box in boxes]
+
+
+def analyze_chunk(chunk: Chunk) -> dict:
+    # 분석 프로세스에서 실행 (모델은 pipeline._init_worker가 프로세스마다 한 번 로드)
+    models = pipeline._worker_models
+    started = time.perf_counter()
+    cap = cv2.VideoCapture(chunk.video)
+    # 구간 경계에서 칼 확정(K-of-M)이 끊기지 않도록 앞 구간 끝의 프레임 일부부터 읽고, 그 결과는 버림
+    first = max(chunk.start - config.KNIFE_CONFIRM_M * chunk.stride, 0)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+
+    trackers = {
+        name: Tracker(config.TRACK_HIGH_THRESH[name], config.TRACK_LOW_THRESH, config.TRACK_MATCH_IOU,
+                      config.TRACK_MAX_AGE, config.KNIFE_CONFIRM_K, config.KNIFE_CONFIRM_M)
+        for name in ("person", "knife")
+    }
+    gate = MotionGate(config.MOTION_THRESHOLD, config.MOTION_PIXEL_THRESHOLD, config.MOTION_KEYFRAME_INTERVAL,
+                      config.MOTION_GATE_SIZE) if chunk.motion_gate else None
+    video_tmp = os.path.splitext(chunk.part_path)[0] + ".tmp.mp4"
+    writer = None
+    records = []
+    pending = []  # 추론 결과를 기다리는 프레임 (프레임 순서대로 추적기를 갱신하기 위해 보관)
+    counts = {"frames": 0, "inferred": 0}
+
+    def flush():
+        nonlocal writer
+        inferred = [(small, full if config.CASCADE_MODE and config.CASCADE_FULL_RES else None)
+                    for _, full, small, infer in pending if infer]
+        results = iter(pipeline.detect_batch(models, inferred) if inferred else [])
+        for frame_idx, full, small, infer in pending:
+            sx, sy = full.shape[1] / 320, full.shape[0] / 240
+            if infer:
+                persons, knives, _ = next(results)
+                trackers["person"].update(persons)
+                trackers["knife"].update(knives)
+            else:
+                for tracker in trackers.values():
+                    tracker.predict()
+            confirmed = trackers["knife"].new_confirmed()
+            if frame_idx < chunk.start:
+                continue  # 앞 구간과 겹치는 부분
+
+            counts["frames"] += 1
+            seconds = frame_idx / chunk.fps
+            base = {"video": chunk.video, "frame": frame_idx, "time": round(seconds, 3),
+                    "timestamp": time.strftime("%H:%M:%S", time.gmtime(seconds)) + f".{int(seconds * 1000) % 1000:03d}"}
+            if infer:
+                counts["inferred"] += 1
+                # 검출 기록은 새 트랙을 만들 만큼 확실한 검출만 (낮은 점수 검출은 추적기 매칭에만 사용)
+                persons = persons[persons[:, 4] >= config.TRACK_HIGH_THRESH["person"]]
+                knives = knives[knives[:, 4] >= config.TRACK_HIGH_THRESH["knife"]]
+                if len(persons) or len(knives):
+                    records.append({**base, "type": "detection",
+                                    "persons": _box_list(_scaled(persons, sx, sy)),
+                                    "knives": _box_list(_scaled(knives, sx, sy))})
+            for track in confirmed:
+                records.append({**base, "type": "alert", "label": "knife", "track_id": track.track_id,
+                                "box": _box_list(_scaled([np.r_[track.kf.box(), track.score]], sx, sy))[0]})
+
+            if chunk.render:
+                if writer is None:
+                    writer = cv2.VideoWriter(video_tmp, cv2.VideoWriter_fourcc(*"mp4v"), chunk.fps,
+                                             (full.shape[1], full.shape[0]))
+                tracked_persons, _ = trackers["person"].boxes()
+                tracked_knives, _ = trackers["knife"].boxes()
+                writer.write(pipeline.annotate(full, _scaled(tracked_persons, sx, sy), _scaled(tracked_knives, sx, sy)))
+        pending.clear()
+
+    frame_idx = first
+    while chunk.end < 0 or frame_idx < chunk.end:
+        ret, full = cap.read()
+        if not ret:
+            break
+        small = cv2.resize(full, (320, 240))
+        # stride 프레임마다, 그리고 움직임이 있거나 keyframe일 때만 추론
+        due = (frame_idx - chunk.start) % chunk.stride == 0
+        infer = due if gate is None else (gate.check(small) if due else gate.tick())
+        pending.append((frame_idx, full, small, infer))
+        if sum(item[3] for item in pending) >= config.ANALYZE_BATCH_SIZE:
+            flush()
+        frame_idx += 1
+    flush()
+    cap.release()
+
+    if writer is not None:
+        writer.release()
+        os.replace(video_tmp, os.path.splitext(chunk.part_path)[0] + ".mp4")
+    # JSONL 파일은 마지막에 이름을 바꿔 저장 -> 이 파일이 있으면 끝난 구간
+    tmp = chunk.part_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp, chunk.part_path)
+    return {**counts, "seconds": time.perf_counter() - started,
+            "alerts": sum(record["type"] == "alert" for record in records)}
+
+
+def merge(chunks, base, render):
+    # 구간 결과를 영상 하나의 결과 파일(base.jsonl)로 합침 (모든 구간이 끝났을 때만)
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    output = base + ".jsonl"
+    with open(output + ".tmp", "w", encoding="utf-8") as out:
+        for chunk in chunks:
+            with open(chunk.part_path, encoding="utf-8") as f:
+                out.write(f.read())
+    os.replace(output + ".tmp", output)
+
+    if render:
+        rendered = base + "_annotated.mp4"
+        writer = None
+        for chunk in chunks:
+            part_video = os.path.splitext(chunk.part_path)[0] + ".mp4"
+            cap = cv2.VideoCapture(part_video)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if writer is None:
+                    writer = cv2.VideoWriter(rendered, cv2.VideoWriter_fourcc(*"mp4v"), chunk.fps,
+                                             (frame.shape[1], frame.shape[0]))
+                writer.write(frame)
+            cap.release()
+        if writer is not None:
+            writer.release()
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화 영상 일괄 사람/나이프 탐지")
+    parser.add_argument("inputs", nargs="+", help="영상 파일 또는 영상이 들어 있는 폴더")
+    parser.add_argument("--output-dir", default=config.ANALYZE_OUTPUT_DIR)
+    parser.add_argument("--processes", type=int, default=config.ANALYZE_PROCESSES, help="0이면 CPU 코어 수 기준")
+    parser.add_argument("--threads", type=int, default=config.ANALYZE_THREADS, help="프로세스당 torch 스레드 수")
+    parser.add_argument("--chunk-seconds", type=float, default=config.ANALYZE_CHUNK_SECONDS)
+    parser.add_argument("--batch-size", type=int, default=config.ANALYZE_BATCH_SIZE)
+    parser.add_argument("--stride", type=int, default=1, help="N프레임마다 한 번 추론")
+    parser.add_argument("--no-motion-gate", action="store_true")
+    parser.add_argument("--backend", default=config.INFERENCE_BACKEND)
+    parser.add_argument("--render", action="store_true", help="박스를 그린 영상도 저장")
+    args = parser.parse_args()
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        parser.error("분석할 영상이 없습니다.")
+
+    # 실행 옵션을 config에 반영 (분석 프로세스에도 그대로 전달됨)
+    config.INFERENCE_BACKEND = args.backend
+    config.INFERENCE_THREADS = args.threads
+    config.ANALYZE_BATCH_SIZE = args.batch_size
+    processes = args.processes or max((os.cpu_count() or 1) // args.threads, 1)
+
+    chunks = {video: split_video(video, args) for video in videos}
+    todo = [chunk for video_chunks in chunks.values() for chunk in video_chunks if not os.path.exists(chunk.part_path)]
+    total = sum(len(video_chunks) for video_chunks in chunks.values())
+    print(f"영상 {len(videos)}개, 구간 {total}개 (남은 구간 {len(todo)}개), 프로세스 {processes}개")
+
+    started = time.perf_counter()
+    frames = alerts = 0
+    if todo:
+        pool = ProcessPoolExecutor(
+            min(processes, len(todo)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=pipeline._init_worker,
+            initargs=(config.MODEL_SPECS, {key: value for key, value in vars(config).items() if key.isupper()}),
+        )
+        with pool:
+            futures = {pool.submit(analyze_chunk, chunk): chunk for chunk in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                chunk = futures[future]
+                stats = future.result()
+                frames += stats["frames"]
+                alerts += stats["alerts"]
+                elapsed = time.perf_counter() - started
+                print(f"[{done}/{len(todo)}] {os.path.basename(chunk.video)} #{chunk.index}: "
+                      f"{stats['frames']}프레임 (추론 {stats['inferred']}), 알림 {stats['alerts']}개, "
+                      f"{stats['seconds']:.1f}초 | 전체 {frames / elapsed:.1f} FPS")
+
+    input_root = os.path.commonpath([os.path.dirname(os.path.abspath(video)) for video in videos])
+    for video, video_chunks in chunks.items():
+        if video_chunks:
+            print(f"{video} -> {merge(video_chunks, output_base(video, input_root, args.output_dir), args.render)}")
+    print(f"완료: {frames}프레임 분석, 새 알림 {alerts}개, {time.perf_counter() - started:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
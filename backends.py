@@ -0,0 +1,52 @@
+# 추론 백엔드 선택 (PyTorch / ONNX Runtime / OpenVINO)
+# ultralytics YOLO는 .onnx 파일과 OpenVINO 폴더를 그대로 불러올 수 있으므로
+# 백엔드에 맞는 변환 파일 경로만 골라주면 capture_frames 쪽 코드는 그대로 동작한다.
+# 변환 파일은 model/export_backend.py로 만든다.
+import json
+import os
+
+BACKENDS = ("pytorch", "onnx", "onnx-int8", "openvino-int8")
+# INT8 모델은 parity 검사(정확도/속도 비교)를 통과해야만 사용
+QUANTIZED_BACKENDS = ("onnx-int8", "openvino-int8")
+# INT8 대상이 아닌 모델이 대신 쓰는 FP32 백엔드
+FP32_BACKENDS = {"onnx-int8": "onnx", "openvino-int8": "pytorch"}
+
+
+def exported_path(weights: str, backend: str) -> str:
+    stem, _ = os.path.splitext(weights)
+    if backend == "pytorch":
+        return weights
+    if backend == "onnx":
+        return f"{stem}.onnx"
+    if backend == "onnx-int8":
+        return f"{stem}_int8.onnx"
+    if backend == "openvino-int8":
+        return f"{stem}_int8_openvino_model"
+    raise ValueError(f"알 수 없는 백엔드: {backend} (가능한 값: {', '.join(BACKENDS)})")
+
+
+def model_backend(name: str, backend: str, quantized_models=()) -> str:
+    # INT8 보정/parity 검사는 ver1.1 나이프 데이터로 하므로 quantized_models(config.INT8_MODELS)에 있는 모델만 INT8,
+    # 나머지(COCO 사람 모델 등)는 같은 계열의 FP32 파일을 사용
+    if backend in QUANTIZED_BACKENDS and name not in quantized_models:
+        return FP32_BACKENDS[backend]
+    return backend
+
+
+def parity_report_path(path: str) -> str:
+    return path.rstrip("/\\") + ".parity.json"
+
+
+def resolve_weights(weights: str, backend: str) -> str:
+    path = exported_path(weights, backend)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{backend} 모델이 없습니다: {path} (model/export_backend.py export 로 생성)")
+
+    if backend in QUANTIZED_BACKENDS:
+        report = parity_report_path(path)
+        if not os.path.exists(report):
+            raise RuntimeError(f"{path} 는 parity 검사를 하지 않았습니다 (model/export_backend.py parity 실행)")
+        with open(report, encoding="utf-8") as f:
+            if not json.load(f).get("passed"):
+                raise RuntimeError(f"{path} 는 parity 검사를 통과하지 못했습니다: {report}")
+    return path
@@ -0,0 +1,226 @@
+# 녹화 영상으로 실시간 파이프라인 성능을 측정하는 벤치마크 (웹캠/ngrok 없이 실행)
+# 영상 파일을 N개의 가상 카메라로 일정 FPS로 재생하면서 capture_frames와 같은 경로
+# (캡처 -> 움직임 게이트 -> 추론 -> 추적 -> 박스 그리기/인코딩)를 그대로 통과시키고,
+# 단계별 지연 시간, 캡처~전송 지연, 버려진 프레임, 최대 메모리를 JSON으로 저장한다.
+# 사용 예:
+#   python benchmark.py --cameras 4 --fps 15 --duration 60 --output bench.json
+#   python benchmark.py clip1.mp4 clip2.mp4 --cameras 2 --processes 2
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import threading
+import time
+from collections import defaultdict
+from queue import Empty
+
+import numpy as np
+
+import config
+from frame_slot import FrameSlot
+from pipeline import AnnotateEncoder, CameraWorker, make_scheduler
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CLIPS = sorted(glob.glob(os.path.join(ROOT, "web", "6_*_outputs.mp4")))
+
+
+def percentiles(values) -> dict:
+    if not values:
+        return {"count": 0}
+    ms = np.asarray(values) * 1000
+    return {
+        "count": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+class StageRecorder:
+    # pipeline의 observe 콜백으로 단계별 소요 시간을 모음
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def observe(self, cam_id, stage, seconds):
+        with self._lock:
+            self._samples[stage].append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {stage: percentiles(values) for stage, values in self._samples.items()}
+
+
+def rss_bytes(pid) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class RssSampler:
+    # 현재 프로세스 + 추론 프로세스들의 RSS 합계 최댓값
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            total = rss_bytes(os.getpid()) + sum(rss_bytes(p.pid) for p in multiprocessing.active_children())
+            self.peak = max(self.peak, total)
+            self._stop.wait(self.interval)
+
+
+def consume(cam_id, slot: FrameSlot, recorder: StageRecorder, sent: dict, stop: threading.Event):
+    # 웹소켓 전송 대신 프레임을 꺼내면서 캡처~전송 지연을 기록
+    while not stop.is_set():
+        try:
+            frame = slot.get(timeout=0.5)
+        except Empty:
+            continue
+        recorder.observe(cam_id, "end_to_end", time.time() - frame.captured_at)
+        sent[cam_id] += 1
+        sent["bytes"] += len(frame.jpeg) + len(frame.overlay or "")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화 영상으로 파이프라인 처리량/지연 측정")
+    parser.add_argument("files", nargs="*", default=DEFAULT_CLIPS, help="재생할 영상 파일 (기본: web/6_*_outputs.mp4)")
+    parser.add_argument("--cameras", type=int, default=len(DEFAULT_CLIPS) or 1, help="가상 카메라 수")
+    parser.add_argument("--fps", type=float, default=15, help="카메라당 원본 FPS")
+    parser.add_argument("--duration", type=float, default=30, help="측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=10, help="측정 전 모델 로드/예열 시간(초)")
+    parser.add_argument("--processes", type=int, default=config.INFERENCE_PROCESSES)
+    parser.add_argument("--encode-threads", type=int, default=config.ENCODE_THREADS)
+    parser.add_argument("--backend", default=config.INFERENCE_BACKEND)
+    parser.add_argument("--infer-interval", type=int, default=config.INFER_INTERVAL)
+    parser.add_argument("--no-motion-gate", action="store_true")
+    parser.add_argument("--overlay", action="store_true", default=config.OVERLAY_MODE,
+                        help="박스를 그리지 않고 JSON으로 전달 (config.OVERLAY_MODE)")
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    if not args.files:
+        parser.error("재생할 영상 파일이 없습니다.")
+
+    # 실행 옵션을 config에 반영 (추론 프로세스에도 그대로 전달됨)
+    config.INFERENCE_PROCESSES = args.processes
+    config.ENCODE_THREADS = args.encode_threads
+    config.INFERENCE_BACKEND = args.backend
+    config.INFER_INTERVAL = args.infer_interval
+    config.MOTION_GATE = not args.no_motion_gate
+
+    recorder = StageRecorder()
+    rss = RssSampler()
+    rss.start()
+
+    scheduler = make_scheduler(config.MODEL_SPECS)
+    scheduler.start()
+    encoder = AnnotateEncoder(config.ENCODE_THREADS, config.JPEG_QUALITY, observe=recorder.observe,
+                              overlay=args.overlay)
+
+    slots = {cam_id: FrameSlot(config.FRAME_SLOT_DEPTH) for cam_id in range(args.cameras)}
+    workers = {
+        cam_id: CameraWorker(cam_id, args.files[cam_id % len(args.files)], slot, scheduler, encoder,
+                             observe=recorder.observe, fps=args.fps, loop=True)
+        for cam_id, slot in slots.items()
+    }
+    sent = defaultdict(int)
+    stop = threading.Event()
+    threads = [threading.Thread(target=worker.run, daemon=True) for worker in workers.values()]
+    threads += [threading.Thread(target=consume, args=(cam_id, slot, recorder, sent, stop), daemon=True)
+                for cam_id, slot in slots.items()]
+    for thread in threads:
+        thread.start()
+
+    # 예열 구간의 기록은 버림
+    print(f"예열 {args.warmup:.0f}초...")
+    time.sleep(args.warmup)
+    recorder.reset()
+    base = {
+        cam_id: (sent[cam_id], worker.frames, worker.grabber.slot.dropped, slots[cam_id].dropped, worker.gate.skipped)
+        for cam_id, worker in workers.items()
+    }
+    base_bytes, base_encoder_dropped = sent["bytes"], encoder.dropped
+
+    print(f"측정 {args.duration:.0f}초 (카메라 {args.cameras}대, {args.fps} FPS)...")
+    start = time.monotonic()
+    time.sleep(args.duration)
+    elapsed = time.monotonic() - start
+
+    per_camera = {}
+    for cam_id, worker in workers.items():
+        sent0, frames0, grab_dropped0, slot_dropped0, skipped0 = base[cam_id]
+        per_camera[cam_id] = {
+            "source": args.files[cam_id % len(args.files)],
+            "sent_fps": (sent[cam_id] - sent0) / elapsed,
+            "processed_fps": (worker.frames - frames0) / elapsed,
+            "dropped_capture": worker.grabber.slot.dropped - grab_dropped0,  # 처리 속도가 못 따라가 버린 프레임
+            "dropped_send": slots[cam_id].dropped - slot_dropped0,  # 전송 전에 덮어쓴 프레임
+            "motion_skipped": worker.gate.skipped - skipped0,
+        }
+    stages = recorder.summary()
+    end_to_end = stages.pop("end_to_end", {"count": 0})
+
+    stop.set()
+    for worker in workers.values():
+        worker.stop()
+    scheduler.stop()
+    rss.stop()
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": {
+            "cameras": args.cameras,
+            "source_fps": args.fps,
+            "duration": elapsed,
+            "files": args.files,
+            "backend": config.INFERENCE_BACKEND,
+            "inference_processes": config.INFERENCE_PROCESSES,
+            "inference_threads": config.INFERENCE_THREADS,
+            "encode_threads": config.ENCODE_THREADS,
+            "batch_max_size": config.BATCH_MAX_SIZE,
+            "infer_interval": config.INFER_INTERVAL,
+            "motion_gate": config.MOTION_GATE,
+            "cascade": config.CASCADE_MODE,
+        },
+        "total_fps": sum(c["sent_fps"] for c in per_camera.values()),
+        "bytes_per_sec": (sent["bytes"] - base_bytes) / elapsed,
+        "dropped_frames": sum(c["dropped_capture"] + c["dropped_send"] for c in per_camera.values())
+                          + encoder.dropped - base_encoder_dropped,
+        "end_to_end": end_to_end,
+        "stages": stages,
+        "cameras": per_camera,
+        "peak_rss_mb": rss.peak / 2**20,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"전체 {report['total_fps']:.1f} FPS, 캡처~전송 p95 {end_to_end.get('p95_ms', 0):.0f} ms, "
+          f"버린 프레임 {report['dropped_frames']}, 최대 RSS {report['peak_rss_mb']:.0f} MB -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# 카메라 하나의 스트림을 여러 웹소켓 시청자에게 나눠주는 asyncio 브로드캐스터
+# 프레임은 카메라당 한 번만 JPEG로 인코딩하고, 같은 bytes를 모든 구독자에게 넘긴다.
+# 구독자마다 최신 항목만 보관하므로 느린 시청자는 프레임을 건너뛰고 다른 시청자를 막지 않는다.
+import asyncio
+from collections import deque
+from queue import Empty
+
+import cv2
+
+
+def encode_jpeg(frame, quality: int = 80):
+    ret, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return jpeg.tobytes() if ret else None
+
+
+class Subscriber:
+    def __init__(self, depth: int = 1):
+        self._items = deque(maxlen=depth)
+        self._event = asyncio.Event()
+        self.skipped = 0  # 전송 전에 덮어써진 항목 수
+        self.closed = False
+
+    def offer(self, data):
+        if len(self._items) == self._items.maxlen:
+            self.skipped += 1
+        self._items.append(data)
+        self._event.set()
+
+    def close(self):
+        self.closed = True
+        self._event.set()
+
+    async def get(self):
+        # 다음 항목, 스트림이 끝났으면(카메라 삭제) None
+        while not self._items:
+            if self.closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+        return self._items.popleft()
+
+
+class Broadcaster:
+    def __init__(self, source, encode=None, depth: int = 1):
+        # source: FrameSlot, encode: 항목 -> 전송할 데이터 (None이면 그대로 전달)
+        # depth: 구독자별로 보관할 최대 항목 수 (영상은 1, 알림은 여러 개)
+        self.source = source
+        self.encode = encode
+        self.depth = depth
+        self._subscribers = set()
+        self._wakeup = None
+        self._task = None
+        self._loop = None
+        self.closed = False
+        self.published = 0  # 인코딩해서 구독자에게 넘긴 항목 수
+
+    @property
+    def viewers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.depth)
+        if self.closed:
+            subscriber.close()
+            return subscriber
+        self._loop = asyncio.get_running_loop()
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = self._loop.create_task(self._pump())
+        return subscriber
+
+    def close(self):
+        # 스트림 종료 (카메라 삭제): 모든 구독자의 get()이 None을 반환, 다른 스레드에서 호출 가능
+        self.closed = True
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._close_subscribers)
+        except RuntimeError:
+            pass  # 이벤트 루프가 이미 종료됨
+
+    def _close_subscribers(self):
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+        if not self._subscribers and self._wakeup is not None:
+            self._wakeup.set()  # 구독자가 없으면 pump 종료
+
+    async def _pump(self):
+        loop = asyncio.get_running_loop()
+        wakeup = self._wakeup = asyncio.Event()
+
+        # 캡처 스레드가 put 하면 이벤트 루프를 깨움 (polling 없음)
+        def listener():
+            loop.call_soon_threadsafe(wakeup.set)
+
+        self.source.add_listener(listener)
+        try:
+            while self._subscribers:
+                try:
+                    item = self.source.get_nowait()
+                except Empty:
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+
+                data = item if self.encode is None else await loop.run_in_executor(None, self.encode, item)
+                if data is None:
+                    continue
+                self.published += 1
+                for subscriber in list(self._subscribers):
+                    subscriber.offer(data)
+        finally:
+            self.source.remove_listener(listener)
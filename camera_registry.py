@@ -0,0 +1,264 @@
+# 설정 파일 기반 카메라 목록 (카메라 수 제한 없음)
+# - config.CAMERA_CONFIG(JSON)에서 카메라를 불러오고, 파일이 없으면 config.DEFAULT_CAMERAS 사용
+# - source: 장치 번호(0, 1 ...), 영상 파일 경로, RTSP URL (테스트할 때는 영상 파일로 RTSP 대신 사용 가능)
+# - 카메라마다 프레임/이벤트 슬롯, 브로드캐스터, CameraWorker(끊기면 자동 재연결)를 만든다
+# - 실행 중 추가/삭제: POST /cameras, DELETE /cameras/{id} (변경 내용은 설정 파일에 저장)
+# - 대시보드는 GET /cameras 목록으로 카메라 화면 격자를 만든다
+# - GET /cameras/{id}/snapshot: 공유 메모리 링에 마지막으로 추론한 원본 프레임 (추론 프로세스를 쓸 때만)
+# - 영상 모드면 카메라마다 H.264 조각 인코더도 함께 추가/삭제 (video_segmenter.py)
+import json
+import os
+import threading
+from typing import NamedTuple
+
+import cv2
+from fastapi import APIRouter, Body, HTTPException, Response
+
+import config
+from broadcaster import Broadcaster
+from frame_slot import FrameSlot
+from pipeline import CameraWorker
+
+
+def parse_source(value):
+    # "0" 같은 숫자는 장치 번호, 나머지는 파일 경로/URL
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+class CameraConfig(NamedTuple):
+    id: int
+    source: object  # 장치 번호, 영상 파일 경로 또는 RTSP URL
+    location: str = ""
+    resolution: tuple = (320, 240)  # 추론/전송 해상도
+    fps: float = None  # 처리 FPS 상한 (None이면 제한 없음)
+    person_conf: float = None  # 카메라별 추가 임계값 (None이면 MODEL_SPECS의 conf만 적용)
+    knife_conf: float = None
+    motion_threshold: float = None  # None이면 config.MOTION_THRESHOLD
+    priority: int = 0  # 부하가 높을 때 높은 카메라일수록 품질을 늦게 내림 (위험 장소)
+    latency_target: float = None  # 목표 지연(초), None이면 config.LOAD_TARGET_LATENCY
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CameraConfig":
+        unknown = set(data) - set(cls._fields)
+        if unknown:
+            raise ValueError(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+        if "id" not in data or "source" not in data:
+            raise ValueError("id와 source는 필수입니다.")
+        camera = cls(**{**data, "id": int(data["id"]), "source": parse_source(data["source"])})
+        if len(camera.resolution) != 2:
+            raise ValueError("resolution은 [너비, 높이] 형식이어야 합니다.")
+        return camera._replace(resolution=tuple(int(v) for v in camera.resolution))
+
+    def to_dict(self) -> dict:
+        return {**self._asdict(), "resolution": list(self.resolution)}
+
+    @property
+    def is_file(self) -> bool:
+        return isinstance(self.source, str) and os.path.exists(self.source)
+
+
+def load_cameras(path: str):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    else:
+        entries = config.DEFAULT_CAMERAS
+    return [CameraConfig.from_dict(entry) for entry in entries]
+
+
+def save_cameras(path: str, cameras):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump([camera.to_dict() for camera in cameras], f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def file_fps(path: str) -> float:
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return fps or 30.0
+
+
+class CameraRegistry:
+    def __init__(self, scheduler, encoder, path: str = None, on_alert=None, observe=None, controller=None,
+                 segmenter=None):
+        # on_alert(cam_id) / observe(cam_id, 단계, 시간) / controller(LoadController): 모든 CameraWorker에 그대로 전달
+        # segmenter: VideoSegmenter (영상 모드), encoder의 on_frame으로 프레임을 받음
+        self.scheduler = scheduler
+        self.encoder = encoder
+        self.path = path
+        self.on_alert = on_alert
+        self.observe = observe
+        self.controller = controller
+        self.segmenter = segmenter
+        self.cameras = {}  # cam_id -> CameraConfig
+        self.frame_slots = {}  # 인코딩된 프레임 슬롯 (최신 프레임만 유지)
+        self.event_slots = {}  # 알림 이벤트 슬롯
+        self.video_broadcasters = {}
+        self.event_broadcasters = {}
+        self.workers = {}
+        self._threads = {}
+        self._started = False
+        self._lock = threading.Lock()
+        for camera in load_cameras(path) if path else []:
+            self._add(camera)
+
+    def __contains__(self, cam_id):
+        return cam_id in self.cameras
+
+    def location(self, cam_id) -> str:
+        camera = self.cameras.get(cam_id)
+        return camera.location if camera is not None and camera.location else str(cam_id)
+
+    def _add(self, camera: CameraConfig):
+        self.frame_slots[camera.id] = FrameSlot(config.FRAME_SLOT_DEPTH)
+        self.event_slots[camera.id] = FrameSlot(config.EVENT_SLOT_DEPTH)
+        self.video_broadcasters[camera.id] = Broadcaster(self.frame_slots[camera.id])
+        self.event_broadcasters[camera.id] = Broadcaster(self.event_slots[camera.id], depth=config.EVENT_SLOT_DEPTH)
+        if self.segmenter is not None:
+            self.segmenter.add(camera.id)
+        self.cameras[camera.id] = camera
+
+    def _start_worker(self, camera: CameraConfig):
+        min_conf = {name: conf for name, conf in (("person", camera.person_conf), ("knife", camera.knife_conf))
+                    if conf is not None}
+        # 영상 파일은 실제 카메라처럼 원래 속도로 재생
+        worker = CameraWorker(camera.id, camera.source, self.frame_slots[camera.id], self.scheduler, self.encoder,
+                              on_alert=self.on_alert, observe=self.observe,
+                              fps=file_fps(camera.source) if camera.is_file else None,
+                              resolution=camera.resolution, max_fps=camera.fps, min_conf=min_conf,
+                              motion_threshold=camera.motion_threshold, reconnect=True, controller=self.controller)
+        if self.controller is not None:
+            self.controller.register(camera.id, camera.priority, camera.latency_target)
+        thread = threading.Thread(target=worker.run, name=f"capture-{camera.id}", daemon=True)
+        self.workers[camera.id] = worker
+        self._threads[camera.id] = thread
+        thread.start()
+
+    def start(self):
+        with self._lock:
+            self._started = True
+            for camera in self.cameras.values():
+                self._start_worker(camera)
+
+    def stop(self, timeout: float = 5.0):
+        # 모든 캡처 스레드 종료 (스레드가 끝나면서 카메라와 공유 메모리 링을 닫음)
+        with self._lock:
+            self._started = False
+            workers, threads = list(self.workers.values()), list(self._threads.values())
+            self.workers.clear()  # metrics 수집기가 같은 dict를 참조하므로 새로 만들지 않음
+            self._threads.clear()
+        for worker in workers:
+            worker.stop()
+        for thread in threads:
+            thread.join(timeout)
+
+    def add(self, camera: CameraConfig):
+        with self._lock:
+            if camera.id in self.cameras:
+                raise KeyError(camera.id)
+            self._add(camera)
+            if self._started:
+                self._start_worker(camera)
+            self._save()
+
+    def remove(self, cam_id, timeout: float = 5.0):
+        with self._lock:
+            if cam_id not in self.cameras:
+                raise KeyError(cam_id)
+            worker = self.workers.pop(cam_id, None)
+            if worker is not None:
+                worker.stop()  # 캡처 스레드는 다음 프레임에서 스스로 종료
+            thread = self._threads.pop(cam_id, None)
+            if self.controller is not None:
+                self.controller.unregister(cam_id)
+            if self.segmenter is not None:
+                self.segmenter.remove(cam_id)
+            del self.cameras[cam_id]
+            for table in (self.frame_slots, self.event_slots):
+                table.pop(cam_id, None)
+            # 이 카메라를 보고 있던 웹소켓은 스트림 끝을 받고 종료
+            for table in (self.video_broadcasters, self.event_broadcasters):
+                broadcaster = table.pop(cam_id, None)
+                if broadcaster is not None:
+                    broadcaster.close()
+            self._save()
+        if thread is not None:
+            thread.join(timeout)  # 다른 카메라 추가/삭제를 막지 않도록 잠금 밖에서 대기
+
+    def _save(self):
+        if self.path:
+            save_cameras(self.path, self.cameras.values())
+
+    def snapshot(self, cam_id):
+        # 링의 최신 슬롯을 복사 없이 JPEG로 인코딩, 인코딩 도중 덮어써졌으면 다시 읽음
+        worker = self.workers.get(cam_id)
+        ring = worker.ring if worker is not None else None
+        if ring is None:
+            return None
+        with ring.reading():  # 인코딩하는 동안 캡처 스레드가 링을 닫지 않도록
+            for _ in range(3):
+                if ring.closed:
+                    return None  # 재연결/삭제로 링이 닫힘
+                view = ring.latest()
+                if view is None:
+                    return None
+                ok, jpeg = cv2.imencode(".jpg", view.frame, [cv2.IMWRITE_JPEG_QUALITY, config.JPEG_QUALITY])
+                if ok and view.valid():
+                    return view, jpeg.tobytes()
+        return None
+
+    def status(self):
+        return [
+            {**camera.to_dict(),
+             "connected": cam_id in self.workers and self.workers[cam_id].connected,
+             "reconnects": self.workers[cam_id].reconnects if cam_id in self.workers else 0,
+             "capture_fps": round(self.workers[cam_id].fps, 1) if cam_id in self.workers else 0.0,
+             "load_level": self.controller.level(cam_id) if self.controller is not None else 0}
+            for cam_id, camera in sorted(self.cameras.items())
+        ]
+
+
+def make_router(registry: CameraRegistry) -> APIRouter:
+    router = APIRouter()
+
+    @router.get("/cameras")
+    async def list_cameras():
+        return registry.status()
+
+    @router.post("/cameras", status_code=201)
+    def add_camera(entry: dict = Body(...)):
+        try:
+            camera = CameraConfig.from_dict(entry)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            registry.add(camera)
+        except KeyError:
+            raise HTTPException(status_code=409, detail=f"카메라 {camera.id}이(가) 이미 있습니다.")
+        return camera.to_dict()
+
+    @router.get("/cameras/{cam_id}/snapshot")
+    def snapshot(cam_id: int):
+        result = registry.snapshot(cam_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"카메라 {cam_id}의 프레임이 없습니다.")
+        view, jpeg = result
+        return Response(jpeg, media_type="image/jpeg", headers={
+            "X-Frame-Seq": str(view.frame_seq),
+            "X-Timestamp": f"{view.timestamp:.3f}",
+            "X-Detections": json.dumps(view.boxes.round(1).tolist()),
+        })
+
+    @router.delete("/cameras/{cam_id}")
+    def remove_camera(cam_id: int):
+        try:
+            registry.remove(cam_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"카메라 {cam_id}이(가) 없습니다.")
+        return {"removed": cam_id}
+
+    return router
@@ -0,0 +1,57 @@
+# 사람이 탐지된 영역에서만 나이프 모델을 실행하는 2단계(cascade) 추론
+# 사람이 없으면 나이프 모델을 건너뛰고, 사람이 있으면 사람 박스 주변만 잘라서 추론한다.
+# 잘라낼 때는 축소 전 원본 프레임을 사용할 수 있어 작은 칼날도 덜 뭉개진다.
+# 여러 카메라 프레임은 잘라낸 영역을 모두 모아 나이프 모델을 한 번만 실행한다 (knife_crops -> pipeline.detect_batch -> merge_knives).
+import numpy as np
+
+from detections import boxes_array, empty_boxes
+
+
+def person_regions(persons, frame_shape, full_shape, pad=0.15):
+    # 축소 프레임 기준 사람 박스 -> 여백을 더한 원본 프레임 기준 정수 좌표
+    scale_x = full_shape[1] / frame_shape[1]
+    scale_y = full_shape[0] / frame_shape[0]
+
+    xyxy = persons[:, :4].copy()
+    w = xyxy[:, 2] - xyxy[:, 0]
+    h = xyxy[:, 3] - xyxy[:, 1]
+    xyxy[:, 0] -= w * pad
+    xyxy[:, 1] -= h * pad
+    xyxy[:, 2] += w * pad
+    xyxy[:, 3] += h * pad
+    xyxy *= [scale_x, scale_y, scale_x, scale_y]
+
+    xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, full_shape[1])
+    xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, full_shape[0])
+    regions = xyxy.round().astype(int)
+    # 너무 작은 영역은 제외
+    keep = (regions[:, 2] - regions[:, 0] > 1) & (regions[:, 3] - regions[:, 1] > 1)
+    return regions[keep]
+
+
+def knife_crops(persons, frame, full_frame=None, pad=0.15):
+    # 사람 박스 주변 영역과 잘라낸 이미지 list (사람이 없으면 빈 list)
+    if full_frame is None:
+        full_frame = frame
+    if len(persons) == 0:
+        return np.empty((0, 4), dtype=int), []
+    regions = person_regions(persons, frame.shape, full_frame.shape, pad)
+    return regions, [full_frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+
+
+def merge_knives(regions, results, frame, full_frame=None):
+    # 잘라낸 영역 좌표 -> 원본 좌표 -> 축소 프레임 좌표, 반환: (N, 5) [x1, y1, x2, y2, conf]
+    if len(regions) == 0:
+        return empty_boxes()
+    if full_frame is None:
+        full_frame = frame
+    scale_x = frame.shape[1] / full_frame.shape[1]
+    scale_y = frame.shape[0] / full_frame.shape[0]
+    knives = []
+    for (x1, y1, _, _), result in zip(regions, results):
+        boxes = boxes_array(result)
+        boxes[:, :4] += [x1, y1, x1, y1]
+        boxes[:, :4] *= [scale_x, scale_y, scale_x, scale_y]
+        knives.append(boxes)
+    return np.concatenate(knives).astype(np.float32)
+
@@ -0,0 +1,200 @@
+# 알림 전후 구간만 저장하는 클립 녹화기
+# - 카메라마다 이미 인코딩된 JPEG 프레임을 최근 pre_seconds초만큼 메모리에 보관 (다시 인코딩하지 않음)
+# - trigger() 하면 보관 중인 이전 구간 + 이후 post_seconds초 프레임을 모아 클립 하나로 만들고,
+#   기록 스레드가 디스크에 저장 (캡처/인코딩 스레드는 파일 I/O를 기다리지 않음)
+# - 클립이 녹화 중인 카메라에서 다시 알림이 오면 새 클립을 만들지 않고 이후 구간만 연장
+# - 파일 형식은 multipart/x-mixed-replace 본문 그대로 (.mjpg): 브라우저 <img>로 바로 재생 가능
+#   각 프레임 헤더의 X-Timestamp로 원래 속도에 맞춰 다시 보낸다 (replay())
+# - 영상 모드(video=True)면 JPEG 대신 스트리밍용 H.264 조각을 그대로 모아 .mp4로 저장 (init 세그먼트 + 조각들)
+import asyncio
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+
+BOUNDARY = b"frame"
+
+
+class _Clip:
+    def __init__(self, path, frames, end, init=None):
+        self.path = path
+        self.frames = frames  # [(캡처 시각, jpeg 또는 mp4 조각)]
+        self.end = end  # 이 시각까지의 프레임을 모으면 저장
+        self.init = init  # 영상 모드: 조각들의 init 세그먼트
+
+
+class ClipRecorder:
+    def __init__(self, clip_dir: str, pre_seconds: float = 10, post_seconds: float = 10, max_frames: int = 600,
+                 video: bool = False):
+        # max_frames: 카메라별 이전 구간 최대 프레임 수 (FPS가 높아도 메모리 상한 유지)
+        # video: push() 대신 push_segment()로 받은 H.264 조각을 .mp4로 저장
+        self.clip_dir = clip_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_frames = max_frames
+        self.video = video
+        self.saved = 0
+        self.discarded = 0  # 저장하지 못하고 버린 클립 수
+        self._rings = {}  # cam_id -> deque[(캡처 시각, jpeg 또는 조각)]
+        self._inits = {}  # cam_id -> 보관 중인 조각들의 init 세그먼트 (영상 모드)
+        self._active = {}  # cam_id -> 녹화 중인 _Clip
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(self.clip_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._loop, name="clip-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # 녹화 중인 클립은 지금까지 모은 프레임으로 저장
+        with self._lock:
+            clips, self._active = list(self._active.values()), {}
+        for clip in clips:
+            self._queue.put(clip)
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def push(self, frame):
+        # AnnotateEncoder의 on_encoded 콜백 (EncodedFrame), 인코딩 스레드에서 호출
+        self._append(frame.cam_id, frame.captured_at, frame.jpeg)
+
+    def push_segment(self, segment):
+        # VideoSegmenter의 on_segment 콜백 (VideoSegment), 같은 조각을 다시 인코딩하지 않고 보관
+        with self._lock:
+            if self._inits.get(segment.cam_id) is not segment.init:
+                # ffmpeg가 다시 시작되면 이전 조각은 새 init과 함께 재생할 수 없음
+                self._inits[segment.cam_id] = segment.init
+                self._rings.pop(segment.cam_id, None)
+                clip = self._active.get(segment.cam_id)
+                if clip is not None and clip.init is None:
+                    clip.init = segment.init  # 첫 조각이 나오기 전에 시작된 클립
+                elif clip is not None:
+                    del self._active[segment.cam_id]
+                    self._queue.put(clip)  # 이전 init의 조각까지만 저장
+        self._append(segment.cam_id, segment.started_at, segment.data)
+
+    def _append(self, cam_id, ts, data):
+        item = (ts, data)
+        with self._lock:
+            ring = self._rings.get(cam_id)
+            if ring is None:
+                ring = self._rings[cam_id] = deque(maxlen=self.max_frames)
+            ring.append(item)
+            while ring and ring[0][0] < ts - self.pre_seconds:
+                ring.popleft()
+
+            clip = self._active.get(cam_id)
+            if clip is not None:
+                clip.frames.append(item)
+                if ts >= clip.end:
+                    del self._active[cam_id]
+                    self._queue.put(clip)
+
+    def trigger(self, cam_id, ts: float = None) -> str:
+        # 알림 시점 기준 클립 파일 이름 반환 (파일은 이후 구간까지 모은 뒤 저장됨)
+        ts = ts or time.time()
+        with self._lock:
+            clip = self._active.get(cam_id)
+            if clip is not None:
+                clip.end = max(clip.end, ts + self.post_seconds)
+                return os.path.basename(clip.path)
+            name = time.strftime(f"cam{cam_id}-%Y%m%d-%H%M%S", time.localtime(ts)) + f"-{int(ts * 1000) % 1000:03d}"
+            name += ".mp4" if self.video else ".mjpg"
+            clip = _Clip(os.path.join(self.clip_dir, name), list(self._rings.get(cam_id, ())), ts + self.post_seconds,
+                         self._inits.get(cam_id))
+            self._active[cam_id] = clip
+            return name
+
+    def _loop(self):
+        while True:
+            try:
+                clip = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                self._expire()
+                continue
+            if clip is None:
+                break
+            self._write(clip)
+
+    def _expire(self):
+        # 카메라가 끊겨 프레임이 더 오지 않으면 모은 데까지 저장
+        now = time.time()
+        with self._lock:
+            expired = [cam_id for cam_id, clip in self._active.items() if now > clip.end + self.post_seconds]
+            clips = [self._active.pop(cam_id) for cam_id in expired]
+        for clip in clips:
+            self._write(clip)
+
+    def _write(self, clip: _Clip):
+        if self.video and clip.init is None:
+            # 영상 모드인데 첫 조각(init 세그먼트)이 나오기 전에 끝난 클립: 재생할 수 없으므로 버림
+            self.discarded += 1
+            return
+        tmp = clip.path + ".tmp"
+        with open(tmp, "wb") as f:
+            if clip.init is not None:
+                # fragmented MP4: init 세그먼트 뒤에 조각을 이어 붙이면 그대로 재생 가능한 파일
+                f.write(clip.init)
+                for _, data in clip.frames:
+                    f.write(data)
+            else:
+                for captured_at, jpeg in clip.frames:
+                    f.write(b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n")
+                    f.write(f"X-Timestamp: {captured_at!r}\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode())
+                    f.write(jpeg + b"\r\n")
+        os.replace(tmp, clip.path)
+        self.saved += 1
+
+
+def read_clip(path):
+    # .mjpg 클립 -> [(캡처 시각, jpeg)]
+    frames = []
+    with open(path, "rb") as f:
+        while f.readline().strip() == b"--" + BOUNDARY:
+            headers = {}
+            while True:
+                line = f.readline().strip()
+                if not line:
+                    break
+                key, value = line.decode().split(":", 1)
+                headers[key.lower()] = value.strip()
+            jpeg = f.read(int(headers["content-length"]))
+            f.readline()
+            frames.append((float(headers["x-timestamp"]), jpeg))
+    return frames
+
+
+async def replay(frames):
+    # 원래 프레임 간격에 맞춰 multipart 본문 전송
+    previous = None
+    for captured_at, jpeg in frames:
+        if previous is not None:
+            await asyncio.sleep(min(max(captured_at - previous, 0.0), 1.0))
+        previous = captured_at
+        yield b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\nContent-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n"
+        yield jpeg + b"\r\n"
+
+
+def make_router(recorder: ClipRecorder) -> APIRouter:
+    router = APIRouter()
+
+    @router.get("/clips/{name}")
+    async def play_clip(name: str):
+        path = os.path.join(recorder.clip_dir, os.path.basename(name))
+        if not os.path.exists(path):
+            # 아직 이후 구간을 녹화 중이거나 없는 클립
+            raise HTTPException(status_code=404, detail="클립이 아직 저장되지 않았습니다.")
+        if path.endswith(".mp4"):
+            return FileResponse(path, media_type="video/mp4")  # 브라우저 <video>가 직접 재생/탐색
+        frames = await asyncio.get_running_loop().run_in_executor(None, read_clip, path)
+        return StreamingResponse(replay(frames), media_type=f"multipart/x-mixed-replace; boundary={BOUNDARY.decode()}")
+
+    return router
@@ -0,0 +1,125 @@
+# 모니터링 시스템 공통 설정값
+
+# 검출 점수 임계값 (ByteTrack 방식 추적기가 점수로 검출을 나눔)
+# 모델은 TRACK_LOW_THRESH 이상을 모두 내보내고, 새 트랙/알림은 모델별 TRACK_HIGH_THRESH 이상 검출로만 생김
+TRACK_HIGH_THRESH = {"person": 0.6, "knife": 0.7}  # 이 점수 이상 검출만 새 트랙 생성 (나이프는 0.7정확도로 수정)
+TRACK_LOW_THRESH = 0.1  # 낮은 점수 검출은 기존 트랙 유지에만 사용
+
+# 모델 설정 {이름: (가중치 경로, 추론 옵션)}, 추론 프로세스마다 따로 로드
+MODEL_SPECS = {
+    "person": ("yolo11n.pt", {"conf": TRACK_LOW_THRESH, "verbose": False}),  # 사람 탐지 모델
+    "knife": ("customknife_v1.1.pt", {"conf": TRACK_LOW_THRESH, "verbose": False}),  # 나이프 탐지 모델
+}
+
+# 배치 추론 스케줄러
+BATCH_MAX_SIZE = 4  # 한 번에 모델에 넣을 최대 프레임 수
+BATCH_MAX_WAIT = 0.02  # 첫 프레임 도착 후 다른 카메라 프레임을 기다리는 최대 시간(초)
+
+# 사람 탐지 결과로 나이프 탐지 범위를 좁히는 cascade 모드
+CASCADE_MODE = True  # False면 기존처럼 전체 프레임에 나이프 모델 실행
+CASCADE_PAD = 0.15  # 사람 박스 주변 여백 (박스 크기 대비 비율)
+CASCADE_FULL_RES = True  # 축소 전 원본 해상도 프레임에서 사람 영역을 잘라냄
+
+# 카메라별 프레임/이벤트 슬롯 크기 (가득 차면 가장 오래된 항목을 덮어씀)
+FRAME_SLOT_DEPTH = 1  # 1이면 최신 프레임만 유지
+EVENT_SLOT_DEPTH = 16
+
+# 웹소켓 브로드캐스트
+JPEG_QUALITY = 80
+OVERLAY_MODE = False  # True면 서버는 박스를 그리지 않고 원본 JPEG + 박스 JSON을 보내 브라우저가 그림
+
+# 영상 스트리밍 모드 (video_segmenter.py, 로컬 ffmpeg 필요)
+# "video"면 카메라당 한 번 H.264 fMP4 조각으로 인코딩해 대시보드가 Media Source Extensions로 재생하고,
+# 알림 클립도 같은 조각으로 .mp4 저장 (JPEG 웹소켓도 계속 제공, 주소에 ?mode=jpeg / ?mode=video로 비교)
+STREAM_MODE = "jpeg"  # "jpeg" 또는 "video"
+VIDEO_FFMPEG = "ffmpeg"  # ffmpeg 실행 파일 경로
+VIDEO_SEGMENT_SECONDS = 1.0  # 조각 길이 (키프레임 간격), 중간에 접속한 시청자는 최대 이 시간 뒤부터 재생
+VIDEO_CRF = 28  # x264 화질 (낮을수록 고화질/고용량)
+VIDEO_PRESET = "veryfast"
+VIDEO_SEGMENT_DEPTH = 8  # 시청자별 보관 조각 수 (느린 시청자는 오래된 조각을 건너뜀)
+VIDEO_QUEUE_SIZE = 30  # ffmpeg 입력 대기 프레임 수 (넘으면 버림)
+
+# 단계별 파이프라인 크기 (캡처 스레드는 카메라당 하나)
+INFERENCE_PROCESSES = 4  # 추론 프로세스 수 (0이면 웹 서버 프로세스 안에서 추론)
+INFERENCE_THREADS = 4  # 추론 프로세스 하나가 사용하는 torch 스레드 수
+ENCODE_THREADS = 4  # 박스 그리기 + JPEG 인코딩 스레드 수
+SHM_TRANSPORT = True  # 추론 프로세스에 프레임을 pickle 대신 공유 메모리 링(shm_ring.py)으로 전달
+SHM_RING_SLOTS = 4  # 카메라별 링 슬롯 수 (원본 해상도 프레임 N장)
+
+# 움직임 감지 게이트 (움직임이 없으면 추론을 건너뛰고 직전 탐지 결과 재사용)
+MOTION_GATE = True
+MOTION_GATE_SIZE = (80, 60)  # 프레임 차이를 계산할 축소 해상도
+MOTION_PIXEL_THRESHOLD = 25  # 밝기 차이가 이 값보다 크면 변화한 픽셀
+MOTION_THRESHOLD = 0.01  # 변화한 픽셀 비율이 이 값 이상이면 움직임으로 판단
+MOTION_KEYFRAME_INTERVAL = 30  # 움직임이 없어도 N프레임마다 한 번은 추론
+MOTION_MASKS = {}  # 카메라별 검사 영역 {cam_id: [(x1, y1, x2, y2), ...]}, 0~1 비율 좌표
+
+# 객체 추적 (추론하지 않은 프레임은 추적기로 박스를 이어서 표시)
+INFER_INTERVAL = 3  # N프레임마다 한 번 추론 (1이면 매 프레임)
+TRACK_MATCH_IOU = 0.3
+TRACK_MAX_AGE = 10  # 이 횟수의 추론 동안 매칭되지 않은 트랙은 삭제
+KNIFE_CONFIRM_K = 3  # 최근 M번의 추론 중 K번 이상 잡힌 칼만 알림
+KNIFE_CONFIRM_M = 5
+
+# 추론 백엔드: "pytorch", "onnx", "onnx-int8", "openvino-int8"
+# (ONNX/OpenVINO 파일은 model/export_backend.py로 생성, INT8은 parity 검사 통과 필요)
+INFERENCE_BACKEND = "pytorch"
+# INT8 백엔드를 적용할 모델 (ver1.1 나이프 데이터로 보정/parity 검사한 모델만)
+# 나머지 모델은 FP32 사용 (onnx-int8 -> onnx, openvino-int8 -> pytorch)
+INT8_MODELS = ("knife",)
+MODEL_WARMUP_RUNS = 2  # 모델을 준비 완료로 표시하기 전 빈 프레임 추론 횟수 (로드/교체 시)
+
+# 성능 지표 / 프로파일러 (/metrics, /debug/stats, /debug/profile)
+PROFILER_ENABLED = False  # True일 때만 /debug/profile 사용 가능
+PROFILER_MAX_SECONDS = 60
+PROFILE_DIR = "profiles"  # collapsed stack 파일 저장 위치 (flamegraph.pl 입력 형식)
+
+# 녹화 영상 일괄 분석 (analyze.py)
+ANALYZE_PROCESSES = 0  # 분석 프로세스 수 (0이면 CPU 코어 수 / ANALYZE_THREADS)
+ANALYZE_THREADS = 1  # 분석 프로세스 하나가 사용하는 torch 스레드 수 (프로세스를 늘리는 쪽이 처리량이 선형에 가까움)
+ANALYZE_CHUNK_SECONDS = 60  # 긴 영상을 이 길이의 구간으로 나눠 프로세스들에 분배
+ANALYZE_BATCH_SIZE = 8  # 한 번에 추론하는 프레임 수
+ANALYZE_OUTPUT_DIR = "analysis"
+
+# 감지 이벤트 저장소 (일자별/장소별 다시보기)
+EVENT_DB_PATH = "events.db"  # SQLite (WAL 모드)
+EVENT_BATCH_SIZE = 64  # 한 트랜잭션에 저장하는 최대 이벤트 수
+EVENT_FLUSH_INTERVAL = 0.5  # 기록 스레드가 이벤트를 기다리는 최대 시간(초)
+
+# 알림 전후 클립 녹화 (인코딩된 JPEG를 메모리에 보관하다가 알림이 오면 저장)
+CLIP_DIR = "clips"
+CLIP_PRE_SECONDS = 10  # 알림 이전 구간 (카메라별 메모리에 보관)
+CLIP_POST_SECONDS = 10  # 알림 이후 구간
+CLIP_MAX_FRAMES = 600  # 카메라별 이전 구간 최대 프레임 수 (메모리 상한)
+
+# 카메라 목록 (camera_registry.py), 파일이 없으면 DEFAULT_CAMERAS 사용
+# 항목: id, source(장치 번호/영상 파일/RTSP URL), location(장소별 다시보기), resolution, fps(처리 FPS 상한),
+#       person_conf / knife_conf(카메라별 추가 임계값), motion_threshold,
+#       priority(높을수록 부하가 높을 때 품질을 늦게 내림), latency_target(목표 지연, 초)
+CAMERA_CONFIG = "cameras.json"
+DEFAULT_CAMERAS = [
+    {"id": 0, "source": 0, "location": "1층"},
+    {"id": 1, "source": 1, "location": "2층"},
+]
+RECONNECT_MIN_DELAY = 1.0  # 스트림이 끊겼을 때 첫 재연결 대기 시간(초), 실패할 때마다 두 배
+RECONNECT_MAX_DELAY = 30.0
+
+# 부하 제어 (load_controller.py): 지연이 목표를 넘으면 우선순위가 낮은 카메라부터 품질을 한 단계씩 내림
+LOAD_SHEDDING = True
+LOAD_TARGET_LATENCY = 0.5  # 캡처 -> 전송까지 목표 지연(초), 카메라별 latency_target으로 덮어씀
+LOAD_HEADROOM = 0.6  # 모든 카메라 지연이 목표 x 이 값보다 낮으면 한 단계씩 복구
+LOAD_CONTROL_INTERVAL = 2.0  # 조정 주기(초), 한 주기에 카메라 하나만 조정
+LOAD_SHED_LEVELS = [  # 앞쪽이 최고 품질, interval: INFER_INTERVAL 배수, imgsz: 모델 입력 크기, max_fps: 처리 FPS 상한
+    {},
+    {"interval": 2},
+    {"interval": 2, "imgsz": 480},
+    {"interval": 3, "imgsz": 320},
+    {"interval": 3, "imgsz": 320, "max_fps": 10},
+    {"interval": 4, "imgsz": 320, "max_fps": 5},
+]
+
+# 경보음 (alarm_service.py), wav만 지원 (mp3는 audio.py로 변환)
+ALARM_SOUNDS = {"critical": "alarm.wav", "warning": "alarm.wav"}  # 레벨별 소리, 상황별 음성은 파일만 바꾸면 됨
+ALARM_LEVELS = ["critical", "warning"]  # 우선순위 (앞쪽이 높음, 재생 중인 낮은 레벨을 끊고 재생)
+ALARM_CAMERA_WINDOW = 10.0  # 같은 카메라의 같은 레벨 알림은 N초 안에 한 번만 재생
+ALARM_GLOBAL_WINDOW = 3.0  # 카메라가 달라도 같은 레벨 알림은 N초 안에 한 번만 재생
@@ -0,0 +1,15 @@
+# YOLO 결과(Results)를 numpy 배열로 변환하는 헬퍼
+import numpy as np
+
+
+def empty_boxes():
+    return np.zeros((0, 5), dtype=np.float32)
+
+
+def boxes_array(result, cls=None, min_conf=0.0):
+    # (N, 5) 배열 [x1, y1, x2, y2, conf] 반환
+    data = result.boxes.data.cpu().numpy()
+    keep = data[:, 4] > min_conf
+    if cls is not None:
+        keep &= data[:, 5] == cls
+    return data[keep, :5]
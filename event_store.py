@@ -0,0 +1,193 @@
+# 감지 이벤트 저장소 (SQLite, WAL 모드)
+# - 캡처 스레드는 add()로 큐에 넣기만 하고 바로 돌아감 (디스크 I/O로 캡처 루프가 멈추지 않음)
+# - 기록 스레드 하나가 큐에 쌓인 이벤트를 모아서 트랜잭션 한 번으로 저장
+# - WAL 모드라 기록 중에도 조회 요청이 막히지 않음
+# - 종류/카메라/장소별 (시각 포함) 인덱스로 몇 달 치 이벤트도 ms 단위로 조회
+# make_router(store): 일자별/장소별 다시보기 메뉴가 쓰는 조회 API (/events, /events/summary)
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    camera INTEGER NOT NULL,
+    location TEXT NOT NULL,
+    type TEXT NOT NULL,
+    message TEXT,
+    clip TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events (type, ts);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts ON events (camera, ts);
+CREATE INDEX IF NOT EXISTS idx_events_location_ts ON events (location, ts);
+CREATE INDEX IF NOT EXISTS idx_events_type_location_ts ON events (type, location, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+"""
+
+COLUMNS = ("id", "ts", "camera", "location", "type", "message", "clip")
+
+
+def connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 체크포인트 때만 fsync
+    return conn
+
+
+def month_range(month: str):
+    # "2025-06" -> 해당 월의 (시작, 끝) unix time (로컬 시간 기준), 형식이 다르면 ValueError
+    try:
+        start = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise ValueError("month는 YYYY-MM 형식이어야 합니다.") from None
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start.timestamp(), end.timestamp()
+
+
+class EventStore:
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.5, max_pending: int = 10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0  # 큐가 가득 차서 저장하지 못한 이벤트 수
+        self._queue = queue.Queue(max_pending)
+        self._local = threading.local()
+        self._thread = None
+
+    def start(self):
+        conn = connect(self.path)
+        conn.executescript(SCHEMA)
+        # clip 컬럼이 없던 이전 DB 파일
+        if "clip" not in [row[1] for row in conn.execute("PRAGMA table_info(events)")]:
+            conn.execute("ALTER TABLE events ADD COLUMN clip TEXT")
+        conn.close()
+        self._thread = threading.Thread(target=self._loop, name="event-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def add(self, camera: int, location: str, type: str, message: str = None, ts: float = None, clip: str = None):
+        # 캡처 스레드에서 호출, 절대 기다리지 않음 (clip: 이벤트 전후 녹화 파일 이름)
+        try:
+            self._queue.put_nowait((ts or time.time(), camera, location, type, message, clip))
+        except queue.Full:
+            self.dropped += 1
+
+    def _loop(self):
+        conn = connect(self.path)
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            # 잠깐 사이에 쌓인 이벤트를 한 번에 저장
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [item for item in batch if item is not None]
+            if batch:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO events (ts, camera, location, type, message, clip) VALUES (?, ?, ?, ?, ?, ?)", batch)
+                self.written += len(batch)
+        conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        # 조회는 스레드마다 별도 연결 (FastAPI 스레드 풀)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path)
+        return conn
+
+    def query(self, type: str = None, camera: int = None, location: str = None,
+              start: float = None, end: float = None, limit: int = 50, cursor: str = None):
+        # 최신순, cursor("ts:id")는 이전 페이지의 마지막 이벤트 (keyset 페이지네이션), 잘못된 cursor는 ValueError
+        where, params = [], []
+        for column, value in (("type", type), ("camera", camera), ("location", location)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            where.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            where.append("ts < ?")
+            params.append(end)
+        if cursor:
+            try:
+                cursor_ts, cursor_id = cursor.split(":")
+                cursor_ts, cursor_id = float(cursor_ts), int(cursor_id)
+            except ValueError:
+                raise ValueError("잘못된 cursor입니다.") from None
+            where.append("(ts < ? OR (ts = ? AND id < ?))")
+            params += [cursor_ts, cursor_ts, cursor_id]
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        rows = self._reader().execute(sql, params + [limit + 1]).fetchall()
+
+        events = [dict(zip(COLUMNS, row)) for row in rows[:limit]]
+        next_cursor = f"{events[-1]['ts']!r}:{events[-1]['id']}" if len(rows) > limit else None
+        return events, next_cursor
+
+    def summary(self, type: str = None):
+        # 메뉴에 표시할 월별 / 장소별 이벤트 수
+        # 행마다 날짜를 계산하지 않도록 월 경계로 나눈 범위 COUNT (인덱스만 읽음)
+        where, params = ("WHERE type = ?", [type]) if type else ("", [])
+        conn = self._reader()
+        first, last = conn.execute(f"SELECT MIN(ts), MAX(ts) FROM events {where}", params).fetchone()
+        months = {}
+        if first is not None:
+            month = datetime.fromtimestamp(first).strftime("%Y-%m")
+            while True:
+                start, end = month_range(month)
+                if start > last:
+                    break
+                count = conn.execute(f"SELECT COUNT(*) FROM events {where} {'AND' if where else 'WHERE'} ts >= ? AND ts < ?",
+                                     params + [start, end]).fetchone()[0]
+                if count:
+                    months[month] = count
+                month = datetime.fromtimestamp(end).strftime("%Y-%m")
+        locations = conn.execute(
+            f"SELECT location, COUNT(*) FROM events {where} GROUP BY location ORDER BY location", params).fetchall()
+        return {"months": dict(sorted(months.items(), reverse=True)), "locations": dict(locations)}
+
+
+def make_router(store: EventStore) -> APIRouter:
+    router = APIRouter()
+
+    # 동기 함수이므로 FastAPI가 스레드 풀에서 실행 (이벤트 루프를 막지 않음)
+    @router.get("/events")
+    def list_events(type: Optional[str] = None, camera: Optional[int] = None, location: Optional[str] = None,
+                    month: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None):
+        # 저장소는 웹 프레임워크와 무관하게 ValueError를 내고, 여기서 400으로 바꿈
+        try:
+            start, end = month_range(month) if month else (None, None)
+            events, next_cursor = store.query(type, camera, location, start, end, min(max(limit, 1), 500), cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"events": events, "next": next_cursor}
+
+    @router.get("/events/summary")
+    def events_summary(type: Optional[str] = None):
+        return store.summary(type)
+
+    return router
@@ -0,0 +1,74 @@
+# 크기가 제한된 최신 프레임 슬롯
+# Queue()는 크기 제한이 없어 소비 속도가 느리면 메모리가 계속 늘고 화면이 실시간보다 뒤처진다.
+# FrameSlot은 depth개까지만 보관하고, 가득 차면 가장 오래된 항목을 버리고 새 항목을 넣는다.
+# queue.Queue와 같은 put/get/empty 인터페이스를 제공하므로 그대로 교체해서 쓸 수 있다.
+import threading
+from collections import deque
+from queue import Empty
+
+
+class FrameSlot:
+    def __init__(self, depth: int = 1):
+        if depth < 1:
+            raise ValueError("depth는 1 이상이어야 합니다.")
+        self.depth = depth
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.dropped = 0  # 소비되기 전에 덮어써진 항목 수
+        self.delivered = 0  # 소비자에게 전달된 항목 수
+        self._listeners = []  # put 직후 호출되는 콜백 (asyncio 쪽 깨우기용)
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.depth:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def add_listener(self, listener):
+        with self._cond:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._cond:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def has_listeners(self) -> bool:
+        # Broadcaster가 구독 중인지 (시청자가 있는지)
+        with self._cond:
+            return bool(self._listeners)
+
+    def get(self, block: bool = True, timeout: float = None):
+        with self._cond:
+            if block:
+                if not self._cond.wait_for(lambda: self._items, timeout):
+                    raise Empty
+            elif not self._items:
+                raise Empty
+            self.delivered += 1
+            return self._items.popleft()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def empty(self) -> bool:
+        with self._cond:
+            return not self._items
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "depth": self.depth,
+                "size": len(self._items),
+                "dropped": self.dropped,
+                "delivered": self.delivered,
+            }
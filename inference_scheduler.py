@@ -0,0 +1,118 @@
+# 여러 카메라의 최신 프레임을 모아 한 번에(batch) 추론하는 스케줄러
+# 카메라 스레드마다 YOLO를 따로 호출하면 CPU에서 단일 이미지 추론이 서로 경쟁하므로
+# 스케줄러가 프레임을 모아서 runner를 배치당 한 번만 호출하고 결과를 카메라별로 돌려준다.
+import threading
+import time
+from concurrent.futures import Future
+
+
+class InferenceScheduler:
+    def __init__(self, runner, max_batch_size: int = 4, max_wait: float = 0.02, concurrency: int = 1,
+                 shared_memory: bool = False):
+        # runner: 항목 list -> 항목별 결과 list (예: pipeline.detect_batch)
+        # concurrency: 동시에 실행할 배치 수 (추론 프로세스 수에 맞춤)
+        # shared_memory: runner가 프레임 대신 공유 메모리 링 참조(shm_ring.FrameRef)를 받는지 여부
+        self.runner = runner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.concurrency = concurrency
+        self.shared_memory = shared_memory
+
+        self._pending = {}  # cam_id -> (frame, future), 카메라별 최신 프레임 하나만 유지
+        self._cameras = set()  # 현재 프레임을 보내는 카메라
+        self._cond = threading.Condition()
+        self._running = False
+        self._threads = []
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"scheduler-{i}", daemon=True) for i in range(self.concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def register(self, cam_id):
+        with self._cond:
+            self._cameras.add(cam_id)
+
+    def unregister(self, cam_id):
+        with self._cond:
+            self._cameras.discard(cam_id)
+            pending = self._pending.pop(cam_id, None)
+            self._cond.notify()
+        if pending is not None:
+            pending[1].cancel()
+
+    def submit(self, cam_id, frame) -> Future:
+        future = Future()
+        with self._cond:
+            self._cameras.add(cam_id)
+            # 아직 처리되지 않은 이전 프레임은 최신 프레임으로 교체
+            old = self._pending.pop(cam_id, None)
+            self._pending[cam_id] = (frame, future)
+            self._cond.notify()
+        if old is not None:
+            old[1].cancel()
+        return future
+
+    def infer(self, cam_id, frame, timeout=None):
+        return self.submit(cam_id, frame).result(timeout)
+
+    def _ready(self):
+        expected = min(self.max_batch_size, max(len(self._cameras), 1))
+        return len(self._pending) >= expected
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._running:
+                    break
+
+                # 첫 프레임 도착 후 max_wait 동안 다른 카메라 프레임을 기다림
+                deadline = time.monotonic() + self.max_wait
+                while self._running and not self._ready():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                cam_ids = list(self._pending)[:self.max_batch_size]
+                batch = [(cam_id, *self._pending.pop(cam_id)) for cam_id in cam_ids]
+
+            self._run_batch(batch)
+
+        # 종료 시 남은 요청 취소
+        with self._cond:
+            leftovers = list(self._pending.values())
+            self._pending.clear()
+        for _, future in leftovers:
+            future.cancel()
+
+    def _run_batch(self, batch):
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            outputs = self.runner([frame for _, frame, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), output in zip(batch, outputs):
+            future.set_result(output)
@@ -0,0 +1,142 @@
+# 부하에 따라 카메라별 처리 품질을 조정하는 제어기 (load shedding)
+# - 카메라마다 캡처 -> 웹소켓 전송까지의 지연(슬롯 대기 포함)을 지수 이동 평균으로 추적
+#   시청자가 없는 카메라는 캡처 -> 인코딩 완료까지의 지연으로 대신함 (CameraWorker)
+# - 목표 지연을 넘는 카메라가 있으면 우선순위가 낮은 카메라부터 품질을 한 단계 내림
+#   (config.LOAD_SHED_LEVELS: 추론 간격, 추론 해상도 imgsz, 처리 FPS 상한)
+# - 모든 카메라가 목표 x headroom 아래면 우선순위가 높은 카메라부터 한 단계씩 복구
+# - 한 주기(interval)에 카메라 하나만 조정하고, 조정할 때마다 이벤트를 남김 (on_change 콜백, GET /load)
+import threading
+import time
+from collections import deque
+
+from fastapi import APIRouter
+
+
+class CameraLoad:
+    def __init__(self, priority: int, target: float):
+        self.priority = priority  # 높을수록 품질을 늦게 내림 (위험 장소 카메라)
+        self.target = target
+        self.latency = None  # 지연 지수 이동 평균(초)
+        self.reported_at = None  # 마지막으로 보고된 프레임의 캡처 시각
+        self.level = 0  # LOAD_SHED_LEVELS 인덱스 (0이 최고 품질)
+
+
+class LoadController:
+    def __init__(self, levels, target: float, headroom: float = 0.6, interval: float = 2.0,
+                 smoothing: float = 0.2, on_change=None):
+        # levels: 단계별 설정 dict list (앞쪽이 최고 품질), target: 기본 목표 지연(초)
+        # on_change(event): 단계를 바꿀 때마다 호출
+        self.levels = levels
+        self.target = target
+        self.headroom = headroom
+        self.interval = interval
+        self.smoothing = smoothing
+        self.on_change = on_change
+        self.cameras = {}  # cam_id -> CameraLoad
+        self.events = deque(maxlen=100)  # 최근 조정 이벤트
+        self.adjustments = {"degrade": 0, "restore": 0}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def register(self, cam_id, priority: int = 0, target: float = None):
+        with self._lock:
+            self.cameras[cam_id] = CameraLoad(priority, target or self.target)
+
+    def unregister(self, cam_id):
+        with self._lock:
+            self.cameras.pop(cam_id, None)
+
+    def report(self, cam_id, latency: float, captured_at: float = None):
+        # captured_at: 프레임 캡처 시각, 주면 프레임당 한 번만 반영
+        # (시청자가 여럿이면 가장 먼저 보낸 웹소켓의 지연만 쓰고, 이미 보고된 프레임이나 더 오래된 프레임은 무시)
+        with self._lock:
+            camera = self.cameras.get(cam_id)
+            if camera is None:
+                return
+            if captured_at is not None:
+                if camera.reported_at is not None and captured_at <= camera.reported_at:
+                    return
+                camera.reported_at = captured_at
+            if camera.latency is None:
+                camera.latency = latency
+            else:
+                camera.latency += self.smoothing * (latency - camera.latency)
+
+    def level(self, cam_id) -> int:
+        camera = self.cameras.get(cam_id)
+        return camera.level if camera is not None else 0
+
+    def settings(self, cam_id) -> dict:
+        # 현재 단계 설정 {"interval": 추론 간격 배수, "imgsz": 추론 해상도, "max_fps": 처리 FPS 상한}
+        camera = self.cameras.get(cam_id)
+        return self.levels[camera.level] if camera is not None else self.levels[0]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="load-control", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stopped.wait(self.interval):
+            self.step()
+
+    def step(self):
+        # 한 번의 조정, 바꾼 이벤트 반환 (없으면 None)
+        with self._lock:
+            measured = {cam_id: c for cam_id, c in self.cameras.items() if c.latency is not None}
+            if any(c.latency > c.target for c in measured.values()):
+                # 우선순위가 낮은 카메라부터, 같으면 목표 대비 지연이 큰 카메라부터 품질을 내림
+                candidates = [(cam_id, c) for cam_id, c in self.cameras.items() if c.level < len(self.levels) - 1]
+                key = lambda item: (item[1].priority, -(item[1].latency or 0) / item[1].target)
+                direction = "degrade"
+            elif measured and all(c.latency < c.target * self.headroom for c in measured.values()):
+                # 여유가 있으면 우선순위가 높은 카메라부터 복구
+                candidates = [(cam_id, c) for cam_id, c in self.cameras.items() if c.level > 0]
+                key = lambda item: (-item[1].priority, (item[1].latency or 0) / item[1].target)
+                direction = "restore"
+            else:
+                return None
+            if not candidates:
+                return None
+            cam_id, camera = min(candidates, key=key)
+            previous = camera.level
+            camera.level += 1 if direction == "degrade" else -1
+            self.adjustments[direction] += 1
+            event = {
+                "ts": time.time(),
+                "camera": cam_id,
+                "direction": direction,
+                "from": previous,
+                "to": camera.level,
+                "settings": self.levels[camera.level],
+                "latency": camera.latency,
+                "target": camera.target,
+                "max_latency": max(c.latency for c in measured.values()),
+            }
+            self.events.append(event)
+        if self.on_change is not None:
+            self.on_change(event)
+        return event
+
+    def status(self):
+        return {
+            cam_id: {"priority": c.priority, "target": c.target, "latency": c.latency, "level": c.level,
+                     "settings": self.levels[c.level]}
+            for cam_id, c in sorted(self.cameras.items())
+        }
+
+
+def make_router(controller: LoadController) -> APIRouter:
+    router = APIRouter()
+
+    @router.get("/load")
+    async def load_status():
+        return {"cameras": controller.status(), "events": list(controller.events)}
+
+    return router
@@ -0,0 +1,305 @@
+# 카메라별 성능 지표와 샘플링 프로파일러
+# - /metrics: Prometheus 텍스트 형식, /debug/stats: JSON
+# - 캡처 루프에서는 카운터 증가와 히스토그램 버킷 갱신만 하고,
+#   슬롯 크기/시청자 수 같은 값은 수집 요청이 왔을 때만 collector로 읽는다.
+# - 전송량은 카메라/모드(jpeg, video)별 최근 10초 평균 초당 바이트로 바로 비교 (cctv_stream_bytes_per_second)
+# - /debug/profile: config.PROFILER_ENABLED일 때만, 캡처 관련 스레드의 스택을 일정 시간 샘플링해서
+#   flamegraph.pl / speedscope에서 열 수 있는 collapsed stack 형식으로 돌려준다.
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+import config
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram:
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        # 버킷 경계로 근사한 분위수
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            if total >= target:
+                return bound
+        return float("inf")
+
+
+class Rate:
+    # 최근 window초 동안의 초당 합계 (1초 단위 버킷), 전송량처럼 Prometheus rate() 없이 바로 볼 값
+    def __init__(self, window: float = 10.0):
+        self.window = window
+        self.buckets = deque()  # [초, 합계]
+        self.created = time.monotonic()
+
+    def add(self, value):
+        second = int(time.monotonic())
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += value
+        else:
+            self.buckets.append([second, value])
+        while self.buckets[0][0] <= second - self.window:
+            self.buckets.popleft()
+
+    def value(self, now=None):
+        now = time.monotonic() if now is None else now
+        total = sum(value for second, value in self.buckets if second > now - self.window)
+        return total / max(min(self.window, now - self.created), 1.0)
+
+
+def _labels_key(labels: dict):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)  # (이름, 라벨) -> 값
+        self._histograms = {}  # (이름, 라벨) -> Histogram
+        self._rates = {}  # (이름, 라벨) -> Rate
+        self._collectors = []  # 수집 시점에 (이름, 라벨 dict, 값, 종류)를 돌려주는 함수
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, _labels_key(labels))] += value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def rate(self, name, value, **labels):
+        # 최근 10초 평균 초당 값 (gauge로 출력)
+        key = (name, _labels_key(labels))
+        with self._lock:
+            rate = self._rates.get(key)
+            if rate is None:
+                rate = self._rates[key] = Rate()
+            rate.add(value)
+
+    def observe_stage(self, cam_id, stage, seconds):
+        # pipeline의 observe 콜백
+        self.observe("cctv_stage_seconds", seconds, camera=cam_id, stage=stage)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def _collect(self):
+        samples = []
+        for collector in self._collectors:
+            samples.extend(collector())
+        return samples
+
+    def render_prometheus(self) -> str:
+        lines = []
+        typed = set()
+
+        def type_line(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            rates = sorted((key, rate.value()) for key, rate in self._rates.items())
+            for (name, key), value in counters:
+                type_line(name, "counter")
+                lines.append(f"{name}{_format_labels(key)} {value}")
+            for (name, key), histogram in histograms:
+                type_line(name, "histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+            for (name, key), value in rates:
+                type_line(name, "gauge")
+                lines.append(f"{name}{_format_labels(key)} {value}")
+
+        for name, labels, value, kind in sorted(self._collect(), key=lambda s: (s[0], _labels_key(s[1]))):
+            type_line(name, kind)
+            lines.append(f"{name}{_format_labels(_labels_key(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        stats = defaultdict(dict)
+
+        def label_text(key):
+            return ",".join(f"{k}={v}" for k, v in key) or "all"
+
+        with self._lock:
+            for (name, key), value in self._counters.items():
+                stats[name][label_text(key)] = value
+            for (name, key), histogram in self._histograms.items():
+                stats[name][label_text(key)] = {
+                    "count": histogram.count,
+                    "mean_ms": 1000 * histogram.sum / histogram.count if histogram.count else 0.0,
+                    "p50_ms": 1000 * histogram.quantile(0.5),
+                    "p95_ms": 1000 * histogram.quantile(0.95),
+                }
+            for (name, key), rate in self._rates.items():
+                stats[name][label_text(key)] = rate.value()
+        for name, labels, value, _ in self._collect():
+            stats[name][label_text(_labels_key(labels))] = value
+        return dict(stats)
+
+
+registry = Metrics()
+
+
+def pipeline_collector(workers: dict, frame_slots: dict, broadcasters: dict, encoder):
+    # 카메라 파이프라인 상태를 수집 시점에만 읽는 collector
+    def collect():
+        for cam_id, worker in list(workers.items()):
+            yield "cctv_capture_fps", {"camera": cam_id}, worker.fps, "gauge"
+            yield "cctv_frames_captured_total", {"camera": cam_id}, worker.grabber.seq, "counter"
+            yield "cctv_frames_processed_total", {"camera": cam_id}, worker.frames, "counter"
+            yield "cctv_frames_dropped_total", {"camera": cam_id, "stage": "capture"}, worker.grabber.slot.dropped, "counter"
+            yield "cctv_motion_skipped_total", {"camera": cam_id}, worker.gate.skipped, "counter"
+            yield "cctv_inference_errors_total", {"camera": cam_id}, worker.inference_errors, "counter"
+        for cam_id, slot in list(frame_slots.items()):
+            yield "cctv_frame_slot_depth", {"camera": cam_id}, slot.qsize(), "gauge"
+            yield "cctv_frames_dropped_total", {"camera": cam_id, "stage": "send"}, slot.dropped, "counter"
+        for cam_id, broadcaster in list(broadcasters.items()):
+            yield "cctv_viewers", {"camera": cam_id}, broadcaster.viewers, "gauge"
+        yield "cctv_frames_dropped_total", {"stage": "encode"}, encoder.dropped, "counter"
+
+    return collect
+
+
+def video_collector(segmenter):
+    def collect():
+        for cam_id, encoder in list(segmenter.cameras.items()):
+            yield "cctv_video_segments_total", {"camera": cam_id}, encoder.segments, "counter"
+            yield "cctv_video_encoder_restarts_total", {"camera": cam_id}, encoder.restarts, "counter"
+            yield "cctv_frames_dropped_total", {"camera": cam_id, "stage": "video"}, encoder.dropped, "counter"
+            yield "cctv_video_viewers", {"camera": cam_id}, encoder.broadcaster.viewers, "gauge"
+
+    return collect
+
+
+def alarm_collector(alarms):
+    def collect():
+        yield "cctv_alarm_sounds_played_total", {}, alarms.played, "counter"
+        yield "cctv_alarms_coalesced_total", {}, alarms.coalesced, "counter"
+        yield "cctv_alarm_queue_depth", {}, alarms.pending(), "gauge"
+
+    return collect
+
+
+def model_collector(models):
+    def collect():
+        yield "cctv_model_version", {}, models.version, "gauge"
+        yield "cctv_model_ready", {}, int(models.state in ("ready", "swapping")), "gauge"
+        if models.time_to_first_frame is not None:
+            yield "cctv_time_to_first_frame_seconds", {}, models.time_to_first_frame, "gauge"
+        if models.last_swap is not None:
+            yield "cctv_model_swap_seconds", {}, models.last_swap["seconds"], "gauge"
+        for result, count in models.swaps.items():
+            yield "cctv_model_swaps_total", {"result": result}, count, "counter"
+
+    return collect
+
+
+def load_collector(controller):
+    def collect():
+        for cam_id, camera in list(controller.cameras.items()):
+            yield "cctv_load_level", {"camera": cam_id}, camera.level, "gauge"
+            if camera.latency is not None:
+                yield "cctv_latency_seconds", {"camera": cam_id}, camera.latency, "gauge"
+        for direction, count in controller.adjustments.items():
+            yield "cctv_load_adjustments_total", {"direction": direction}, count, "counter"
+
+    return collect
+
+
+# === 샘플링 프로파일러 ===
+
+PROFILE_THREAD_PREFIXES = ("capture", "grab", "encode", "scheduler", "alarm", "model-swap", "load-control", "video")
+_profile_lock = threading.Lock()
+
+
+def sample_stacks(seconds: float, interval: float = 0.005, prefixes=PROFILE_THREAD_PREFIXES) -> str:
+    # 지정한 스레드들의 스택을 주기적으로 샘플링 -> collapsed stack 텍스트
+    stacks = Counter()
+    me = threading.get_ident()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            name = names.get(ident, "")
+            if ident == me or not name.startswith(prefixes):
+                continue
+            calls = []
+            while frame is not None:
+                code = frame.f_code
+                calls.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stacks[";".join([name.split("-")[0]] + calls[::-1])] += 1
+        time.sleep(interval)
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/debug/stats")
+async def debug_stats():
+    return registry.snapshot()
+
+
+@router.get("/debug/profile")
+def debug_profile(seconds: float = 10.0):
+    # 동기 함수이므로 FastAPI가 스레드 풀에서 실행 (이벤트 루프를 막지 않음)
+    if not config.PROFILER_ENABLED:
+        raise HTTPException(status_code=403, detail="config.PROFILER_ENABLED가 꺼져 있습니다.")
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="이미 프로파일링 중입니다.")
+    try:
+        folded = sample_stacks(min(max(seconds, 0.1), config.PROFILER_MAX_SECONDS))
+    finally:
+        _profile_lock.release()
+
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(config.PROFILE_DIR, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(folded)
+    return PlainTextResponse(folded)
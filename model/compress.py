@@ -0,0 +1,323 @@
+# CPU용 소형 나이프 모델 만들기 (지식 증류 + 구조적 채널 가지치기)
+# - teacher(customknife_v1.x.pt)를 기준으로 후보 student를 만들고 ver1.1/data로 증류 학습 (오프라인, 다운로드 없음)
+#   teacher@320     : teacher를 입력 320으로만 평가 (학습 없음)
+#   distill@320     : teacher 가중치에서 시작해 입력 320으로 증류 학습
+#   prune:0.3@640   : Bottleneck 내부 / Detect 박스 분기 채널을 BN 감마 크기 순으로 30% 제거한 뒤 증류 학습
+#   width:0.125@320 : yolo11n 구조에서 채널 폭만 줄인 모델을 처음부터 증류 학습
+# - 증류 손실: 원래 검출 손실 + teacher 출력(클래스 점수, 박스 분포)과의 차이
+# - 후보마다 runs/compress/<후보>/ 에 체크포인트를 남기고, 중단되면 last.pt에서 이어서 학습
+# - report: 후보별 CPU 지연 시간과 mAP 표 (mAP는 evaluate.py 캐시 사용), 허용 mAP 감소 안에서 가장 빠른 모델 선택
+# 사용 예:
+#   python model/compress.py train customknife_v1.1.pt --candidates distill@320 prune:0.3@640 --epochs 50
+#   python model/compress.py report customknife_v1.1.pt --candidates teacher@320 distill@320 prune:0.3@640
+import argparse
+import copy
+import json
+import os
+import re
+import time
+from typing import NamedTuple
+
+from dataset_utils import ROOT, data_dir, list_images, make_data_yaml
+from evaluate import PREDICT_CONF, evaluate, load_predictions, match_all
+from export_backend import measure_latency
+
+os.environ.setdefault("YOLO_OFFLINE", "True")  # ultralytics가 폰트/가중치를 내려받지 않도록
+
+OUTPUT_DIR = os.path.join(ROOT, "runs", "compress")
+DEFAULT_CANDIDATES = ["teacher@320", "distill@320", "prune:0.3@640", "prune:0.5@320", "width:0.125@320"]
+CANDIDATE_RE = re.compile(r"^(teacher|distill|prune|width)(?::([0-9.]+))?@(\d+)$")
+
+
+class Candidate(NamedTuple):
+    kind: str  # teacher / distill / prune / width
+    value: float  # prune: 제거 비율, width: 채널 폭 배수
+    imgsz: int
+
+    @classmethod
+    def parse(cls, text: str) -> "Candidate":
+        match = CANDIDATE_RE.match(text)
+        if match is None or (match.group(1) in ("prune", "width")) != (match.group(2) is not None):
+            raise ValueError(f"후보 형식이 잘못되었습니다: {text} (예: teacher@320, distill@320, prune:0.3@640, width:0.125@320)")
+        return cls(match.group(1), float(match.group(2) or 0), int(match.group(3)))
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}{self.value:g}-{self.imgsz}" if self.value else f"{self.kind}-{self.imgsz}"
+
+
+# === student 만들기 ===
+
+def _prune_conv_out(conv, keep):
+    # ultralytics Conv(conv + bn)의 출력 채널 중 keep만 남김
+    import torch
+
+    conv.conv.weight = torch.nn.Parameter(conv.conv.weight.data[keep].clone())
+    conv.conv.out_channels = len(keep)
+    bn = conv.bn
+    bn.weight = torch.nn.Parameter(bn.weight.data[keep].clone())
+    bn.bias = torch.nn.Parameter(bn.bias.data[keep].clone())
+    bn.running_mean = bn.running_mean[keep].clone()
+    bn.running_var = bn.running_var[keep].clone()
+    bn.num_features = len(keep)
+
+
+def _prune_conv_in(module, keep):
+    # 다음 층(ultralytics Conv 또는 nn.Conv2d)의 입력 채널 중 keep만 남김
+    import torch
+
+    conv = getattr(module, "conv", module)
+    conv.weight = torch.nn.Parameter(conv.weight.data[:, keep].clone())
+    conv.in_channels = len(keep)
+
+
+def prune_pairs(model):
+    # 앞 층의 출력 채널을 바로 뒤 층만 쓰는 (앞, 뒤) 쌍 -> 모듈 구조(클래스)를 바꾸지 않고 채널 수만 줄일 수 있음
+    from ultralytics.nn.modules import Bottleneck, Detect
+
+    pairs = []
+    for module in model.modules():
+        if isinstance(module, Bottleneck) and module.cv2.conv.groups == 1:
+            pairs.append((module.cv1, module.cv2))
+        elif isinstance(module, Detect):
+            for branch in module.cv2:  # 박스 분기: Conv -> Conv -> Conv2d
+                pairs.append((branch[0], branch[1]))
+                pairs.append((branch[1], branch[2]))
+    return pairs
+
+
+def prune_model(model, ratio: float, multiple: int = 8):
+    # 층마다 BN 감마 절댓값이 작은 채널부터 ratio만큼 제거 (남는 채널 수는 multiple의 배수)
+    import torch
+
+    model = copy.deepcopy(model).float()
+    before = sum(p.numel() for p in model.parameters())
+    for prev, nxt in prune_pairs(model):
+        channels = prev.conv.out_channels
+        n_keep = max(multiple, int(round(channels * (1 - ratio) / multiple)) * multiple)
+        if n_keep >= channels:
+            continue
+        keep = torch.argsort(prev.bn.weight.data.abs(), descending=True)[:n_keep].sort().values
+        _prune_conv_out(prev, keep)
+        _prune_conv_in(nxt, keep)
+    after = sum(p.numel() for p in model.parameters())
+    print(f"가지치기 {ratio:.0%}: 파라미터 {before / 1e6:.2f}M -> {after / 1e6:.2f}M")
+    return model
+
+
+def width_model(width: float, nc: int):
+    # yolo11n 설정(패키지에 포함)에서 채널 폭만 바꾼 모델 (가중치는 처음부터 학습)
+    from ultralytics.nn.tasks import DetectionModel, yaml_model_load
+
+    cfg = yaml_model_load("yolo11n.yaml")
+    depth, _, max_channels = cfg["scales"]["n"]
+    cfg["scales"] = {"n": [depth, width, max_channels]}
+    return DetectionModel(cfg, nc=nc, verbose=False)
+
+
+def build_student(candidate: Candidate, teacher: str, path: str):
+    # 학습 시작점 체크포인트 저장 (ultralytics 체크포인트 형식이라 YOLO(path)로 그대로 불러올 수 있음)
+    import torch
+    from ultralytics import YOLO
+
+    teacher_model = YOLO(teacher).model
+    if candidate.kind == "distill":
+        model = copy.deepcopy(teacher_model).float()
+    elif candidate.kind == "prune":
+        model = prune_model(teacher_model, candidate.value)
+    else:
+        model = width_model(candidate.value, teacher_model.nc)
+    model.names = teacher_model.names
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    torch.save({"model": model, "train_args": {"imgsz": candidate.imgsz}, "date": time.strftime("%Y-%m-%d")}, path)
+    return path
+
+
+# === 증류 학습 ===
+
+def distill_loss(student_feats, teacher_feats, reg_max: int, nc: int, temperature: float):
+    # 클래스 점수: teacher 확률을 정답으로 한 BCE
+    # 박스 분포(DFL): teacher가 물체라고 보는 위치만 KL (teacher 점수로 가중)
+    import torch.nn.functional as F
+
+    total = 0.0
+    for s, t in zip(student_feats, teacher_feats):
+        b = s.shape[0]
+        s_box, s_cls = s.view(b, 4 * reg_max + nc, -1).split((4 * reg_max, nc), 1)
+        t_box, t_cls = t.view(b, 4 * reg_max + nc, -1).split((4 * reg_max, nc), 1)
+        cls = F.binary_cross_entropy_with_logits(s_cls / temperature, (t_cls / temperature).sigmoid())
+        weight = t_cls.sigmoid().amax(1)  # (b, anchors)
+        s_log = F.log_softmax(s_box.view(b, 4, reg_max, -1) / temperature, 2)
+        t_prob = F.softmax(t_box.view(b, 4, reg_max, -1) / temperature, 2)
+        kl = (t_prob * (t_prob.clamp_min(1e-9).log() - s_log)).sum(2).mean(1)  # (b, anchors)
+        total = total + cls + (kl * weight).sum() / weight.sum().clamp_min(1.0)
+    return total * temperature ** 2 / len(student_feats)
+
+
+def make_trainer(teacher: str, weight: float, temperature: float, overrides: dict):
+    import torch
+    from ultralytics import YOLO
+    from ultralytics.models.yolo.detect import DetectionTrainer
+    from ultralytics.utils.loss import v8DetectionLoss
+
+    class DistillLoss(v8DetectionLoss):
+        def __init__(self, model, teacher_model):
+            super().__init__(model)
+            self.teacher = teacher_model
+
+        def __call__(self, preds, batch):
+            loss, items = super().__call__(preds, batch)
+            feats = preds[1] if isinstance(preds, tuple) else preds
+            with torch.no_grad():
+                teacher_feats = self.teacher(batch["img"])[1]
+            extra = weight * distill_loss(feats, teacher_feats, self.reg_max, self.nc, temperature) * batch["img"].shape[0]
+            # ultralytics 버전에 따라 항목별(box/cls/dfl) 손실 벡터를 합산하므로 나눠서 더함
+            return (loss + extra / loss.numel() if loss.ndim else loss + extra), items
+
+    class CompressTrainer(DetectionTrainer):
+        def get_model(self, cfg=None, weights=None, verbose=True):
+            # 가지치기/폭을 줄인 student는 yaml로 다시 만들면 원래 크기가 되므로 불러온 체크포인트 모델을 그대로 사용
+            return weights
+
+    def attach_teacher(trainer):
+        # criterion은 학습 모델에만 붙이므로 체크포인트(EMA)에는 teacher가 저장되지 않음
+        teacher_model = YOLO(teacher).model.to(trainer.device).float().eval()
+        for p in teacher_model.parameters():
+            p.requires_grad_(False)
+        trainer.model.criterion = DistillLoss(trainer.model, teacher_model)
+
+    trainer = CompressTrainer(overrides=overrides)
+    trainer.add_callback("on_train_start", attach_teacher)
+    return trainer
+
+
+def train_candidate(candidate: Candidate, args, data_yaml: str):
+    run_dir = os.path.join(args.output, candidate.name)
+    done_path = os.path.join(run_dir, "done.json")
+    if os.path.exists(done_path):
+        print(f"[{candidate.name}] 이미 학습 완료, 건너뜀")
+        return
+    last = os.path.join(run_dir, "weights", "last.pt")
+    if os.path.exists(last):
+        # epoch / optimizer / EMA까지 체크포인트에서 이어서 학습
+        print(f"[{candidate.name}] {last}에서 이어서 학습")
+        overrides = {"resume": last}
+    else:
+        init = build_student(candidate, args.teacher, os.path.join(run_dir, "init.pt"))
+        overrides = {
+            "model": init, "data": data_yaml, "imgsz": candidate.imgsz, "epochs": args.epochs, "batch": args.batch,
+            "device": args.device, "workers": args.workers, "patience": args.patience, "optimizer": "AdamW",
+            "project": args.output, "name": candidate.name, "exist_ok": True, "pretrained": False, "plots": False,
+        }
+    start = time.perf_counter()
+    trainer = make_trainer(args.teacher, args.distill_weight, args.temperature, overrides)
+    trainer.train()
+    with open(done_path, "w", encoding="utf-8") as f:
+        json.dump({"candidate": candidate.name, "best": str(trainer.best), "seconds": time.perf_counter() - start}, f,
+                  ensure_ascii=False, indent=2)
+
+
+# === 지연 시간 / mAP 표 ===
+
+def candidate_weights(candidate: Candidate, args):
+    if candidate.kind == "teacher":
+        return args.teacher
+    best = os.path.join(args.output, candidate.name, "weights", "best.pt")
+    return best if os.path.exists(best) else None
+
+
+def measure(weights: str, imgsz: int, images, latency_images: int, args) -> dict:
+    import torch
+    from ultralytics import YOLO
+
+    torch.set_num_threads(args.threads)
+    settings = {"imgsz": imgsz, "nms_iou": 0.7, "max_det": 300, "predict_conf": PREDICT_CONF}
+    predictions, _, _ = load_predictions(weights, images, settings, args.batch, "cpu")
+    scores = evaluate(predictions, match_all(predictions), PREDICT_CONF)
+    model = YOLO(weights, task="detect")
+    return {
+        "weights": weights,
+        "imgsz": imgsz,
+        "params_m": sum(p.numel() for p in model.model.parameters()) / 1e6,
+        "map50": scores["map50"],
+        "map50_95": scores["map50_95"],
+        "latency_ms": measure_latency(model, images[:latency_images], imgsz),
+    }
+
+
+def report(args) -> dict:
+    images = list_images(os.path.join(data_dir("ver1.1"), args.split))
+    rows = {"teacher": measure(args.teacher, args.teacher_imgsz, images, args.latency_images, args)}
+    for text in args.candidates:
+        candidate = Candidate.parse(text)
+        weights = candidate_weights(candidate, args)
+        if weights is None:
+            print(f"[{candidate.name}] 학습된 모델이 없어 건너뜀 (train 먼저 실행)")
+            continue
+        rows[candidate.name] = measure(weights, candidate.imgsz, images, args.latency_images, args)
+
+    base = rows["teacher"]
+    for row in rows.values():
+        row["map_drop"] = base["map50_95"] - row["map50_95"]
+        row["speedup"] = base["latency_ms"]["mean"] / row["latency_ms"]["mean"]
+        row["passed"] = row["map_drop"] <= args.max_map_drop
+    passed = [name for name, row in rows.items() if row["passed"]]
+    selected = min(passed, key=lambda name: rows[name]["latency_ms"]["mean"]) if passed else None
+
+    print(f"{'candidate':18s} {'imgsz':>5s} {'params':>7s} {'mAP50':>7s} {'mAP50-95':>9s} {'drop':>7s} "
+          f"{'ms/img':>7s} {'p95':>7s} {'speedup':>7s}")
+    for name, row in sorted(rows.items(), key=lambda item: item[1]["latency_ms"]["mean"]):
+        mark = " <- 선택" if name == selected else ("" if row["passed"] else " (허용 초과)")
+        print(f"{name:18s} {row['imgsz']:5d} {row['params_m']:6.2f}M {row['map50']:7.4f} {row['map50_95']:9.4f} "
+              f"{row['map_drop']:+7.4f} {row['latency_ms']['mean']:7.1f} {row['latency_ms']['p95']:7.1f} "
+              f"{row['speedup']:6.2f}x{mark}")
+
+    result = {"split": args.split, "max_map_drop": args.max_map_drop, "threads": args.threads,
+              "selected": selected, "candidates": rows}
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, "report.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"저장: {path}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="증류/가지치기로 CPU용 소형 나이프 모델 만들기")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("teacher", help="기준 모델 (예: customknife_v1.1.pt)")
+    common.add_argument("--candidates", nargs="+", default=DEFAULT_CANDIDATES,
+                        help="teacher@320 / distill@320 / prune:0.3@640 / width:0.125@320 형식")
+    common.add_argument("--output", default=OUTPUT_DIR)
+    common.add_argument("--batch", type=int, default=16)
+
+    train_parser = sub.add_parser("train", parents=[common], help="후보별 증류 학습 (중단되면 이어서 학습)")
+    train_parser.add_argument("--epochs", type=int, default=50)
+    train_parser.add_argument("--patience", type=int, default=20)
+    train_parser.add_argument("--device", default="", help="비우면 GPU가 있으면 GPU, 없으면 CPU")
+    train_parser.add_argument("--workers", type=int, default=4)
+    train_parser.add_argument("--distill-weight", type=float, default=1.0, help="증류 손실 가중치")
+    train_parser.add_argument("--temperature", type=float, default=2.0)
+
+    report_parser = sub.add_parser("report", parents=[common], help="CPU 지연 시간 / mAP 비교 표")
+    report_parser.add_argument("--split", default="test")
+    report_parser.add_argument("--teacher-imgsz", type=int, default=640)
+    report_parser.add_argument("--max-map-drop", type=float, default=0.02, help="허용하는 mAP50-95 감소량")
+    report_parser.add_argument("--latency-images", type=int, default=100)
+    report_parser.add_argument("--threads", type=int, default=4, help="CPU 추론 스레드 수 (배포 환경에 맞춤)")
+
+    args = parser.parse_args()
+    candidates = [Candidate.parse(text) for text in args.candidates]  # 형식 오류는 학습 전에 확인
+    if args.command == "train":
+        data_yaml = make_data_yaml(data_dir("ver1.1"))
+        for candidate in candidates:
+            if candidate.kind != "teacher":
+                train_candidate(candidate, args, data_yaml)
+    else:
+        report(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# 로컬 데이터셋(ver1.0/data, ver1.1/data) 공통 헬퍼
+import os
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # 저장소 루트
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def data_dir(version: str = "ver1.1") -> str:
+    return os.path.join(ROOT, version, "data")
+
+
+def list_images(split_dir: str):
+    # split_dir: .../data/train 등 (images/, labels/ 하위 폴더 구조)
+    image_dir = os.path.join(split_dir, "images")
+    return sorted(
+        os.path.join(image_dir, name) for name in os.listdir(image_dir)
+        if name.lower().endswith(IMAGE_EXTS)
+    )
+
+
+def label_path(image_path: str) -> str:
+    split_dir = os.path.dirname(os.path.dirname(image_path))
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    return os.path.join(split_dir, "labels", stem + ".txt")
+
+
+def file_key(path: str):
+    # 파일이 바뀌었는지 판단하는 값 [크기, 수정 시각(ns)], 없으면 None
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def read_labels(path: str):
+    # YOLO 라벨 -> (N, 5) [cls, cx, cy, w, h] (0~1 비율 좌표)
+    # ver1.0처럼 폴리곤(cls x1 y1 x2 y2 ...) 라벨이면 감싸는 박스로 변환 (ultralytics와 동일)
+    labels = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                values = np.array(line.split(), dtype=np.float32)
+                if len(values) > 5:
+                    xs, ys = values[1::2], values[2::2]
+                    values = np.array([values[0], (xs.min() + xs.max()) / 2, (ys.min() + ys.max()) / 2,
+                                       xs.max() - xs.min(), ys.max() - ys.min()], dtype=np.float32)
+                if len(values) == 5:
+                    labels.append(values)
+    return np.array(labels, dtype=np.float32).reshape(-1, 5)
+
+
+def letterbox(image, size: int = 640, color: int = 114):
+    # 비율을 유지하며 size x size로 줄이고 남는 부분은 회색으로 채움 (ultralytics와 동일한 방식)
+    h, w = image.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = round(w * ratio), round(h * ratio)
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    out = np.full((size, size, 3), color, dtype=np.uint8)
+    out[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = image
+    return out, ratio, (pad_x, pad_y)
+
+
+def make_data_yaml(directory: str) -> str:
+    # Roboflow data.yaml은 상대 경로(../train/images)라 실행 위치에 따라 깨지므로 절대 경로 버전을 만든다
+    import yaml
+
+    with open(os.path.join(directory, "data.yaml"), encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    data.pop("roboflow", None)
+    data.update({
+        "path": os.path.abspath(directory),
+        "train": "train/images",
+        "val": "valid/images",
+        "test": "test/images",
+    })
+    out = os.path.join(directory, "data_local.yaml")
+    with open(out, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, allow_unicode=True)
+    return out
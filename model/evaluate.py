@@ -0,0 +1,231 @@
+# 캐시 기반 모델 평가 (mAP / precision / recall / PR 곡선)
+# - 추론은 낮은 conf(PREDICT_CONF)로 한 번만 실행하고, 이미지별 예측 결과를 캐시에 저장
+#   캐시 키: 모델 파일 해시 + 데이터셋 해시(이미지 크기/수정 시각, 라벨 내용) + 추론 설정
+# - 원하는 conf 임계값마다 캐시에서 numpy로 매칭만 다시 계산 (추론을 다시 돌리지 않음)
+#   -> capture_frames의 conf=0.5 / 0.7 같은 값을 몇 초 만에 비교
+# 사용 예:
+#   python model/evaluate.py customknife_v1.1.pt customknife_v1.2.pt --split test --conf 0.5 0.7
+#   python model/evaluate.py customknife_v1.1.pt --version ver1.0 --conf 0.3 0.5 0.7 --output eval.json
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from dataset_utils import ROOT, data_dir, file_key, label_path, list_images, read_labels
+
+CACHE_DIR = os.path.join(ROOT, "cache", "eval")
+PREDICT_CONF = 0.001  # 캐시에 저장하는 최저 conf (이보다 높은 임계값은 캐시에서 계산)
+IOU_THRESHOLDS = np.linspace(0.5, 0.95, 10)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dataset_hash(images) -> str:
+    # 이미지는 크기/수정 시각, 라벨은 내용으로 비교
+    digest = hashlib.sha1()
+    for path in images:
+        digest.update(json.dumps([os.path.basename(path), file_key(path)]).encode())
+        labels = label_path(path)
+        if os.path.exists(labels):
+            with open(labels, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _xywhn_to_xyxy(labels, h, w):
+    cx, cy, bw, bh = labels[:, 1] * w, labels[:, 2] * h, labels[:, 3] * w, labels[:, 4] * h
+    return np.stack([cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1)
+
+
+def run_predictions(weights: str, images, settings: dict, batch: int = 16, device: str = "cpu") -> dict:
+    # 이미지별 예측/정답을 하나의 배열 + offset으로 저장
+    from ultralytics import YOLO
+
+    model = YOLO(weights, task="detect")
+    pred_boxes, pred_conf, pred_cls, pred_counts = [], [], [], []
+    gt_boxes, gt_cls, gt_counts = [], [], []
+    for start in range(0, len(images), batch):
+        paths = images[start:start + batch]
+        results = model.predict(paths, imgsz=settings["imgsz"], conf=PREDICT_CONF, iou=settings["nms_iou"],
+                                max_det=settings["max_det"], device=device, verbose=False)
+        for path, result in zip(paths, results):
+            data = result.boxes.data.cpu().numpy()
+            pred_boxes.append(data[:, :4])
+            pred_conf.append(data[:, 4])
+            pred_cls.append(data[:, 5])
+            pred_counts.append(len(data))
+
+            h, w = result.orig_shape
+            labels = read_labels(label_path(path))
+            gt_boxes.append(_xywhn_to_xyxy(labels, h, w))
+            gt_cls.append(labels[:, 0])
+            gt_counts.append(len(labels))
+
+    return {
+        "names": np.array([os.path.basename(path) for path in images]),
+        "pred_boxes": np.concatenate(pred_boxes).astype(np.float32).reshape(-1, 4),
+        "pred_conf": np.concatenate(pred_conf).astype(np.float32),
+        "pred_cls": np.concatenate(pred_cls).astype(np.int32),
+        "pred_offsets": np.concatenate([[0], np.cumsum(pred_counts)]).astype(np.int64),
+        "gt_boxes": np.concatenate(gt_boxes).astype(np.float32).reshape(-1, 4),
+        "gt_cls": np.concatenate(gt_cls).astype(np.int32),
+        "gt_offsets": np.concatenate([[0], np.cumsum(gt_counts)]).astype(np.int64),
+    }
+
+
+def load_predictions(weights: str, images, settings: dict, batch: int = 16, device: str = "cpu", refresh: bool = False):
+    # device/batch는 결과에 영향이 없으므로 캐시 키에서 제외
+    key = "-".join([os.path.splitext(os.path.basename(weights))[0], file_hash(weights)[:12], dataset_hash(images)[:12],
+                    hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:8]])
+    path = os.path.join(CACHE_DIR, key + ".npz")
+    if os.path.exists(path) and not refresh:
+        return dict(np.load(path)), path, True
+
+    predictions = run_predictions(weights, images, settings, batch, device)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    np.savez(path + ".tmp.npz", **predictions)
+    os.replace(path + ".tmp.npz", path)
+    return predictions, path, False
+
+
+def box_iou(a, b):
+    # (n, 4) x (m, 4) -> (n, m)
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.clip(rb - lt, 0, None).prod(axis=2)
+    area_a = (a[:, 2:] - a[:, :2]).prod(axis=1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match_image(pred_boxes, pred_cls, gt_boxes, gt_cls):
+    # 예측별 IoU 임계값마다 정답 여부 (n_pred, 10), IoU가 큰 쌍부터 1:1 매칭 (ultralytics와 동일)
+    correct = np.zeros((len(pred_boxes), len(IOU_THRESHOLDS)), dtype=bool)
+    if not len(pred_boxes) or not len(gt_boxes):
+        return correct
+    iou = box_iou(gt_boxes, pred_boxes) * (gt_cls[:, None] == pred_cls[None, :])
+    for t, threshold in enumerate(IOU_THRESHOLDS):
+        gt_idx, pred_idx = np.nonzero(iou >= threshold)
+        if not len(gt_idx):
+            continue
+        order = np.argsort(-iou[gt_idx, pred_idx], kind="stable")
+        gt_idx, pred_idx = gt_idx[order], pred_idx[order]
+        _, first = np.unique(pred_idx, return_index=True)
+        gt_idx, pred_idx = gt_idx[first], pred_idx[first]
+        _, first = np.unique(gt_idx, return_index=True)
+        correct[pred_idx[first], t] = True
+    return correct
+
+
+def match_all(predictions) -> np.ndarray:
+    # 전체 예측의 (P, 10) 정답 여부 (conf와 무관하므로 한 번만 계산)
+    correct = []
+    po, go = predictions["pred_offsets"], predictions["gt_offsets"]
+    for i in range(len(po) - 1):
+        correct.append(match_image(predictions["pred_boxes"][po[i]:po[i + 1]], predictions["pred_cls"][po[i]:po[i + 1]],
+                                   predictions["gt_boxes"][go[i]:go[i + 1]], predictions["gt_cls"][go[i]:go[i + 1]]))
+    return np.concatenate(correct) if correct else np.zeros((0, len(IOU_THRESHOLDS)), dtype=bool)
+
+
+def average_precision(recall, precision):
+    # COCO 101점 AP: 각 recall 기준점 이상에서의 최대 precision (도달하지 못한 recall은 0)
+    envelope = np.flip(np.maximum.accumulate(np.flip(precision)))
+    idx = np.searchsorted(recall, np.linspace(0, 1, 101), side="left")
+    return float(np.where(idx < len(recall), envelope[np.minimum(idx, len(recall) - 1)], 0.0).mean())
+
+
+def evaluate(predictions, correct, conf: float, curve_points: int = 101) -> dict:
+    # conf 이상인 예측만으로 지표 계산 (실시간 화면에서 보이는 결과와 같은 조건)
+    keep = predictions["pred_conf"] >= conf
+    scores, classes, hits = predictions["pred_conf"][keep], predictions["pred_cls"][keep], correct[keep]
+    order = np.argsort(-scores, kind="stable")
+    scores, classes, hits = scores[order], classes[order], hits[order]
+
+    per_class = {}
+    for cls in np.unique(predictions["gt_cls"]):
+        n_gt = int((predictions["gt_cls"] == cls).sum())
+        mask = classes == cls
+        tp = np.cumsum(hits[mask], axis=0)  # (n, 10)
+        fp = np.cumsum(~hits[mask], axis=0)
+        recall = tp / max(n_gt, 1)
+        precision = tp / np.maximum(tp + fp, 1)
+        ap = [average_precision(recall[:, t], precision[:, t]) if len(tp) else 0.0 for t in range(len(IOU_THRESHOLDS))]
+        n_tp = int(tp[-1, 0]) if len(tp) else 0
+        n_pred = int(mask.sum())
+
+        # PR 곡선 (IoU 0.5): conf 구간을 균일하게 나눈 점에서의 precision/recall
+        grid = np.linspace(conf, 1.0, curve_points)
+        idx = np.searchsorted(-scores[mask], -grid, side="right") - 1  # 각 conf 이상인 마지막 예측
+        valid = idx >= 0
+        curve_p = np.where(valid, precision[np.clip(idx, 0, None), 0] if len(tp) else 0.0, 1.0)
+        curve_r = np.where(valid, recall[np.clip(idx, 0, None), 0] if len(tp) else 0.0, 0.0)
+
+        per_class[int(cls)] = {
+            "gt": n_gt,
+            "tp": n_tp,
+            "fp": n_pred - n_tp,
+            "fn": n_gt - n_tp,
+            "precision": n_tp / n_pred if n_pred else 0.0,
+            "recall": n_tp / n_gt if n_gt else 0.0,
+            "map50": ap[0],
+            "map50_95": float(np.mean(ap)),
+            "pr_curve": {"conf": grid.round(4).tolist(), "precision": np.round(curve_p, 4).tolist(),
+                         "recall": np.round(curve_r, 4).tolist()},
+        }
+
+    summary = {key: float(np.mean([c[key] for c in per_class.values()])) if per_class else 0.0
+               for key in ("precision", "recall", "map50", "map50_95")}
+    p, r = summary["precision"], summary["recall"]
+    summary["f1"] = 2 * p * r / (p + r) if p + r else 0.0
+    return {**summary, "classes": per_class}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캐시 기반 모델 평가 (conf 임계값별 mAP/precision/recall)")
+    parser.add_argument("weights", nargs="+", help="비교할 모델 파일")
+    parser.add_argument("--version", default="ver1.1")
+    parser.add_argument("--split", default="test")
+    parser.add_argument("--conf", type=float, nargs="+", default=[0.25, 0.5, 0.7])
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--nms-iou", type=float, default=0.7)
+    parser.add_argument("--max-det", type=int, default=300)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--refresh", action="store_true", help="캐시를 무시하고 다시 추론")
+    parser.add_argument("--output", default="eval_results.json")
+    args = parser.parse_args()
+
+    split_dir = os.path.join(data_dir(args.version), args.split)
+    images = list_images(split_dir)
+    settings = {"imgsz": args.imgsz, "nms_iou": args.nms_iou, "max_det": args.max_det, "predict_conf": PREDICT_CONF}
+
+    report = {"dataset": {"version": args.version, "split": args.split, "images": len(images)}, "models": {}}
+    print(f"{'model':28s} {'conf':>5s} {'P':>7s} {'R':>7s} {'F1':>7s} {'mAP50':>7s} {'mAP50-95':>9s}")
+    for weights in args.weights:
+        start = time.perf_counter()
+        predictions, cache, cached = load_predictions(weights, images, settings, args.batch, args.device, args.refresh)
+        correct = match_all(predictions)
+        results = {f"{conf:g}": evaluate(predictions, correct, conf) for conf in args.conf}
+        report["models"][weights] = {"cache": cache, "cached": cached, "seconds": time.perf_counter() - start,
+                                     "results": results}
+        for conf, r in results.items():
+            print(f"{os.path.basename(weights):28s} {conf:>5s} {r['precision']:7.4f} {r['recall']:7.4f} {r['f1']:7.4f} "
+                  f"{r['map50']:7.4f} {r['map50_95']:9.4f}")
+        print(f"  ({'캐시 사용' if cached else '추론 실행'}, {time.perf_counter() - start:.1f}초)")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# 추론 백엔드 변환 / INT8 보정 / parity 검사
+# 사용 예:
+#   python model/export_backend.py export customknife_v1.1.pt --backend onnx-int8
+#   python model/export_backend.py parity customknife_v1.1.pt --backend onnx-int8
+# INT8 보정 이미지는 ver1.1/data/valid, parity 검사는 ver1.1/data/test 를 사용한다.
+# 그래서 INT8 변환/parity는 이 데이터와 같은 클래스로 학습한 나이프 모델만 허용 (COCO 사람 모델은 FP32 ONNX만).
+# parity 검사 결과(<모델>.parity.json)가 통과여야 backends.py가 INT8 모델을 불러온다.
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from dataset_utils import ROOT, data_dir, letterbox, list_images, make_data_yaml
+
+sys.path.append(ROOT)
+from backends import BACKENDS, QUANTIZED_BACKENDS, exported_path, parity_report_path
+
+
+def preprocess(path: str, imgsz: int):
+    # ultralytics 추론과 같은 전처리: letterbox -> RGB -> NCHW float32 0~1
+    image, _, _ = letterbox(cv2.imread(path), imgsz)
+    blob = image[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+    return np.ascontiguousarray(blob)
+
+
+def calibration_reader(image_paths, input_name: str, imgsz: int):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class ImageCalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self._paths = iter(image_paths)
+
+        def get_next(self):
+            path = next(self._paths, None)
+            return None if path is None else {input_name: preprocess(path, imgsz)}
+
+    return ImageCalibrationReader()
+
+
+def check_dataset_classes(weights: str):
+    # 보정/검사 데이터(ver1.1)의 클래스와 모델 클래스가 다르면 INT8 보정과 parity 결과가 의미 없음
+    import yaml
+    from ultralytics import YOLO
+
+    with open(os.path.join(data_dir("ver1.1"), "data.yaml"), encoding="utf-8") as f:
+        names = yaml.safe_load(f)["names"]
+    model_names = list(YOLO(weights).names.values())
+    if model_names != list(names):
+        sys.exit(f"{weights} 클래스 {model_names}가 ver1.1 데이터 클래스 {list(names)}와 다릅니다. "
+                 "INT8 변환/parity는 나이프 모델만 가능합니다 (다른 모델은 --backend onnx).")
+
+
+def export_onnx(weights: str, imgsz: int) -> str:
+    from ultralytics import YOLO
+
+    # 배치 추론을 위해 dynamic 축으로 변환
+    out = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+    target = exported_path(weights, "onnx")
+    if os.path.abspath(out) != os.path.abspath(target):
+        os.replace(out, target)
+    return target
+
+
+def export_onnx_int8(weights: str, imgsz: int, calib_images: int) -> str:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    fp32 = exported_path(weights, "onnx")
+    if not os.path.exists(fp32):
+        fp32 = export_onnx(weights, imgsz)
+    prepared = fp32.replace(".onnx", "_prep.onnx")
+    quant_pre_process(fp32, prepared)
+
+    input_name = ort.InferenceSession(prepared, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    images = list_images(os.path.join(data_dir("ver1.1"), "valid"))[:calib_images]
+    print(f"INT8 보정 이미지 {len(images)}장 (ver1.1/data/valid)")
+
+    target = exported_path(weights, "onnx-int8")
+    quantize_static(
+        prepared,
+        target,
+        calibration_reader(images, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+    )
+    os.remove(prepared)
+    return target
+
+
+def export_openvino_int8(weights: str, imgsz: int, calib_images: int) -> str:
+    from ultralytics import YOLO
+
+    # ultralytics가 data.yaml의 val(ver1.1/data/valid)로 NNCF 보정을 수행
+    yaml_path = make_data_yaml(data_dir("ver1.1"))
+    fraction = min(1.0, calib_images / max(len(list_images(os.path.join(data_dir("ver1.1"), "valid"))), 1))
+    out = YOLO(weights).export(format="openvino", int8=True, data=yaml_path, imgsz=imgsz, fraction=fraction)
+    target = exported_path(weights, "openvino-int8")
+    if os.path.abspath(out).rstrip(os.sep) != os.path.abspath(target):
+        os.replace(out, target)
+    return target
+
+
+def measure_latency(model, image_paths, imgsz: int, warmup: int = 3):
+    # 이미지 한 장씩 추론했을 때의 지연 시간(ms)
+    images = [cv2.imread(path) for path in image_paths]
+    for image in images[:warmup]:
+        model.predict(image, imgsz=imgsz, device="cpu", verbose=False)
+    times = []
+    for image in images:
+        start = time.perf_counter()
+        model.predict(image, imgsz=imgsz, device="cpu", verbose=False)
+        times.append(1000 * (time.perf_counter() - start))
+    times = np.array(times)
+    return {"mean": float(times.mean()), "p50": float(np.percentile(times, 50)), "p95": float(np.percentile(times, 95))}
+
+
+def parity(weights: str, backend: str, imgsz: int, max_map_drop: float, latency_images: int) -> bool:
+    from ultralytics import YOLO
+
+    yaml_path = make_data_yaml(data_dir("ver1.1"))
+    test_images = list_images(os.path.join(data_dir("ver1.1"), "test"))[:latency_images]
+    candidate = exported_path(weights, backend)
+
+    results = {}
+    for name, path in (("baseline", weights), ("candidate", candidate)):
+        model = YOLO(path, task="detect")
+        metrics = model.val(data=yaml_path, split="test", imgsz=imgsz, batch=1, device="cpu", plots=False, verbose=False)
+        results[name] = {
+            "path": path,
+            "map50": float(metrics.box.map50),
+            "map50_95": float(metrics.box.map),
+            "latency_ms": measure_latency(model, test_images, imgsz),
+        }
+
+    map_drop = results["baseline"]["map50_95"] - results["candidate"]["map50_95"]
+    speedup = results["baseline"]["latency_ms"]["mean"] / results["candidate"]["latency_ms"]["mean"]
+    report = {
+        "backend": backend,
+        "imgsz": imgsz,
+        "max_map_drop": max_map_drop,
+        "map_drop": map_drop,
+        "speedup": speedup,
+        "passed": map_drop <= max_map_drop,
+        **results,
+    }
+    with open(parity_report_path(candidate), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"{'':10s} {'mAP50':>8s} {'mAP50-95':>9s} {'ms/img':>8s}")
+    for name in ("baseline", "candidate"):
+        r = results[name]
+        print(f"{name:10s} {r['map50']:8.4f} {r['map50_95']:9.4f} {r['latency_ms']['mean']:8.1f}")
+    print(f"mAP50-95 차이: {map_drop:+.4f} (허용 {max_map_drop}), 속도 {speedup:.2f}배 -> {'통과' if report['passed'] else '실패'}")
+    return report["passed"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 백엔드 변환 및 parity 검사")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="ONNX / INT8 모델 생성")
+    export_parser.add_argument("weights")
+    export_parser.add_argument("--backend", choices=BACKENDS[1:], default="onnx")
+    export_parser.add_argument("--imgsz", type=int, default=640)
+    export_parser.add_argument("--calib-images", type=int, default=300, help="INT8 보정에 쓸 valid 이미지 수")
+
+    parity_parser = sub.add_parser("parity", help="원본 대비 mAP 차이와 지연 시간 비교")
+    parity_parser.add_argument("weights")
+    parity_parser.add_argument("--backend", choices=BACKENDS[1:], default="onnx-int8")
+    parity_parser.add_argument("--imgsz", type=int, default=640)
+    parity_parser.add_argument("--max-map-drop", type=float, default=0.01, help="허용하는 mAP50-95 감소량")
+    parity_parser.add_argument("--latency-images", type=int, default=100)
+
+    args = parser.parse_args()
+    if args.backend in QUANTIZED_BACKENDS or args.command == "parity":
+        check_dataset_classes(args.weights)
+    if args.command == "export":
+        if args.backend == "onnx":
+            out = export_onnx(args.weights, args.imgsz)
+        elif args.backend == "onnx-int8":
+            out = export_onnx_int8(args.weights, args.imgsz, args.calib_images)
+        else:
+            out = export_openvino_int8(args.weights, args.imgsz, args.calib_images)
+        print(f"저장: {out}")
+        if args.backend != "onnx":
+            print("사용 전에 parity 검사를 실행하세요: python model/export_backend.py parity", args.weights, "--backend", args.backend)
+    else:
+        sys.exit(0 if parity(args.weights, args.backend, args.imgsz, args.max_map_drop, args.latency_images) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# 데이터셋 캐시 (memmap) 생성 + 중복/누수 검사
+# - pack: 한 split의 이미지를 imgsz로 letterbox한 uint8 배열 하나(images.npy, memmap)로 저장하고,
+#   라벨은 전부 하나의 배열(labels.npy)에, 이미지별 시작 위치는 offsets.npy에 저장
+#   (학습할 때마다 JPEG 디코딩/텍스트 파싱을 반복하지 않음, PackedDataset으로 읽음)
+#   다시 실행하면 크기/수정 시각이 바뀐 파일만 새로 디코딩하고 나머지는 기존 캐시에서 복사
+#   (주의: 이미지 한 장만 추가해도 새 images.npy를 만들어 기존 memmap 전체를 복사함 -> 캐시 크기만큼 디스크 읽기/쓰기와
+#    잠시 두 배의 디스크 공간이 필요. 제자리에서 늘리지 않는 것은 중간에 멈춰도 기존 캐시를 그대로 두기 위함)
+# - dedup: 모든 버전/split 이미지의 perceptual hash(pHash)를 계산해서
+#   같은 split 안의 중복과, 학습 이미지와 겹치는 valid/test 이미지(누수)를 찾음
+# 사용 예:
+#   python model/pack_dataset.py pack --version ver1.1 --split train --imgsz 640
+#   python model/pack_dataset.py dedup --threshold 4 --exclude-out leaked_eval_images.txt
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from dataset_utils import ROOT, data_dir, file_key, label_path, letterbox, list_images, read_labels
+
+CACHE_DIR = os.path.join(ROOT, "cache", "datasets")
+VERSIONS = ("ver1.0", "ver1.1")
+SPLITS = ("train", "valid", "test")
+EVAL_SPLITS = ("valid", "test")
+
+
+# === memmap 캐시 ===
+
+def _load_sample(image_path: str, imgsz: int):
+    image = cv2.imread(image_path)
+    h, w = image.shape[:2]
+    boxed, ratio, (pad_x, pad_y) = letterbox(image, imgsz)
+    # 라벨을 letterbox된 이미지 기준 0~1 좌표로 변환
+    labels = read_labels(label_path(image_path)).copy()
+    labels[:, 1] = (labels[:, 1] * w * ratio + pad_x) / imgsz
+    labels[:, 2] = (labels[:, 2] * h * ratio + pad_y) / imgsz
+    labels[:, 3] *= w * ratio / imgsz
+    labels[:, 4] *= h * ratio / imgsz
+    return boxed, (h, w), labels
+
+
+def pack(split_dir: str, out_dir: str, imgsz: int = 640, workers: int = 8) -> dict:
+    images = list_images(split_dir)
+    entries = [{"name": os.path.basename(path), "image": file_key(path), "label": file_key(label_path(path))}
+               for path in images]
+
+    # 이전 캐시에서 그대로 쓸 수 있는 이미지 (imgsz와 파일 크기/수정 시각이 같음)
+    old = PackedDataset(out_dir) if os.path.exists(os.path.join(out_dir, "meta.json")) else None
+    reuse = {}
+    if old is not None and old.meta["imgsz"] == imgsz:
+        old_entries = {entry["name"]: (i, entry) for i, entry in enumerate(old.meta["files"])}
+        reuse = {j: old_entries[entry["name"]][0] for j, entry in enumerate(entries)
+                 if old_entries.get(entry["name"], (None, None))[1] == entry}
+        if len(reuse) == len(entries) == len(old):
+            return {"images": len(entries), "decoded": 0, "reused": len(entries)}
+
+    tmp_dir = out_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    images_path = os.path.join(tmp_dir, "images.npy")
+    if entries:
+        out_images = np.lib.format.open_memmap(images_path, mode="w+", dtype=np.uint8,
+                                               shape=(len(entries), imgsz, imgsz, 3))
+    else:
+        # 빈 split: 크기가 0인 memmap은 만들 수 없으므로 빈 배열로 저장
+        out_images = np.zeros((0, imgsz, imgsz, 3), dtype=np.uint8)
+        np.save(images_path, out_images)
+    shapes = np.zeros((len(entries), 2), dtype=np.int32)  # 원본 (h, w)
+    labels = [None] * len(entries)
+
+    # 바뀌지 않은 이미지는 디코딩 대신 기존 memmap에서 복사 (파일 전체를 새로 쓰는 것은 같음)
+    for j, i in reuse.items():
+        out_images[j] = old.images[i]
+        shapes[j] = old.shapes[i]
+        labels[j] = old.labels_of(i)
+
+    # 바뀐 이미지만 디코딩 (cv2는 GIL을 풀기 때문에 스레드로 병렬 처리)
+    todo = [j for j in range(len(entries)) if j not in reuse]
+    with ThreadPoolExecutor(workers) as pool:
+        for j, (boxed, shape, sample_labels) in zip(todo, pool.map(lambda j: _load_sample(images[j], imgsz), todo)):
+            out_images[j] = boxed
+            shapes[j] = shape
+            labels[j] = sample_labels
+    if entries:
+        out_images.flush()
+    del out_images
+
+    counts = np.array([len(sample_labels) for sample_labels in labels], dtype=np.int64)
+    np.save(os.path.join(tmp_dir, "labels.npy"),
+            np.concatenate(labels).astype(np.float32) if labels else np.zeros((0, 5), dtype=np.float32))
+    np.save(os.path.join(tmp_dir, "offsets.npy"), np.concatenate([[0], np.cumsum(counts)]))
+    np.save(os.path.join(tmp_dir, "shapes.npy"), shapes)
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"imgsz": imgsz, "split_dir": os.path.abspath(split_dir), "files": entries}, f)
+
+    # 새 캐시를 다 만든 뒤에 교체 (중간에 멈춰도 기존 캐시는 그대로)
+    if old is not None:
+        old.close()
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return {"images": len(entries), "decoded": len(todo), "reused": len(reuse)}
+
+
+class PackedDataset:
+    # pack()으로 만든 캐시 읽기: dataset[i] -> (letterbox 이미지 (imgsz, imgsz, 3) BGR, 라벨 (N, 5))
+    def __init__(self, out_dir: str):
+        with open(os.path.join(out_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        # 빈 split은 memmap 없이 빈 배열로 읽음
+        self.images = np.load(os.path.join(out_dir, "images.npy"), mmap_mode="r" if self.meta["files"] else None)
+        self.labels = np.load(os.path.join(out_dir, "labels.npy"))
+        self.offsets = np.load(os.path.join(out_dir, "offsets.npy"))
+        self.shapes = np.load(os.path.join(out_dir, "shapes.npy"))
+
+    def __len__(self):
+        return len(self.images)
+
+    def labels_of(self, i):
+        return self.labels[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i):
+        return self.images[i], self.labels_of(i)
+
+    def close(self):
+        # Windows에서는 memmap이 열려 있으면 폴더를 지울 수 없음
+        mmap = getattr(self.images, "_mmap", None)
+        self.images = None
+        if mmap is not None:
+            mmap.close()
+
+
+# === perceptual hash ===
+
+HASH_SIZE = 8
+DCT_SIZE = 32
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dct_matrix(n: int):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+def phash(grays):
+    # (N, 32, 32) 흑백 이미지 -> (N,) uint64, DCT를 행렬곱 한 번으로 전체 이미지에 적용
+    d = dct_matrix(DCT_SIZE)
+    coeffs = d @ np.asarray(grays, dtype=np.float32) @ d.T
+    low = coeffs[:, :HASH_SIZE, :HASH_SIZE].reshape(len(grays), -1)
+    bits = low > np.median(low[:, 1:], axis=1, keepdims=True)  # DC 성분은 기준값에서 제외
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def _hash_gray(path: str):
+    gray = cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    return cv2.resize(gray, (DCT_SIZE, DCT_SIZE), interpolation=cv2.INTER_AREA)
+
+
+def split_hashes(version: str, split: str, workers: int = 8):
+    # split의 (이미지 경로, pHash), 바뀐 파일만 다시 계산하도록 CACHE_DIR에 보관
+    images = list_images(os.path.join(data_dir(version), split))
+    keys = np.array([file_key(path) for path in images], dtype=np.int64).reshape(-1, 2)
+    cache = os.path.join(CACHE_DIR, f"phash-{version}-{split}.npz")
+    known = {}
+    if os.path.exists(cache):
+        old = np.load(cache)
+        known = {(name, int(size), int(mtime)): value
+                 for name, (size, mtime), value in zip(old["names"], old["keys"], old["hashes"])}
+
+    names = [os.path.basename(path) for path in images]
+    hashes = np.zeros(len(images), dtype=np.uint64)
+    todo = []
+    for j, (name, (size, mtime)) in enumerate(zip(names, keys)):
+        value = known.get((name, int(size), int(mtime)))
+        if value is None:
+            todo.append(j)
+        else:
+            hashes[j] = value
+    if todo:
+        with ThreadPoolExecutor(workers) as pool:
+            grays = np.stack(list(pool.map(lambda j: _hash_gray(images[j]), todo)))
+        hashes[todo] = phash(grays)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.savez(cache, names=np.array(names), keys=keys, hashes=hashes)
+    return images, hashes
+
+
+def hamming(a, b):
+    # (n,) x (m,) uint64 -> (n, m) 다른 비트 수
+    x = np.ascontiguousarray(a[:, None] ^ b[None, :])
+    return POPCOUNT[x.view(np.uint8).reshape(len(a), len(b), 8)].sum(axis=2, dtype=np.uint8)
+
+
+def similar_pairs(a, b, threshold: int, same: bool = False, chunk: int = 1024):
+    # 거리가 threshold 이하인 (i, j, 거리), same이면 a와 b가 같은 배열 (i < j만)
+    pairs = []
+    for start in range(0, len(a), chunk):
+        distance = hamming(a[start:start + chunk], b)
+        if same:
+            rows = np.arange(start, start + len(distance))[:, None]
+            distance = np.where(np.arange(len(b))[None, :] > rows, distance, 255)
+        i, j = np.nonzero(distance <= threshold)
+        pairs += [(int(start + x), int(y), int(distance[x, y])) for x, y in zip(i, j)]
+    return pairs
+
+
+def dedup(threshold: int = 4, workers: int = 8):
+    sets = {f"{version}/{split}": split_hashes(version, split, workers)
+            for version in VERSIONS for split in SPLITS
+            if os.path.isdir(os.path.join(data_dir(version), split))}
+
+    def relative(path):
+        return os.path.relpath(path, ROOT)
+
+    report = {"threshold": threshold, "images": {name: len(paths) for name, (paths, _) in sets.items()},
+              "duplicates": {}, "leakage": {}}
+    # split 안의 중복 이미지
+    for name, (paths, hashes) in sets.items():
+        pairs = similar_pairs(hashes, hashes, threshold, same=True)
+        report["duplicates"][name] = [[relative(paths[i]), relative(paths[j]), d] for i, j, d in pairs]
+    # 학습 이미지와 겹치는 valid/test 이미지 (같은 버전 + 다른 버전)
+    for eval_name, (eval_paths, eval_hashes) in sets.items():
+        if not eval_name.endswith(EVAL_SPLITS):
+            continue
+        for train_name, (train_paths, train_hashes) in sets.items():
+            if not train_name.endswith("/train"):
+                continue
+            pairs = similar_pairs(eval_hashes, train_hashes, threshold)
+            report["leakage"][f"{eval_name} <- {train_name}"] = [
+                [relative(eval_paths[i]), relative(train_paths[j]), d] for i, j, d in pairs]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터셋 memmap 캐시 생성 / pHash 중복·누수 검사")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = sub.add_parser("pack")
+    pack_parser.add_argument("--version", default="ver1.1", choices=VERSIONS)
+    pack_parser.add_argument("--split", nargs="+", default=list(SPLITS), choices=SPLITS)
+    pack_parser.add_argument("--imgsz", type=int, default=640)
+    pack_parser.add_argument("--workers", type=int, default=8)
+
+    dedup_parser = sub.add_parser("dedup")
+    dedup_parser.add_argument("--threshold", type=int, default=4, help="같은 이미지로 볼 최대 pHash 비트 차이")
+    dedup_parser.add_argument("--workers", type=int, default=8)
+    dedup_parser.add_argument("--output", default=os.path.join(CACHE_DIR, "dedup_report.json"))
+    dedup_parser.add_argument("--exclude-out", help="누수된 valid/test 이미지 목록을 저장할 파일")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        for split in args.split:
+            start = time.perf_counter()
+            out_dir = os.path.join(CACHE_DIR, f"{args.version}-{split}-{args.imgsz}")
+            stats = pack(os.path.join(data_dir(args.version), split), out_dir, args.imgsz, args.workers)
+            print(f"{args.version}/{split}: {stats['images']}장 (새로 디코딩 {stats['decoded']}, 재사용 {stats['reused']}) "
+                  f"{time.perf_counter() - start:.1f}초 -> {out_dir}")
+        return
+
+    start = time.perf_counter()
+    report = dedup(args.threshold, args.workers)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    for name, pairs in report["duplicates"].items():
+        print(f"[중복] {name}: {len(pairs)}쌍")
+    leaked = sorted({eval_path for pairs in report["leakage"].values() for eval_path, _, _ in pairs})
+    for name, pairs in report["leakage"].items():
+        print(f"[누수] {name}: {len({eval_path for eval_path, _, _ in pairs})}장")
+    print(f"누수된 valid/test 이미지 {len(leaked)}장, {time.perf_counter() - start:.1f}초 -> {args.output}")
+    if args.exclude_out:
+        with open(args.exclude_out, "w", encoding="utf-8") as f:
+            f.writelines(path + "\n" for path in leaked)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# 추론 모델 관리 (지연 로드 + warm-up + 무중단 교체)
+# - 첫 추론 요청이 올 때 모델을 로드하고, warm-up 추론까지 끝나야 ready
+# - 교체: 새 가중치를 백그라운드에서 로드 + warm-up 한 뒤, 배치와 배치 사이에 한 번에 바꿈
+#   warm-up이 실패하면 기존 모델을 그대로 사용 (롤백), 카메라 스트림은 끊기지 않음
+#   주의: 교체하는 동안에는 기존 모델과 새 모델이 함께 메모리에 올라감 (추론 프로세스를 쓰면 프로세스 풀이 두 벌,
+#   INFERENCE_PROCESSES x 모델 메모리가 두 배). 메모리가 빠듯하면 INFERENCE_PROCESSES를 줄이거나 재시작해서 교체할 것
+# - 첫 프레임까지 걸린 시간(time_to_first_frame)과 교체 시간을 기록 (/models, /metrics)
+# InferenceScheduler의 runner로 그대로 사용한다 (항목 list -> 항목별 결과 list).
+import threading
+import time
+
+from fastapi import APIRouter, Body, HTTPException
+
+
+class ModelRegistry:
+    def __init__(self, specs: dict, loader):
+        # specs: {이름: (가중치 경로, 추론 옵션)}
+        # loader(specs) -> (runner, close): 로드와 warm-up까지 끝낸 runner, 실패하면 예외 (pipeline.load_models)
+        self.specs = dict(specs)
+        self.loader = loader
+        self.state = "idle"  # idle -> loading -> ready, 교체 중에는 swapping (기존 모델로 계속 추론)
+        self.version = 0  # 교체에 성공할 때마다 증가
+        self.previous_specs = None  # 직전 버전 (rollback()으로 되돌림)
+        self.time_to_first_frame = None  # 생성(서버 시작)부터 첫 추론 결과까지(초)
+        self.last_swap = None  # {"specs", "ok", "seconds", "error"}
+        self.swaps = {"ok": 0, "failed": 0}
+        self._handle = None  # (runner, close)
+        self._created = time.perf_counter()
+        self._load_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+
+    def __call__(self, items):
+        while True:
+            handle = self._handle or self._load()
+            try:
+                outputs = handle[0](items)
+                break
+            except RuntimeError:
+                # 교체 직후 닫힌 이전 모델로 보낸 배치면 새 모델로 다시 실행
+                if handle is self._handle:
+                    raise
+        if self.time_to_first_frame is None:
+            self.time_to_first_frame = time.perf_counter() - self._created
+        return outputs
+
+    def _load(self):
+        # 여러 스케줄러 스레드가 동시에 요청해도 한 번만 로드
+        with self._load_lock:
+            if self._handle is None:
+                self.state = "loading"
+                try:
+                    self._handle = self.loader(self.specs)
+                except Exception:
+                    self.state = "idle"
+                    raise
+                self.state = "ready"
+                self.version = 1
+        return self._handle
+
+    def swap(self, specs: dict):
+        # specs: 바꿀 모델만 {이름: (가중치 경로, 추론 옵션)}, 성공하면 True
+        if not self._swap_lock.acquire(blocking=False):
+            raise RuntimeError("이미 모델을 교체하는 중입니다.")
+        try:
+            new_specs = {**self.specs, **specs}
+            start = time.perf_counter()
+            loaded = self._handle is not None
+            if loaded:
+                self.state = "swapping"
+            try:
+                handle = self.loader(new_specs)
+            except Exception as e:
+                self.state = "ready" if loaded else "idle"
+                self.swaps["failed"] += 1
+                self.last_swap = {"specs": specs, "ok": False, "seconds": time.perf_counter() - start,
+                                  "error": str(e)}
+                return False
+            with self._load_lock:
+                old, self._handle = self._handle, handle  # 다음 배치부터 새 모델
+                self.previous_specs, self.specs = self.specs, new_specs
+                self.version += 1
+                self.state = "ready"
+            self.swaps["ok"] += 1
+            self.last_swap = {"specs": specs, "ok": True, "seconds": time.perf_counter() - start, "error": None}
+        finally:
+            self._swap_lock.release()
+        if old is not None:
+            old[1]()  # 이전 모델로 실행 중인 배치가 끝난 뒤 정리
+        return True
+
+    def swap_async(self, specs: dict) -> bool:
+        # 백그라운드 교체 시작, 이미 교체 중이면 False
+        if self._swap_lock.locked():
+            return False
+        threading.Thread(target=self._swap_quietly, args=(specs,), name="model-swap", daemon=True).start()
+        return True
+
+    def _swap_quietly(self, specs):
+        try:
+            self.swap(specs)
+        except RuntimeError:
+            pass  # 동시에 들어온 다른 교체 요청이 먼저 시작됨
+
+    def rollback(self) -> bool:
+        if self.previous_specs is None:
+            return False
+        return self.swap_async(self.previous_specs)
+
+    def close(self):
+        handle, self._handle = self._handle, None
+        if handle is not None:
+            handle[1]()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "version": self.version,
+            "specs": {name: {"weights": path, "options": options} for name, (path, options) in self.specs.items()},
+            "time_to_first_frame": self.time_to_first_frame,
+            "last_swap": self.last_swap,
+        }
+
+
+def make_router(registry: ModelRegistry) -> APIRouter:
+    router = APIRouter()
+
+    @router.get("/models")
+    async def models_status():
+        return registry.status()
+
+    @router.post("/models/swap", status_code=202)
+    def swap_model(entry: dict = Body(...)):
+        # {"name": "knife", "weights": "customknife_v1.2.pt", "options": {"conf": 0.7}} (options 생략 시 기존 값)
+        name, weights = entry.get("name"), entry.get("weights")
+        if name not in registry.specs or not isinstance(weights, str):
+            raise HTTPException(status_code=400, detail=f"name({', '.join(registry.specs)})과 weights가 필요합니다.")
+        options = entry.get("options", registry.specs[name][1])
+        if not registry.swap_async({name: (weights, options)}):
+            raise HTTPException(status_code=409, detail="이미 모델을 교체하는 중입니다.")
+        return registry.status()
+
+    @router.post("/models/rollback", status_code=202)
+    def rollback_model():
+        if registry.previous_specs is None:
+            raise HTTPException(status_code=400, detail="되돌릴 이전 모델이 없습니다.")
+        if not registry.rollback():
+            raise HTTPException(status_code=409, detail="이미 모델을 교체하는 중입니다.")
+        return registry.status()
+
+    return router
@@ -0,0 +1,29 @@
+# 여러 스레드가 공유하는 YOLO 모델 묶음
+# 같은 모델 객체를 동시에 호출하지 않도록 모델별 락으로 직렬화한다.
+import threading
+
+from backends import model_backend, resolve_weights
+
+
+class ModelSet:
+    def __init__(self, models: dict):
+        # models: {이름: (모델, 추론 옵션 dict)}
+        self.models = models
+        self.locks = {name: threading.Lock() for name in models}
+
+    @classmethod
+    def load(cls, specs: dict, backend: str = "pytorch", quantized_models=()):
+        # specs: {이름: (가중치 경로, 추론 옵션 dict)}
+        # backend: backends.BACKENDS 중 하나, 변환된 모델 파일을 대신 불러옴
+        # quantized_models: INT8 백엔드를 적용할 모델 이름 (나머지는 FP32, backends.model_backend)
+        from ultralytics import YOLO
+
+        return cls({
+            name: (YOLO(resolve_weights(path, model_backend(name, backend, quantized_models)), task="detect"), options)
+            for name, (path, options) in specs.items()
+        })
+
+    def predict(self, name: str, frames, **overrides):
+        model, options = self.models[name]
+        with self.locks[name]:
+            return model(frames, **{**options, **overrides})
@@ -0,0 +1,83 @@
+# 프레임 차이 기반 움직임 감지 게이트
+# 대부분의 CCTV 프레임은 정지 화면이므로 움직임이 있을 때(또는 keyframe 주기마다)만 추론한다.
+# 축소된 흑백 프레임을 마지막으로 추론한 프레임과 비교하므로 느린 움직임도 누적되어 감지된다.
+# 추론 간격(INFER_INTERVAL 등) 때문에 검사하지 않는 프레임도 tick()으로 세므로 keyframe_interval은 항상 프레임 단위.
+import time
+
+import cv2
+import numpy as np
+
+
+def region_mask(regions, size):
+    # 0~1 비율 좌표의 사각형 목록 -> size(w, h) 크기의 bool 마스크
+    if not regions:
+        return None
+    w, h = size
+    mask = np.zeros((h, w), dtype=bool)
+    for x1, y1, x2, y2 in regions:
+        mask[int(y1 * h):int(np.ceil(y2 * h)), int(x1 * w):int(np.ceil(x2 * w))] = True
+    return mask
+
+
+class MotionGate:
+    def __init__(self, threshold=0.01, pixel_threshold=25, keyframe_interval=30, size=(80, 60), regions=None):
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.keyframe_interval = keyframe_interval
+        self.size = size
+        self.mask = region_mask(regions, size)
+
+        self._reference = None  # 마지막으로 추론한 프레임 (축소 흑백)
+        self._since_inference = 0
+
+        self.frames = 0  # 게이트를 거친 전체 프레임 (tick 포함)
+        self.checked = 0  # 추론 차례라서 움직임을 검사한 프레임
+        self.skipped = 0  # 검사했지만 움직임이 없어 추론을 건너뛴 프레임
+        self.gate_time = 0.0  # 게이트 계산에 쓴 총 시간(초)
+        self.last_motion = 0.0  # 마지막 프레임의 변화 픽셀 비율
+
+    def tick(self) -> bool:
+        # 추론 차례가 아닌 프레임 (검사 없이 keyframe 카운터만 증가), 항상 False
+        if self._reference is not None:
+            self._since_inference += 1
+        self.frames += 1
+        return False
+
+    def check(self, frame) -> bool:
+        # 추론 차례인 프레임: True면 추론 실행, False면 직전 탐지 결과 재사용
+        start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+
+        if self._reference is None:
+            run = True
+        else:
+            changed = cv2.absdiff(small, self._reference) > self.pixel_threshold
+            if self.mask is not None:
+                self.last_motion = changed[self.mask].mean() if self.mask.any() else 0.0
+            else:
+                self.last_motion = changed.mean()
+            self._since_inference += 1
+            run = bool(self.last_motion >= self.threshold or self._since_inference >= self.keyframe_interval)
+
+        if run:
+            self._reference = small
+            self._since_inference = 0
+        else:
+            self.skipped += 1
+        self.frames += 1
+        self.checked += 1
+        self.gate_time += time.perf_counter() - start
+        return run
+
+    def stats(self) -> dict:
+        # skip_ratio: 검사한 프레임 중 움직임이 없어 건너뛴 비율, inference_ratio: 전체 프레임 중 실제 추론 비율
+        return {
+            "frames": self.frames,
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / self.checked if self.checked else 0.0,
+            "inference_ratio": (self.checked - self.skipped) / self.frames if self.frames else 0.0,
+            "gate_ms": 1000 * self.gate_time / self.checked if self.checked else 0.0,
+            "last_motion": float(self.last_motion),
+        }
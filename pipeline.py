@@ -0,0 +1,525 @@
+# 캡처 / 추론 / 박스 그리기+인코딩 단계를 분리한 파이프라인
+# - FrameGrabber: 카메라 버퍼를 계속 비우면서 최신 프레임 하나만 보관 (카메라당 스레드 1개)
+# - 추론: 여러 카메라 프레임을 배치로 묶어 프로세스 풀에서 실행 (GIL 회피)
+#   모델은 ModelRegistry(model_registry.py)가 첫 요청 때 로드 + warm-up 하고, 실행 중 교체할 수 있음
+# - AnnotateEncoder: 박스 그리기와 JPEG 인코딩을 별도 스레드 풀에서 실행
+#   (overlay 모드면 박스를 그리지 않고 원본 JPEG + 박스 JSON을 보내 브라우저가 그림)
+#   영상 모드면 박스를 그린 프레임을 on_frame으로 넘겨 H.264 조각으로도 인코딩 (video_segmenter.py)
+# - CameraWorker: 카메라 하나의 캡처 -> 움직임 게이트 -> 추론 -> 추적 -> 인코딩 루프
+# 각 단계의 크기는 config.py에서 따로 조정한다.
+# 추론 프로세스를 쓰면 원본 프레임은 카메라별 공유 메모리 링(shm_ring.py)에 쓰고 참조만 보낸다 (config.SHM_TRANSPORT).
+# observe(cam_id, 단계 이름, 소요 시간) 콜백을 넘기면 단계별 시간을 기록할 수 있다 (benchmark.py 등).
+import functools
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+import config
+from broadcaster import encode_jpeg
+from cascade import knife_crops, merge_knives
+from detections import boxes_array
+from frame_slot import FrameSlot
+from inference_scheduler import InferenceScheduler
+from model_registry import ModelRegistry
+from model_set import ModelSet
+from motion_gate import MotionGate
+from shm_ring import FrameRef, FrameRing
+from tracker import Tracker
+
+
+def _predict(models: ModelSet, name, frames, sizes):
+    # 카메라별 추론 해상도(imgsz, None이면 모델 기본값)가 다르면 같은 해상도끼리 묶어서 실행
+    results = [None] * len(frames)
+    for size in set(sizes):
+        index = [i for i, s in enumerate(sizes) if s == size]
+        overrides = {} if size is None else {"imgsz": size}
+        for i, result in zip(index, models.predict(name, [frames[i] for i in index], **overrides)):
+            results[i] = result
+    return results
+
+
+def detect_batch(models: ModelSet, items):
+    # items: [(축소 프레임, 원본 프레임 또는 None[, 추론 해상도 imgsz])] -> [(persons, knives, 모델별 추론 시간)]
+    # 모델별 추론 시간은 배치 전체 기준 (모든 항목에 같은 값)
+    frames = [item[0] for item in items]
+    sizes = [item[2] if len(item) > 2 else None for item in items]
+    start = time.perf_counter()
+    person_results = _predict(models, "person", frames, sizes)
+    person_time = time.perf_counter() - start
+    persons = [boxes_array(result, cls=0) for result in person_results]  # 낮은 점수 검출도 추적기로 넘김
+
+    start = time.perf_counter()
+    if config.CASCADE_MODE:
+        # 모든 카메라의 사람 주변 영역을 모아 나이프 모델을 한 번만 실행한 뒤 카메라별로 나눔
+        regions, crops, crop_sizes, counts = [], [], [], []
+        # 나이프 탐색 범위는 새 트랙을 만들 만큼 확실한 사람 주변으로만 한정
+        high = config.TRACK_HIGH_THRESH["person"]
+        for (frame, full_frame, *_), boxes, size in zip(items, persons, sizes):
+            item_regions, item_crops = knife_crops(boxes[boxes[:, 4] >= high], frame, full_frame, config.CASCADE_PAD)
+            regions.append(item_regions)
+            crops.extend(item_crops)
+            crop_sizes.extend([size] * len(item_crops))  # 부하 조절로 낮춘 imgsz는 잘라낸 영역에도 적용
+            counts.append(len(item_crops))
+        crop_results = _predict(models, "knife", crops, crop_sizes) if crops else []
+        knives, offset = [], 0
+        for (frame, full_frame, *_), item_regions, count in zip(items, regions, counts):
+            knives.append(merge_knives(item_regions, crop_results[offset:offset + count], frame, full_frame))
+            offset += count
+    else:
+        knives = [boxes_array(result) for result in _predict(models, "knife", frames, sizes)]
+    knife_time = time.perf_counter() - start
+
+    timings = {"person": person_time, "knife": knife_time}
+    return [(item_persons, item_knives, timings) for item_persons, item_knives in zip(persons, knives)]
+
+
+# === 추론 프로세스 ===
+
+_worker_models = None
+_worker_rings = {}  # 링 이름 -> 추론 프로세스에서 연 FrameRing
+
+
+def _init_worker(specs, settings):
+    global _worker_models
+    import torch
+
+    # spawn된 프로세스는 config를 새로 import 하므로 부모 프로세스의 설정값을 그대로 적용
+    for key, value in settings.items():
+        setattr(config, key, value)
+
+    torch.set_num_threads(config.INFERENCE_THREADS)
+    cv2.setNumThreads(1)
+    _worker_models = ModelSet.load(specs, config.INFERENCE_BACKEND, config.INT8_MODELS)
+    warmup(_worker_models)
+
+
+def _worker_ready(delay):
+    time.sleep(delay)  # 다른 프로세스도 작업을 가져갈 수 있도록 잠깐 붙잡아 둠
+    return os.getpid()
+
+
+def _resolve(item):
+    # FrameRef -> (축소 프레임, 원본 프레임 또는 None), 원본은 복사 없이 공유 메모리 view를 그대로 사용
+    # 카메라 스레드는 결과를 받을 때까지 다음 프레임을 쓰지 않으므로 추론 중에 슬롯이 덮어써지지 않음
+    if not isinstance(item, FrameRef):
+        return item
+    ring = _worker_rings.get(item.name)
+    if ring is None:
+        # 재연결로 해상도가 바뀌거나 카메라가 삭제되면 링이 새로 생기므로 오래된 링부터 닫음
+        if len(_worker_rings) >= 64:
+            _worker_rings.pop(next(iter(_worker_rings))).close()
+        ring = _worker_rings[item.name] = FrameRing.attach(item.name)
+    view = ring.read(item.slot)
+    if view is None or view.version != item.version:
+        raise RuntimeError(f"공유 메모리 슬롯이 덮어써졌습니다: {item.name}[{item.slot}]")
+    full_frame = view.frame
+    frame = cv2.resize(full_frame, item.resolution)
+    return frame, full_frame if config.CASCADE_MODE and config.CASCADE_FULL_RES else None, item.imgsz
+
+
+def _detect_in_worker(items):
+    return detect_batch(_worker_models, [_resolve(item) for item in items])
+
+
+def warmup(models: ModelSet, size=(320, 240)):
+    # 첫 추론은 초기화 때문에 느리므로 준비 완료 전에 빈 프레임으로 모든 모델을 미리 실행
+    frame = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    for _ in range(config.MODEL_WARMUP_RUNS):
+        for name in models.models:
+            models.predict(name, [frame])
+
+
+def load_models(specs: dict):
+    # specs를 로드 + warm-up 해서 (runner, close) 반환 (ModelRegistry의 loader), 실패하면 예외
+    if config.INFERENCE_PROCESSES > 0:
+        # fork는 torch 스레드와 충돌할 수 있으므로 spawn 사용
+        pool = ProcessPoolExecutor(
+            config.INFERENCE_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(specs, {key: value for key, value in vars(config).items() if key.isupper()}),
+        )
+        try:
+            # 모든 프로세스의 로드 + warm-up이 끝날 때까지 대기 (initializer가 실패하면 BrokenProcessPool)
+            ready = set()
+            while len(ready) < config.INFERENCE_PROCESSES:
+                futures = [pool.submit(_worker_ready, 0.1) for _ in range(config.INFERENCE_PROCESSES)]
+                ready.update(future.result() for future in futures)
+        except Exception:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+        def runner(items):
+            return pool.submit(_detect_in_worker, items).result()
+
+        return runner, functools.partial(pool.shutdown, wait=True)
+
+    models = ModelSet.load(specs, config.INFERENCE_BACKEND, config.INT8_MODELS)
+    warmup(models)
+    return functools.partial(detect_batch, models), lambda: None
+
+
+def make_scheduler(specs: dict) -> InferenceScheduler:
+    # specs: {"person": (가중치, 옵션), "knife": (가중치, 옵션)}
+    # 모델은 첫 배치가 들어올 때 로드 (scheduler.runner.swap()으로 교체)
+    registry = ModelRegistry(specs, load_models)
+    if config.INFERENCE_PROCESSES > 0:
+        concurrency = config.INFERENCE_PROCESSES
+        shared_memory = config.SHM_TRANSPORT
+    else:
+        concurrency = 1
+        shared_memory = False  # 같은 프로세스 안에서는 프레임을 그대로 넘기면 됨
+
+    return InferenceScheduler(registry, config.BATCH_MAX_SIZE, config.BATCH_MAX_WAIT, concurrency, shared_memory)
+
+
+# === 캡처 단계 ===
+
+class FrameGrabber:
+    def __init__(self, source, fps: float = None, loop: bool = False):
+        # fps: 영상 파일을 실제 카메라처럼 일정 속도로 재생 (None이면 읽히는 대로)
+        # loop: 영상 파일이 끝나면 처음부터 다시 재생
+        self.source = source
+        self.cap = cv2.VideoCapture(source)
+        self.fps = fps
+        self.loop = loop
+        self.slot = FrameSlot(1)  # 최신 프레임만 유지, 추론이 느리면 오래된 프레임은 버림
+        self.seq = 0
+        self._running = False
+        self._thread = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name=f"grab-{self.source}", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        next_time = time.monotonic()
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret and self.loop and self.seq > 0:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.cap.read()
+            if not ret:
+                break
+            if self.fps:
+                next_time += 1 / self.fps
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self.seq += 1
+            self.slot.put((self.seq, time.time(), frame))
+        self.slot.put(None)  # 스트림 종료 알림
+
+    def read(self, timeout=None):
+        # (seq, 캡처 시각, 프레임) 또는 스트림이 끝나면 None
+        return self.slot.get(timeout=timeout)
+
+    def stop(self):
+        # 다음 프레임을 읽은 뒤 루프 종료 (read()는 None 반환)
+        self._running = False
+
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+        self.cap.release()
+
+
+# === 박스 그리기 + 인코딩 단계 ===
+
+def annotate(frame, persons, knives):
+    # 좌표는 배열 단위로 한 번에 정수 list로 변환
+    for x1, y1, x2, y2 in persons[:, :4].astype(int).tolist():
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(frame, "Person", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+
+    for x1, y1, x2, y2 in knives[:, :4].astype(int).tolist():
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 255), 2)
+        cv2.putText(frame, "Knife", (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2)
+    return frame
+
+
+def overlay_message(seq, frame, persons, knives) -> str:
+    # 브라우저가 그릴 박스: {"seq", "w", "h", "boxes": [[x1, y1, x2, y2, cls(0: 사람, 1: 칼)], ...]}
+    # annotate()와 같은 박스
+    boxes = np.concatenate([np.c_[persons[:, :4], np.zeros(len(persons))],
+                            np.c_[knives[:, :4], np.ones(len(knives))]]).astype(int)
+    return json.dumps({"seq": seq, "w": frame.shape[1], "h": frame.shape[0], "boxes": boxes.tolist()},
+                      separators=(",", ":"))
+
+
+class EncodedFrame(NamedTuple):
+    cam_id: int
+    seq: int
+    captured_at: float  # 캡처 시각 (time.time), 전송 시점까지의 지연 계산용
+    jpeg: bytes
+    overlay: str = None  # overlay 모드일 때 박스 JSON (jpeg는 박스를 그리지 않은 원본)
+
+
+class AnnotateEncoder:
+    def __init__(self, workers: int = 4, quality: int = 80, observe=None, on_encoded=None, overlay: bool = False,
+                 on_frame=None):
+        # on_encoded(EncodedFrame): 슬롯에 넣은 프레임을 함께 받을 콜백 (클립 녹화 등)
+        # overlay: 박스를 그리지 않고 EncodedFrame.overlay(JSON)로 따로 전달
+        # on_frame(cam_id, seq, captured_at, 박스를 그린 프레임): 순서대로 호출 (VideoSegmenter.push)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="encode")
+        self.quality = quality
+        self.overlay = overlay
+        self.observe = observe
+        self.on_encoded = on_encoded
+        self.on_frame = on_frame
+        self.dropped = 0  # 순서가 뒤바뀌어 버린 프레임 수
+        self._last_seq = {}
+        self._lock = threading.Lock()
+
+    def close(self):
+        # 제출된 인코딩을 마친 뒤 스레드 종료 (클립/영상 인코더가 마지막 프레임까지 받음)
+        self.pool.shutdown(wait=True)
+
+    def reset(self, cam_id):
+        # 카메라를 다시 열면 seq가 1부터 시작하므로 초기화
+        with self._lock:
+            self._last_seq.pop(cam_id, None)
+
+    def submit(self, cam_id, seq, captured_at, frame, persons, knives, slot: FrameSlot):
+        return self.pool.submit(self._run, cam_id, seq, captured_at, frame, persons, knives, slot)
+
+    def _run(self, cam_id, seq, captured_at, frame, persons, knives, slot):
+        start = time.perf_counter()
+        if self.overlay:
+            overlay = overlay_message(seq, frame, persons, knives)
+        else:
+            overlay = None
+            annotate(frame, persons, knives)
+        annotated = time.perf_counter()
+        jpeg = encode_jpeg(frame, self.quality)
+        if self.observe is not None:
+            self.observe(cam_id, "annotate", annotated - start)
+            self.observe(cam_id, "encode", time.perf_counter() - annotated)
+        if jpeg is None:
+            return
+        if overlay is not None and self.on_frame is not None:
+            annotate(frame, persons, knives)  # 영상 조각에는 overlay 모드여도 박스를 그려 넣음 (JPEG는 이미 인코딩됨)
+        with self._lock:
+            # 여러 스레드가 인코딩하므로 순서가 뒤바뀐 오래된 프레임은 버림
+            if seq <= self._last_seq.get(cam_id, 0):
+                self.dropped += 1
+                return
+            self._last_seq[cam_id] = seq
+            encoded = EncodedFrame(cam_id, seq, captured_at, jpeg, overlay)
+            slot.put(encoded)
+            if self.on_frame is not None:
+                self.on_frame(cam_id, seq, captured_at, frame)  # 영상 인코더에는 seq 순서대로 넣음
+        if self.on_encoded is not None:
+            self.on_encoded(encoded)
+
+
+# === 카메라 루프 ===
+
+def ring_boxes(persons, knives, scale):
+    # 축소 해상도 박스 -> 원본 좌표 (N, 6) [x1, y1, x2, y2, conf, cls(0: 사람, 1: 칼)]
+    boxes = np.concatenate([np.c_[persons, np.zeros(len(persons))], np.c_[knives, np.ones(len(knives))]])
+    boxes[:, [0, 2]] *= scale[0]
+    boxes[:, [1, 3]] *= scale[1]
+    return boxes
+
+
+class CameraWorker:
+    def __init__(self, cam_id, source, frame_slot: FrameSlot, scheduler: InferenceScheduler,
+                 encoder: AnnotateEncoder, on_alert=None, observe=None, fps: float = None, loop: bool = False,
+                 resolution=(320, 240), max_fps: float = None, min_conf: dict = None, motion_threshold: float = None,
+                 reconnect: bool = False, controller=None):
+        # on_alert(cam_id): 칼 트랙이 새로 확정됐을 때 호출
+        # fps/loop: 영상 파일 재생 속도/반복 (FrameGrabber), max_fps: 처리 FPS 상한 (남는 프레임은 건너뜀)
+        # min_conf: {"person": 0.6, "knife": 0.8} 카메라별 새 트랙 임계값 (config.TRACK_HIGH_THRESH보다 높을 때만 의미 있음)
+        # reconnect: 스트림이 끊기거나 열리지 않으면 간격을 늘려가며 다시 연결 (stop() 전까지)
+        # controller: LoadController, 지연을 보고하고 현재 단계의 추론 간격/해상도/FPS 상한을 따름
+        self.cam_id = cam_id
+        self.source = source
+        self.frame_slot = frame_slot
+        self.scheduler = scheduler
+        self.encoder = encoder
+        self.on_alert = on_alert
+        self.observe = observe
+        self.grab_fps = fps
+        self.loop = loop
+        self.resolution = tuple(resolution)
+        self.max_fps = max_fps
+        self.min_conf = min_conf or {}
+        self.reconnect = reconnect
+        self.controller = controller
+        self.grabber = FrameGrabber(source, fps, loop)  # 최신 프레임만 보관하는 캡처 스레드
+        self.connected = False
+        self.reconnects = 0
+        self.ring = None  # 공유 메모리 링 (scheduler.shared_memory일 때), 최신 원본 프레임 + 탐지 박스
+        self._stopped = threading.Event()
+
+        self.gate = MotionGate(motion_threshold or config.MOTION_THRESHOLD, config.MOTION_PIXEL_THRESHOLD,
+                               config.MOTION_KEYFRAME_INTERVAL, config.MOTION_GATE_SIZE, config.MOTION_MASKS.get(cam_id))
+        # 추론하지 않은 프레임에도 박스를 이어서 보여주는 추적기
+        self.trackers = {
+            name: Tracker(max(config.TRACK_HIGH_THRESH[name], self.min_conf.get(name, 0.0)), config.TRACK_LOW_THRESH,
+                          config.TRACK_MATCH_IOU, config.TRACK_MAX_AGE, config.KNIFE_CONFIRM_K, config.KNIFE_CONFIRM_M)
+            for name in ("person", "knife")
+        }
+        self.frames = 0
+        self.inference_errors = 0  # 추론 실패 횟수 (실패한 프레임은 추적기 예측으로 대신함)
+        self.fps = 0.0  # 처리 FPS (지수 이동 평균)
+        self._last_frame_time = None
+
+    def _observe(self, stage, start):
+        now = time.perf_counter()
+        if self.observe is not None:
+            self.observe(self.cam_id, stage, now - start)
+        return now
+
+    def run(self):
+        delay = config.RECONNECT_MIN_DELAY
+        while True:
+            if self.grabber.isOpened():
+                frames = self.frames
+                self.connected = True
+                self._stream()
+                self.connected = False
+                if self.frames > frames:
+                    delay = config.RECONNECT_MIN_DELAY  # 정상적으로 받다가 끊긴 경우
+            else:
+                self.grabber.release()
+                print(f"웹캠 {self.source}을 열 수 없습니다.")
+
+            if not self.reconnect or self._stopped.is_set():
+                break
+            # 연결 실패가 이어지면 재시도 간격을 두 배씩 늘림 (최대 RECONNECT_MAX_DELAY)
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, config.RECONNECT_MAX_DELAY)
+            self.reconnects += 1
+            self.grabber = FrameGrabber(self.source, self.grab_fps, self.loop)
+        self._close_ring()
+
+    def _ring_for(self, frame):
+        # 재연결 후 해상도가 바뀌었으면 링을 새로 만듦
+        if self.ring is not None and self.ring.shape != frame.shape:
+            self._close_ring()
+        if self.ring is None:
+            self.ring = FrameRing.create(frame.shape, config.SHM_RING_SLOTS)
+        return self.ring
+
+    def _close_ring(self):
+        if self.ring is not None:
+            ring, self.ring = self.ring, None
+            ring.unlink()
+            ring.close()  # 웹 서버가 스냅샷을 인코딩하는 중이면 끝날 때까지 기다림
+
+    def _infer(self, request):
+        # 모델 로드/교체 실패나 추론 프로세스 오류로 카메라 스레드가 죽지 않도록 잡아서 기록, 실패하면 None
+        try:
+            return self.scheduler.infer(self.cam_id, request)
+        except Exception as e:
+            self.inference_errors += 1
+            if self.inference_errors == 1 or self.inference_errors % 100 == 0:
+                print(f"카메라 {self.cam_id} 추론 실패 ({self.inference_errors}회): {e!r}")
+            return None
+
+    def _stream(self):
+        self.grabber.start()
+        self.encoder.reset(self.cam_id)
+        self.scheduler.register(self.cam_id)
+        last_processed = None
+        try:
+            while True:
+                item = self.grabber.read()
+                if item is None:
+                    break
+                seq, captured_at, full_frame = item
+                start = time.perf_counter()
+                shed = self.controller.settings(self.cam_id) if self.controller is not None else {}
+                # 처리 FPS 상한을 넘는 프레임은 건너뜀 (부하가 높으면 제어기가 더 낮춤)
+                max_fps = min(filter(None, (self.max_fps, shed.get("max_fps"))), default=None)
+                if max_fps and last_processed is not None and start - last_processed < 1 / max_fps:
+                    continue
+                last_processed = start
+                if self._last_frame_time is not None and start > self._last_frame_time:
+                    rate = 1 / (start - self._last_frame_time)
+                    self.fps = rate if self.fps == 0 else 0.9 * self.fps + 0.1 * rate
+                self._last_frame_time = start
+                if self.observe is not None:
+                    self.observe(self.cam_id, "grab", max(time.time() - captured_at, 0.0))
+
+                frame = cv2.resize(full_frame, self.resolution)
+
+                # INFER_INTERVAL 프레임마다, 그리고 움직임이 있거나 keyframe일 때만 추론
+                # (차례가 아닌 프레임도 게이트에 세어서 keyframe 간격은 MOTION_KEYFRAME_INTERVAL 프레임 그대로)
+                due = self.frames % (config.INFER_INTERVAL * shed.get("interval", 1)) == 0
+                if config.MOTION_GATE:
+                    run_inference = self.gate.check(frame) if due else self.gate.tick()
+                else:
+                    run_inference = due
+                self.frames += 1
+
+                slot = None
+                if run_inference and self.scheduler.shared_memory:
+                    # 추론할 프레임만 링에 복사 (스냅샷은 마지막으로 추론한 프레임 + 박스)
+                    ring = self._ring_for(full_frame)
+                    slot = ring.write(full_frame, seq, captured_at)
+                    scale = (full_frame.shape[1] / self.resolution[0], full_frame.shape[0] / self.resolution[1])
+                if not (config.CASCADE_MODE and config.CASCADE_FULL_RES):
+                    full_frame = None  # 추론 프로세스로 보낼 필요 없음
+                start = self._observe("preprocess", start)
+
+                detections = None
+                if run_inference:
+                    # 사람 및 나이프 추론 (추론 프로세스에서 다른 카메라 프레임과 묶어서 처리)
+                    if slot is not None:
+                        request = FrameRef(ring.name, slot, ring.version(slot), self.resolution, shed.get("imgsz"))
+                    else:
+                        request = (frame, full_frame, shed.get("imgsz"))
+                    detections = self._infer(request)
+                if detections is not None:
+                    detected_persons, detected_knives, timings = detections
+                    start = self._observe("inference", start)
+                    if self.observe is not None:
+                        for model, seconds in timings.items():
+                            self.observe(self.cam_id, f"inference_{model}", seconds)
+                    self.trackers["person"].update(detected_persons)
+                    self.trackers["knife"].update(detected_knives)
+                else:
+                    # 추론하지 않은(또는 실패한) 프레임은 추적기가 박스 위치를 예측
+                    for tracker in self.trackers.values():
+                        tracker.predict()
+                persons, _ = self.trackers["person"].boxes()
+                knives, _ = self.trackers["knife"].boxes()
+                if slot is not None:
+                    ring.set_boxes(slot, ring_boxes(persons, knives, scale))
+                self._observe("track", start)
+
+                # 박스 그리기 + JPEG 인코딩은 별도 단계에서 처리한 뒤 프레임 슬롯에 넣음
+                future = self.encoder.submit(self.cam_id, seq, captured_at, frame, persons, knives, self.frame_slot)
+                if self.controller is not None and not self.frame_slot.has_listeners():
+                    # 시청자가 있으면 웹소켓 전송 경로에서 슬롯 대기까지 포함한 지연을 보고하므로,
+                    # 시청자가 없을 때만 캡처부터 인코딩이 끝나 슬롯에 들어갈 때까지의 지연을 보고
+                    future.add_done_callback(lambda _, captured_at=captured_at: self.controller.report(
+                        self.cam_id, time.time() - captured_at, captured_at))
+
+                # 최근 M번의 추론 중 K번 이상 검출된 칼 트랙이 새로 생겼을 때만 알림
+                if self.trackers["knife"].new_confirmed() and self.on_alert is not None:
+                    self.on_alert(self.cam_id)
+        finally:
+            self.scheduler.unregister(self.cam_id)
+            self.grabber.release()
+
+    def stop(self):
+        # 다음 프레임을 읽은 뒤 루프 종료, 재연결도 하지 않음
+        self._stopped.set()
+        self.grabber.stop()
@@ -0,0 +1,531 @@
+# 웹 서버 앱 구성 (webcam_test.py, web/cctv_monitor.py가 같은 앱을 사용)
+# create_app(camera_config): 카메라 목록 파일을 받아 스케줄러 / 카메라 / 이벤트 저장소 / 클립 / 경보음 / 영상 모드 /
+# 부하 제어기와 대시보드 라우트를 만든 FastAPI 앱 반환 (시작과 종료는 lifespan에서)
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse
+import config
+from pipeline import AnnotateEncoder, make_scheduler
+from camera_registry import CameraRegistry, make_router as make_camera_router
+from model_registry import make_router as make_model_router
+from load_controller import LoadController, make_router as make_load_router
+import metrics
+from event_store import EventStore, make_router as make_event_router
+from clip_recorder import ClipRecorder, make_router as make_clip_router
+from alarm_service import AlarmService
+from video_segmenter import VideoSegmenter, make_router as make_video_router
+
+DASHBOARD_HTML = """
+<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8" />
+    <title>실시간 CCTV</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            margin: 0;
+            display: flex;
+            height: 100vh;
+        }
+        .menu {
+            width: 20%;
+            background-color: #01387A;
+            color: white;
+            padding: 20px;
+            text-align: center;
+        }
+        .menu img {
+            width: 80%;
+            margin-bottom: 20px;
+        }
+        .video-grid {
+            display: grid;
+            width: 80%;
+            height: 100%;
+        }
+        .video-container {
+            position: relative;
+            overflow: hidden;
+            height: 100%;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            background-color: black;
+        }
+        canvas, video {
+            width: 100%;
+            height: 100%;
+            object-fit: contain;
+            background-color: #000;
+        }
+        .alertBox {
+            display: none;
+            position: absolute;
+            top: 20px;
+            left: 20px;
+            background-color: rgba(255, 76, 76, 0.85);
+            color: white;
+            padding: 15px 20px;
+            border-radius: 10px;
+            font-size: 16px;
+            box-shadow: 0 0 15px rgba(255, 0, 0, 0.7);
+            z-index: 10;
+        }
+        .event-list {
+            list-style: none;
+            padding: 0;
+            margin: 10px 0;
+            max-height: 40vh;
+            overflow-y: auto;
+            text-align: left;
+            font-size: 13px;
+        }
+        .event-list li {
+            padding: 4px 0;
+            border-bottom: 1px solid rgba(255, 255, 255, 0.2);
+        }
+        .alertBox button {
+            margin-left: 15px;
+            background-color: white;
+            color: #ff4c4c;
+            border: none;
+            padding: 5px 10px;
+            font-weight: bold;
+            border-radius: 5px;
+            cursor: pointer;
+        }
+    </style>
+</head>
+<body>
+    <div class="menu">
+        <div class="logo-container">
+            <img src="/static/logo2.png" alt="로고">
+        </div>
+        <h1>실시간 CCTV<br>모니터링 시스템</h1>
+        <div>
+            <label class="dropdown-label" onclick="toggleDropdown('date-dropdown')">
+                일자별 다시보기
+            </label>
+            <span onclick="toggleDropdown('date-dropdown')" style="cursor: pointer; font-size: 1.5em;">&#9662;</span>
+            <select id="date-dropdown" class="dropdown">
+                <option value="" selected disabled>월 선택</option>
+            </select>
+        </div>
+        <div>
+            <label class="dropdown-label" onclick="toggleDropdown('location-dropdown')">
+                장소별 다시보기
+            </label>
+            <span onclick="toggleDropdown('location-dropdown')" style="cursor: pointer; font-size: 1.5em;">&#9662;</span>
+            <select id="location-dropdown" class="dropdown">
+                <option value="" selected disabled>장소 선택</option>
+            </select>
+        </div>
+        <ul id="event-list" class="event-list"></ul>
+        <button id="event-more" style="display: none;">더 보기</button>
+        <div class="logo-container">
+            <img src="/static/logo.png" alt="하단 로고">
+        </div>
+    </div>
+    
+    <!-- 카메라 화면은 /cameras 목록으로 생성 -->
+    <div id="video-grid" class="video-grid"></div>
+
+    <script>
+        function drawOverlay(ctx, canvas, overlay) {
+            // 서버가 보낸 박스를 캔버스 크기에 맞춰 그림 (cls 0: 사람, 1: 칼)
+            const sx = canvas.width / overlay.w, sy = canvas.height / overlay.h;
+            ctx.lineWidth = 2;
+            ctx.font = '16px Arial';
+            for (const [x1, y1, x2, y2, cls] of overlay.boxes) {
+                ctx.strokeStyle = ctx.fillStyle = cls === 0 ? '#00ff00' : '#ff0000';
+                ctx.strokeRect(x1 * sx, y1 * sy, (x2 - x1) * sx, (y2 - y1) * sy);
+                ctx.fillText(cls === 0 ? 'Person' : 'Knife', x1 * sx, y1 * sy - 10);
+            }
+        }
+
+        function connectWebSocket(camId) {
+            const canvas = document.getElementById(`cam${camId}`);
+            const ctx = canvas.getContext('2d');
+            const ws = new WebSocket(`wss://${location.host}/video/live/${camId}`);
+
+            let img = new Image();
+            let overlay = null;  // overlay 모드: 바로 다음 JPEG에 그릴 박스 (JSON -> JPEG 순서로 도착)
+            img.onload = () => {
+                URL.revokeObjectURL(img.src);  // 프레임마다 만든 Blob URL을 바로 해제 (메모리가 계속 늘지 않도록)
+                ctx.clearRect(0, 0, canvas.width, canvas.height);
+                ctx.drawImage(img, 0, 0, canvas.width, canvas.height);
+                if (img.overlay) drawOverlay(ctx, canvas, img.overlay);
+            };
+
+            ws.binaryType = 'blob';
+            ws.onmessage = (event) => {
+                if (typeof event.data === 'string') {
+                    overlay = JSON.parse(event.data);
+                    return;
+                }
+                const blob = new Blob([event.data], { type: 'image/jpeg' });
+                img.overlay = overlay;
+                overlay = null;
+                if (img.src) URL.revokeObjectURL(img.src);  // 이전 프레임이 그려지기 전에 덮어쓰는 경우
+                img.src = URL.createObjectURL(blob);
+            };
+
+            ws.onerror = (e) => console.error(`WebSocket error on camera ${camId}`, e);
+            ws.onclose = () => console.warn(`WebSocket closed for camera ${camId}`);
+        }
+
+        function connectVideoSegments(camId) {
+            // 영상 모드: 코덱 JSON -> init 세그먼트 -> fMP4 조각 순서로 받아 Media Source Extensions로 재생
+            const video = document.getElementById(`cam${camId}`);
+            const ws = new WebSocket(`wss://${location.host}/video/segments/${camId}`);
+            let buffer = null;
+            let pending = [];
+
+            function pump() {
+                if (!buffer || buffer.updating) return;
+                const ranges = buffer.buffered;
+                if (ranges.length) {
+                    const end = ranges.end(ranges.length - 1);
+                    // 뒤처졌거나 건너뛴 조각이 있으면 최신 위치로 이동
+                    if (end - video.currentTime > 3) video.currentTime = Math.max(ranges.start(ranges.length - 1), end - 0.5);
+                    // 지난 구간은 지워서 버퍼 메모리를 일정하게 유지
+                    if (video.currentTime - ranges.start(0) > 30) {
+                        buffer.remove(ranges.start(0), video.currentTime - 10);
+                        return;
+                    }
+                }
+                if (pending.length) buffer.appendBuffer(pending.shift());
+            }
+
+            function reset(codec) {
+                // 처음 연결했거나 서버 인코더가 다시 시작됨 (해상도 변경 등): MediaSource를 새로 만듦
+                const mediaSource = new MediaSource();
+                if (video.src) URL.revokeObjectURL(video.src);
+                video.src = URL.createObjectURL(mediaSource);
+                buffer = null;
+                pending = [];
+                mediaSource.addEventListener('sourceopen', () => {
+                    buffer = mediaSource.addSourceBuffer(`video/mp4; codecs="${codec}"`);
+                    buffer.mode = 'segments';
+                    buffer.addEventListener('updateend', pump);
+                    video.play().catch(() => {});
+                    pump();
+                }, { once: true });
+            }
+
+            ws.binaryType = 'arraybuffer';
+            ws.onmessage = (event) => {
+                if (typeof event.data === 'string') {
+                    reset(JSON.parse(event.data).codec);
+                    return;
+                }
+                pending.push(event.data);
+                if (pending.length > 30) pending.splice(1, pending.length - 10);  // 탭이 멈췄다 돌아오면 맨 앞(init일 수 있음)과 최신 조각만 남김
+                pump();
+            };
+
+            ws.onerror = (e) => console.error(`Video WebSocket error on camera ${camId}`, e);
+            ws.onclose = () => console.warn(`Video WebSocket closed for camera ${camId}`);
+        }
+
+        function showAlert(camId, message) {
+            const alertBox = document.getElementById(`alertBox${camId}`);
+            const alertMessage = alertBox.querySelector('.alertMessage');
+            alertMessage.textContent = message;
+            alertBox.style.display = 'block';
+        }
+
+        // 스트리밍 모드: 서버 기본값(config.STREAM_MODE), 주소에 ?mode=jpeg / ?mode=video로 바꿔서 전송량 비교
+        // MediaSource가 없는 브라우저는 JPEG로 재생
+        const streamMode = new URLSearchParams(location.search).get('mode') || '__STREAM_MODE__';
+        const useVideo = streamMode === 'video' && __VIDEO_AVAILABLE__ && 'MediaSource' in window;
+
+        // 카메라 목록으로 화면 격자 + 장소 메뉴 생성
+        async function buildGrid() {
+            const cameras = await (await fetch('/cameras')).json();
+            const grid = document.getElementById('video-grid');
+            grid.style.gridTemplateColumns = `repeat(${Math.ceil(Math.sqrt(cameras.length || 1))}, 1fr)`;
+            for (const camera of cameras) {
+                const container = document.createElement('div');
+                container.className = 'video-container';
+                container.innerHTML = `
+                    ${useVideo
+                        ? `<video id="cam${camera.id}" muted autoplay playsinline></video>`
+                        : `<canvas id="cam${camera.id}" width="640" height="480"></canvas>`}
+                    <div id="alertBox${camera.id}" class="alertBox">
+                        <span class="alertMessage"></span>
+                        <button class="alertCloseBtn">확인</button>
+                    </div>`;
+                container.querySelector('.alertCloseBtn').onclick = () => {
+                    document.getElementById(`alertBox${camera.id}`).style.display = 'none';
+                };
+                grid.appendChild(container);
+                if (useVideo) connectVideoSegments(camera.id);
+                else connectWebSocket(camera.id);
+                connectAlertWebSocket(camera.id);
+            }
+
+            const locationDropdown = document.getElementById('location-dropdown');
+            for (const place of [...new Set(cameras.map((camera) => camera.location).filter(Boolean))].sort()) {
+                const option = document.createElement('option');
+                option.value = place;
+                option.textContent = place;
+                locationDropdown.appendChild(option);
+            }
+        }
+
+        function connectAlertWebSocket(camId) {
+            const ws = new WebSocket(`wss://${location.host}/event/${camId}`);
+            ws.onmessage = (event) => {
+                const data = JSON.parse(event.data);
+                if (data.type === "alert") {
+                    showAlert(camId, data.message);
+                }
+            };
+            ws.onerror = (e) => console.error("Alert WS error", e);
+            ws.onclose = () => console.warn("Alert WS closed");
+        }
+
+        // 다시보기 메뉴: 저장된 흉기 감지 이벤트를 월별/장소별로 조회 (/events)
+        let eventQuery = null;
+        let eventCursor = null;
+
+        function toggleDropdown(id) {
+            document.getElementById(id).focus();
+        }
+
+        async function loadEvents(query, append) {
+            const params = new URLSearchParams({ type: "knife", limit: 20, ...query });
+            if (append && eventCursor) params.set("cursor", eventCursor);
+            const response = await fetch(`/events?${params}`);
+            const data = await response.json();
+            const list = document.getElementById('event-list');
+            if (!append) list.innerHTML = '';
+            if (!append && data.events.length === 0) {
+                list.innerHTML = '<li>감지 기록이 없습니다.</li>';
+            }
+            for (const event of data.events) {
+                const item = document.createElement('li');
+                item.textContent = `${new Date(event.ts * 1000).toLocaleString()} ${event.location} - ${event.message}`;
+                if (event.clip) {
+                    // 알림 전후 녹화 클립 (multipart JPEG 또는 영상 모드면 mp4, 새 탭에서 재생)
+                    const link = document.createElement('a');
+                    link.href = `/clips/${event.clip}`;
+                    link.target = '_blank';
+                    link.textContent = ' ▶';
+                    link.style.color = 'white';
+                    item.appendChild(link);
+                }
+                list.appendChild(item);
+            }
+            eventQuery = query;
+            eventCursor = data.next;
+            document.getElementById('event-more').style.display = data.next ? 'inline-block' : 'none';
+        }
+
+        // 월 메뉴: 감지 기록이 있는 달만 (YYYY-MM, 최근 달부터), 해가 바뀌어도 이전 해 기록을 볼 수 있음
+        async function buildMonths() {
+            const summary = await (await fetch('/events/summary?type=knife')).json();
+            const dateDropdown = document.getElementById('date-dropdown');
+            for (const [month, count] of Object.entries(summary.months)) {
+                const [year, mm] = month.split('-');
+                const option = document.createElement('option');
+                option.value = month;
+                option.textContent = `${year}년 ${Number(mm)}월 (${count})`;
+                dateDropdown.appendChild(option);
+            }
+        }
+
+        document.getElementById('date-dropdown').onchange = (e) => {
+            loadEvents({ month: e.target.value }, false);
+        };
+        document.getElementById('location-dropdown').onchange = (e) => {
+            loadEvents({ location: e.target.value }, false);
+        };
+        document.getElementById('event-more').onclick = () => loadEvents(eventQuery, true);
+
+        buildGrid();
+        buildMonths();
+    </script>
+</body>
+</html>
+"""
+
+
+def create_app(camera_config: str = config.CAMERA_CONFIG) -> FastAPI:
+    # camera_config: 카메라 목록 파일 (파일이 없으면 config.DEFAULT_CAMERAS)
+    # 서버 프로세스에서만 호출 (추론 프로세스(spawn)가 이 모듈을 __mp_main__으로 다시 import 해도
+    # 이벤트 DB / 클립 / 영상 인코더 / 경보음 / 카메라 목록 / 스케줄러를 만들지 않도록 모듈 수준에서는 생성하지 않음)
+    @asynccontextmanager
+    async def lifespan(app):
+        scheduler.start()
+        event_store.start()
+        clip_recorder.start()
+        alarms.start()
+        if segmenter is not None:
+            segmenter.start()
+        if config.LOAD_SHEDDING:
+            load_controller.start()
+        cameras.start()
+        yield
+        # 카메라 스레드를 먼저 멈춰 공유 메모리 링을 닫은 뒤 스케줄러와 추론 프로세스 풀 종료
+        cameras.stop()
+        scheduler.stop()
+        scheduler.runner.close()
+        encoder.close()
+        # 남은 이벤트/클립을 저장하고 ffmpeg 프로세스 정리
+        if config.LOAD_SHEDDING:
+            load_controller.stop()
+        if segmenter is not None:
+            segmenter.stop()
+        clip_recorder.stop()
+        event_store.stop()
+        alarms.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(metrics.router)  # /metrics, /debug/stats, /debug/profile
+
+    # 감지 이벤트 저장소 (일자별/장소별 다시보기 메뉴에서 조회)
+    event_store = EventStore(config.EVENT_DB_PATH, config.EVENT_BATCH_SIZE, config.EVENT_FLUSH_INTERVAL)
+    app.include_router(make_event_router(event_store))  # /events, /events/summary
+    # 알림 전후 구간 클립 (인코딩된 프레임을 카메라별로 잠깐 보관, 영상 모드면 H.264 조각을 그대로 .mp4로 저장)
+    video_mode = config.STREAM_MODE == "video"
+    clip_recorder = ClipRecorder(config.CLIP_DIR, config.CLIP_PRE_SECONDS, config.CLIP_POST_SECONDS, config.CLIP_MAX_FRAMES,
+                                 video=video_mode)
+    app.include_router(make_clip_router(clip_recorder))  # /clips/{name}
+
+    def on_encoded(frame):
+        # 카메라별 JPEG 인코딩 양 (시청자 수와 무관한 스트림 하나의 초당 바이트)
+        metrics.registry.rate("cctv_stream_bytes_per_second", len(frame.jpeg) + len(frame.overlay or ""),
+                              camera=frame.cam_id, mode="jpeg", stage="encoded")
+        if not video_mode:
+            clip_recorder.push(frame)
+
+    def on_segment(segment):
+        metrics.registry.rate("cctv_stream_bytes_per_second", len(segment.data), camera=segment.cam_id, mode="video",
+                              stage="encoded")
+        clip_recorder.push_segment(segment)
+
+    def on_sent(cam_id, size, mode):
+        # 모든 시청자에게 실제로 보낸 양 (ngrok 터널 대역폭)
+        metrics.registry.inc("cctv_bytes_sent_total", size, camera=cam_id, mode=mode)
+        metrics.registry.rate("cctv_stream_bytes_per_second", size, camera=cam_id, mode=mode, stage="sent")
+
+    # 영상 모드: 박스를 그린 프레임을 카메라당 한 번 H.264 fMP4 조각으로 인코딩 (/video/segments/{cam_id})
+    segmenter = VideoSegmenter(config.VIDEO_FFMPEG, config.VIDEO_SEGMENT_SECONDS, config.VIDEO_CRF, config.VIDEO_PRESET,
+                               config.VIDEO_SEGMENT_DEPTH, config.VIDEO_QUEUE_SIZE, on_segment=on_segment) if video_mode else None
+    if segmenter is not None:
+        app.include_router(make_video_router(segmenter, on_sent=lambda cam_id, size: on_sent(cam_id, size, "video")))
+        metrics.registry.add_collector(metrics.video_collector(segmenter))
+
+    # 모든 카메라 프레임을 모아 추론 프로세스 풀에서 배치로 추론 (모델 설정은 config.MODEL_SPECS)
+    scheduler = make_scheduler(config.MODEL_SPECS)
+    # 박스 그리기 + JPEG 인코딩 단계
+    encoder = AnnotateEncoder(config.ENCODE_THREADS, config.JPEG_QUALITY, observe=metrics.registry.observe_stage,
+                              on_encoded=on_encoded, overlay=config.OVERLAY_MODE,
+                              on_frame=segmenter.push if segmenter is not None else None)
+
+    # 알람 함수 수정 -> 상황별 조건문 설정
+    # 조건별 음성 종류 다양화 / 음성 길이 줄여서 짧은 상황 대응되도록 할 것 / 경보음도 추가 (사이렌 소리)
+    # 경찰청 규정? 같은거 찾아보기 (보행 신호 자동 연장 시스템 표준 규격) ->ppt 상에도 추가해 볼 것 (참고/소리 크기.종류.성별etc)
+    # 레벨별 소리는 시작할 때 한 번만 읽고, 재생은 스레드 하나가 우선순위 순서로 처리 (중복 알림은 합침)
+    alarms = AlarmService(config.ALARM_SOUNDS, config.ALARM_LEVELS, config.ALARM_CAMERA_WINDOW, config.ALARM_GLOBAL_WINDOW)
+
+    def on_alert(cam_id):
+        # 감지 이벤트 있으면 큐에 추가
+        # 상황별 음성을 다르게 한 설계서가 있었으면 좋겠음. 
+        # 어느 상황에 어떤 음성이 나오고 어떤 안내가 나오는지를 구체적으로 작성할 것 (표준화하기기)
+        event_slot = cameras.event_slots.get(cam_id)
+        if event_slot is not None:
+            event_slot.put({"type": "alert", "message": "⚠️ 흉기 감지!"})
+        metrics.registry.inc("cctv_alarms_total", camera=cam_id)
+        clip = clip_recorder.trigger(cam_id)
+        event_store.add(cam_id, cameras.location(cam_id), "knife", "흉기 감지", clip=clip)
+        alarms.trigger(cam_id, "critical")
+
+    def on_load_change(event):
+        # 부하 제어기가 카메라 품질 단계를 바꿀 때마다 이벤트로 기록 (/events?type=load)
+        action = "품질 낮춤" if event["direction"] == "degrade" else "품질 복구"
+        event_store.add(event["camera"], cameras.location(event["camera"]), "load",
+                        f"{action} {event['from']} -> {event['to']} (최대 지연 {event['max_latency']:.2f}초)",
+                        ts=event["ts"])
+
+    # 부하가 높으면 우선순위가 낮은 카메라부터 추론 간격/해상도/FPS를 낮춤 (config.LOAD_SHED_LEVELS)
+    load_controller = LoadController(config.LOAD_SHED_LEVELS, config.LOAD_TARGET_LATENCY, config.LOAD_HEADROOM,
+                                     config.LOAD_CONTROL_INTERVAL, on_change=on_load_change)
+
+    # 카메라 목록 (camera_config), 카메라마다 캡처 -> 움직임 게이트 -> 추론 -> 추적 -> 박스 그리기/인코딩 (pipeline.py)
+    cameras = CameraRegistry(scheduler, encoder, camera_config, on_alert=on_alert, observe=metrics.registry.observe_stage,
+                             controller=load_controller if config.LOAD_SHEDDING else None, segmenter=segmenter)
+    app.include_router(make_camera_router(cameras))  # /cameras
+    metrics.registry.add_collector(
+        metrics.pipeline_collector(cameras.workers, cameras.frame_slots, cameras.video_broadcasters, encoder))
+    # 모델은 첫 프레임이 들어올 때 로드, 재시작 없이 가중치 교체 (POST /models/swap)
+    app.include_router(make_model_router(scheduler.runner))  # /models, /models/swap, /models/rollback
+    metrics.registry.add_collector(metrics.model_collector(scheduler.runner))
+    app.include_router(make_load_router(load_controller))  # /load
+    metrics.registry.add_collector(metrics.load_collector(load_controller))
+    metrics.registry.add_collector(metrics.alarm_collector(alarms))
+
+    @app.get("/")
+    async def home():
+        html_content = DASHBOARD_HTML.replace("__STREAM_MODE__", config.STREAM_MODE)
+        html_content = html_content.replace("__VIDEO_AVAILABLE__", "true" if segmenter is not None else "false")
+        return HTMLResponse(content=html_content)
+
+    @app.get("/debug/motion")
+    async def motion_stats():
+        # 카메라별 추론 skip 비율과 게이트 계산 비용
+        return {cam_id: worker.gate.stats() for cam_id, worker in list(cameras.workers.items())}
+
+    @app.websocket("/video/live/{cam_id}")
+    async def video_stream(websocket: WebSocket, cam_id: int):
+        await websocket.accept()
+        broadcaster = cameras.video_broadcasters.get(cam_id)
+        if broadcaster is None:
+            await websocket.close(code=1008)
+            return
+        subscriber = broadcaster.subscribe()
+        try:
+            while True:
+                frame = await subscriber.get()
+                if frame is None:
+                    await websocket.close()  # 카메라 삭제
+                    break
+                if frame.overlay is not None:
+                    # 박스 JSON을 먼저 보내고 바로 뒤에 원본 JPEG (브라우저가 둘을 짝지어 그림)
+                    await websocket.send_text(frame.overlay)
+                await websocket.send_bytes(frame.jpeg)
+                on_sent(cam_id, len(frame.jpeg) + len(frame.overlay or ""), "jpeg")
+                if config.LOAD_SHEDDING:
+                    # 캡처부터 슬롯 대기 + 전송까지의 지연 (시청자가 실제로 보는 지연, 프레임당 한 번만 반영)
+                    load_controller.report(cam_id, time.time() - frame.captured_at, frame.captured_at)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    @app.websocket("/event/{cam_id}")
+    async def event_stream(websocket: WebSocket, cam_id: int):
+        await websocket.accept()
+        broadcaster = cameras.event_broadcasters.get(cam_id)
+        if broadcaster is None:
+            await websocket.close(code=1008)
+            return
+        subscriber = broadcaster.subscribe()
+        try:
+            while True:
+                event = await subscriber.get()
+                if event is None:
+                    await websocket.close()  # 카메라 삭제
+                    break
+                await websocket.send_json(event)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return app
+
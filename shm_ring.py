@@ -0,0 +1,170 @@
+# 카메라별 공유 메모리 프레임 링 버퍼 (multiprocessing.shared_memory)
+# - 고정 크기 프레임 슬롯 N개 + 슬롯마다 작은 헤더 (버전, 프레임 번호, 캡처 시각, 탐지 박스)
+# - 생산자는 슬롯에 바로 덮어쓰고, 소비자(다른 프로세스 포함)는 최신 슬롯을 복사 없이 numpy view로 읽음
+# - 잠금 대신 seqlock: 쓰는 동안 버전이 홀수, 다 쓰면 짝수
+#   읽기 전후의 버전이 같고 짝수여야 온전한 프레임 (다르면 읽는 도중 덮어쓴 것이므로 버림)
+# - 추론 프로세스에는 프레임 대신 FrameRef(링 이름, 슬롯, 버전)만 보내서 큰 배열을 pickle 하지 않음
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+import numpy as np
+
+MAGIC = 0x43435456  # "CCTV"
+MAX_BOXES = 64  # 슬롯 헤더에 저장하는 최대 탐지 박스 수
+BOX_FIELDS = 6  # x1, y1, x2, y2, conf, cls
+GLOBAL_HEADER = 64
+SLOT_HEADER = 64 + MAX_BOXES * BOX_FIELDS * 4
+
+
+def _align(size: int, to: int = 64) -> int:
+    return (size + to - 1) // to * to
+
+
+class FrameRef(NamedTuple):
+    # 추론 프로세스로 보내는 프레임 참조
+    name: str
+    slot: int
+    version: int
+    resolution: tuple  # 추론에 쓸 축소 해상도 (너비, 높이)
+    imgsz: int = None  # 모델 입력 크기 (None이면 모델 기본값, 부하 제어기가 낮춤)
+
+
+class SlotView:
+    def __init__(self, ring, slot, version, frame_seq, timestamp, frame, boxes):
+        self.ring = ring
+        self.slot = slot
+        self.version = version
+        self.frame_seq = frame_seq
+        self.timestamp = timestamp
+        self.frame = frame  # 공유 메모리 view (복사 아님)
+        self.boxes = boxes  # (N, 6) 복사본
+
+    def valid(self) -> bool:
+        # frame view를 다 쓴 뒤 호출, 그 사이 생산자가 덮어썼거나 링이 닫혔으면 False
+        with self.ring._lock:
+            return not self.ring.closed and int(self.ring._version[self.slot]) == self.version
+
+
+class FrameRing:
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.closed = False  # close() 이후에는 읽지 않음 (재연결/삭제로 링이 바뀜)
+        self._lock = threading.RLock()  # 다른 스레드의 close()와 읽기가 겹치지 않도록 (쓰기는 close하는 스레드만 함)
+        buf = shm.buf
+        magic, slots, h, w, c = np.ndarray((5,), np.uint32, buf, offset=8)
+        if magic != MAGIC:
+            raise ValueError(f"{shm.name}은(는) 프레임 링이 아닙니다.")
+        self.slots = int(slots)
+        self.shape = (int(h), int(w), int(c))
+        frame_bytes = _align(int(h) * int(w) * int(c))
+        stride = SLOT_HEADER + frame_bytes
+        self._count = np.ndarray((1,), np.uint64, buf, offset=0)  # 지금까지 쓴 프레임 수
+        self._version = np.ndarray((self.slots,), np.uint64, buf, offset=GLOBAL_HEADER, strides=(stride,))
+        self._frame_seq = np.ndarray((self.slots,), np.uint64, buf, offset=GLOBAL_HEADER + 8, strides=(stride,))
+        self._timestamp = np.ndarray((self.slots,), np.float64, buf, offset=GLOBAL_HEADER + 16, strides=(stride,))
+        self._n_boxes = np.ndarray((self.slots,), np.uint32, buf, offset=GLOBAL_HEADER + 24, strides=(stride,))
+        self._boxes = [np.ndarray((MAX_BOXES, BOX_FIELDS), np.float32, buf, offset=GLOBAL_HEADER + i * stride + 64)
+                       for i in range(self.slots)]
+        self._frames = [np.ndarray(self.shape, np.uint8, buf, offset=GLOBAL_HEADER + i * stride + SLOT_HEADER)
+                        for i in range(self.slots)]
+
+    @classmethod
+    def create(cls, shape, slots: int = 4, name: str = None) -> "FrameRing":
+        h, w, c = shape
+        size = GLOBAL_HEADER + slots * (SLOT_HEADER + _align(h * w * c))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        np.ndarray((1,), np.uint64, shm.buf, offset=0)[0] = 0
+        np.ndarray((5,), np.uint32, shm.buf, offset=8)[:] = (MAGIC, slots, h, w, c)
+        ring = cls(shm, owner=True)
+        ring._version[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameRing":
+        # 같은 부모가 spawn한 프로세스는 부모의 resource tracker를 함께 쓰므로 따로 정리할 필요 없음
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def count(self) -> int:
+        return int(self._count[0])
+
+    def write(self, frame, frame_seq: int, timestamp: float, boxes=None) -> int:
+        # 다음 슬롯에 프레임을 복사하고 슬롯 번호 반환 (생산자는 카메라당 하나)
+        slot = self.count % self.slots
+        version = int(self._version[slot])
+        self._version[slot] = version + 1  # 홀수: 쓰는 중
+        np.copyto(self._frames[slot], frame)
+        self._frame_seq[slot] = frame_seq
+        self._timestamp[slot] = timestamp
+        self._write_boxes(slot, boxes)
+        self._version[slot] = version + 2
+        self._count[0] = self.count + 1
+        return slot
+
+    def set_boxes(self, slot: int, boxes):
+        # 추론이 끝난 뒤 탐지 결과만 갱신 (프레임은 그대로)
+        version = int(self._version[slot])
+        self._version[slot] = version + 1
+        self._write_boxes(slot, boxes)
+        self._version[slot] = version + 2
+
+    def _write_boxes(self, slot, boxes):
+        n = 0 if boxes is None else min(len(boxes), MAX_BOXES)
+        if n:
+            self._boxes[slot][:n] = np.asarray(boxes, dtype=np.float32)[:n, :BOX_FIELDS]
+        self._n_boxes[slot] = n
+
+    def reading(self):
+        # with ring.reading(): 블록 안에서 얻은 view.frame은 다른 스레드의 close()가 해제하지 않음
+        return self._lock
+
+    def version(self, slot: int) -> int:
+        return int(self._version[slot])
+
+    def read(self, slot: int, copy: bool = False, retries: int = 100):
+        # 슬롯 읽기, 계속 쓰는 중이거나 닫힌 링이면 None
+        with self._lock:
+            return None if self.closed else self._read(slot, copy, retries)
+
+    def _read(self, slot, copy, retries=100):
+        for _ in range(retries):
+            before = int(self._version[slot])
+            if before % 2:
+                time.sleep(0)
+                continue
+            frame_seq = int(self._frame_seq[slot])
+            timestamp = float(self._timestamp[slot])
+            boxes = self._boxes[slot][:int(self._n_boxes[slot])].copy()
+            frame = self._frames[slot].copy() if copy else self._frames[slot]
+            if int(self._version[slot]) == before:
+                return SlotView(self, slot, before, frame_seq, timestamp, frame, boxes)
+        return None
+
+    def latest(self, copy: bool = False):
+        # 가장 최근에 다 쓴 슬롯 (아직 프레임이 없거나 닫힌 링이면 None)
+        with self._lock:
+            if self.closed:
+                return None
+            count = self.count
+            if count == 0:
+                return None
+            return self._read((count - 1) % self.slots, copy)
+
+    def close(self):
+        # reading() 블록이 끝날 때까지 기다린 뒤 해제 (numpy view는 해제를 막지 않으므로 이후 frame view는 쓰면 안 됨)
+        with self._lock:
+            self.closed = True
+            self._count = self._version = self._frame_seq = self._timestamp = self._n_boxes = None
+            self._boxes = self._frames = []
+            self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
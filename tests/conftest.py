@@ -0,0 +1,6 @@
+# 저장소 루트 모듈(pipeline, tracker 등)과 model/ 스크립트를 import 할 수 있도록 경로 추가
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "model")]
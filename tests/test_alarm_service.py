@@ -0,0 +1,90 @@
+import threading
+import time
+
+from alarm_service import AlarmService
+
+LEVELS = ["high", "low"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakePlay:
+    # 멈출 때까지 계속 재생 중인 소리
+    def __init__(self):
+        self.stopped = threading.Event()
+
+    def is_playing(self):
+        return not self.stopped.is_set()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class FakeSound:
+    def __init__(self):
+        self.plays = []
+
+    def play(self):
+        self.plays.append(FakePlay())
+        return self.plays[-1]
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_camera_and_global_windows():
+    clock = FakeClock()
+    alarms = AlarmService({}, LEVELS, camera_window=10.0, global_window=3.0, clock=clock)
+    assert alarms.trigger(1, "high")
+    alarms._queue.clear()  # 재생 스레드 없이 창만 확인
+
+    clock.now += 2.0
+    assert not alarms.trigger(2, "high")  # 다른 카메라라도 같은 레벨은 3초 안에 한 번
+    assert alarms.trigger(2, "low")  # 레벨이 다르면 별개
+    alarms._queue.clear()
+
+    clock.now += 1.5
+    assert alarms.trigger(2, "high")  # 전체 창(3초)이 지남
+    alarms._queue.clear()
+
+    clock.now += 5.0
+    assert not alarms.trigger(1, "high")  # 카메라 1은 아직 10초가 안 지남 (8.5초)
+    clock.now += 2.0
+    assert alarms.trigger(1, "high")
+    assert alarms.coalesced == 2
+
+
+def test_same_level_already_queued_is_coalesced():
+    clock = FakeClock()
+    alarms = AlarmService({}, LEVELS, camera_window=0.0, global_window=0.0, clock=clock)
+    assert alarms.trigger(1, "low")
+    clock.now += 1.0
+    assert not alarms.trigger(2, "low")
+    assert alarms.pending() == 1
+
+
+def test_higher_level_preempts_lower_level():
+    alarms = AlarmService({}, LEVELS, camera_window=0.0, global_window=0.0, clock=FakeClock())
+    alarms.sounds = {"high": FakeSound(), "low": FakeSound()}
+    alarms.start()
+    try:
+        alarms.trigger(1, "low")
+        wait_until(lambda: len(alarms.sounds["low"].plays) == 1)
+        alarms.trigger(2, "high")
+        wait_until(lambda: len(alarms.sounds["high"].plays) == 1)
+        assert alarms.sounds["low"].plays[0].stopped.is_set()  # 낮은 레벨 재생을 끊음
+        assert not alarms.sounds["high"].plays[0].stopped.is_set()
+    finally:
+        alarms.stop()
+    assert alarms.sounds["high"].plays[0].stopped.is_set()  # stop()은 재생 중인 소리도 멈춤
+    assert alarms.played == 2
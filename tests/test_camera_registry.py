@@ -0,0 +1,58 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from camera_registry import CameraConfig, CameraRegistry, make_router
+
+
+def write_config(path, entries):
+    path.write_text(json.dumps(entries), encoding="utf-8")
+
+
+def read_config(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_add_and_remove_persist_to_config_file(tmp_path):
+    path = tmp_path / "cameras.json"
+    write_config(path, [{"id": 0, "source": "0", "location": "정문"}])
+    # 시작하지 않은 레지스트리: 캡처 스레드 없이 목록과 설정 파일만 다룸
+    registry = CameraRegistry(scheduler=None, encoder=None, path=str(path))
+    assert registry.cameras[0].source == 0 and registry.location(0) == "정문"
+
+    registry.add(CameraConfig.from_dict({"id": 3, "source": "rtsp://cam3/stream", "resolution": [640, 480]}))
+    saved = read_config(path)
+    assert [entry["id"] for entry in saved] == [0, 3]
+    assert saved[1]["source"] == "rtsp://cam3/stream" and saved[1]["resolution"] == [640, 480]
+    with pytest.raises(KeyError):
+        registry.add(CameraConfig(id=3, source=1))
+
+    registry.remove(0)
+    assert [entry["id"] for entry in read_config(path)] == [3]
+    assert 0 not in registry.frame_slots and 0 not in registry.video_broadcasters
+    with pytest.raises(KeyError):
+        registry.remove(0)
+
+    # 다시 불러오면 같은 목록
+    reloaded = CameraRegistry(scheduler=None, encoder=None, path=str(path))
+    assert list(reloaded.cameras.values()) == [registry.cameras[3]]
+
+
+def test_router_validates_and_reports_conflicts(tmp_path):
+    path = tmp_path / "cameras.json"
+    write_config(path, [])
+    registry = CameraRegistry(scheduler=None, encoder=None, path=str(path))
+    app = FastAPI()
+    app.include_router(make_router(registry))
+    client = TestClient(app)
+
+    assert client.post("/cameras", json={"id": 1, "source": "1"}).status_code == 201
+    assert client.post("/cameras", json={"id": 1, "source": "2"}).status_code == 409
+    assert client.post("/cameras", json={"id": 2, "source": "2", "zoom": 2}).status_code == 400
+    assert client.post("/cameras", json={"source": "2"}).status_code == 400
+    assert [camera["id"] for camera in client.get("/cameras").json()] == [1]
+    assert client.delete("/cameras/1").json() == {"removed": 1}
+    assert client.delete("/cameras/1").status_code == 404
+    assert read_config(path) == []
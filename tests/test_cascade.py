@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from cascade import knife_crops, merge_knives
+
+FRAME = np.zeros((100, 200, 3), dtype=np.uint8)  # 축소 프레임 (h=100, w=200)
+FULL = np.zeros((200, 400, 3), dtype=np.uint8)  # 원본 프레임 (2배)
+
+
+class FakeData:
+    # YOLO Results.boxes.data 대역 (.cpu().numpy()만 사용)
+    def __init__(self, rows):
+        self.rows = np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.rows
+
+
+def result(*rows):
+    return SimpleNamespace(boxes=SimpleNamespace(data=FakeData(rows)))
+
+
+def test_padding_is_clamped_at_frame_edges():
+    persons = np.array([[0, 0, 40, 50, 0.9], [180, 60, 200, 100, 0.8]], dtype=np.float32)
+    regions, crops = knife_crops(persons, FRAME, FULL, pad=0.15)
+    # 여백(폭/높이의 15%)을 더한 뒤 원본 좌표로 2배, 프레임 밖은 잘라냄
+    assert regions.tolist() == [[0, 0, 92, 115], [354, 108, 400, 200]]
+    assert [crop.shape[:2] for crop in crops] == [(115, 92), (92, 46)]
+
+
+def test_no_persons_means_no_crops():
+    regions, crops = knife_crops(np.zeros((0, 5), dtype=np.float32), FRAME, FULL)
+    assert regions.shape == (0, 4) and crops == []
+    assert merge_knives(regions, [], FRAME, FULL).shape == (0, 5)
+
+
+def test_merge_maps_crop_boxes_back_to_the_small_frame():
+    persons = np.array([[50, 20, 90, 80, 0.9]], dtype=np.float32)
+    regions, _ = knife_crops(persons, FRAME, FULL, pad=0.0)
+    assert regions.tolist() == [[100, 40, 180, 160]]
+    # 잘라낸 영역 기준 박스 -> 원본 (+100, +40) -> 축소 프레임 (/2)
+    knives = merge_knives(regions, [result([10, 20, 30, 60, 0.7, 0])], FRAME, FULL)
+    assert knives.dtype == np.float32
+    np.testing.assert_allclose(knives, [[55, 30, 65, 50, 0.7]])
+
+
+def test_merge_without_full_frame_keeps_scale():
+    persons = np.array([[50, 20, 90, 80, 0.9], [0, 0, 20, 20, 0.8]], dtype=np.float32)
+    regions, crops = knife_crops(persons, FRAME, pad=0.0)
+    assert [crop.shape[:2] for crop in crops] == [(60, 40), (20, 20)]
+    knives = merge_knives(regions, [result([1, 2, 3, 4, 0.6, 0]), result()], FRAME)
+    np.testing.assert_allclose(knives, [[51, 22, 53, 24, 0.6]])
@@ -0,0 +1,56 @@
+import os
+from types import SimpleNamespace
+
+from clip_recorder import ClipRecorder, read_clip
+
+T0 = 1_700_000_000.0
+
+
+def push(recorder, cam_id, *offsets):
+    for offset in offsets:
+        recorder.push(SimpleNamespace(cam_id=cam_id, captured_at=T0 + offset, jpeg=f"jpeg-{offset}".encode()))
+
+
+def saved_offsets(recorder, name):
+    return [ts - T0 for ts, _ in read_clip(os.path.join(recorder.clip_dir, name))]
+
+
+def test_clip_covers_pre_and_post_roll(tmp_path):
+    recorder = ClipRecorder(str(tmp_path), pre_seconds=2, post_seconds=3)
+    recorder.start()
+    try:
+        push(recorder, 1, 0, 1, 2, 3, 4, 5)
+        push(recorder, 2, 4, 5)  # 다른 카메라 프레임은 섞이지 않음
+        name = recorder.trigger(1, T0 + 5)
+        push(recorder, 1, 6, 7, 8, 9, 10)
+    finally:
+        recorder.stop()
+    # 알림 2초 전 ~ 3초 후 (end 시각 이후의 첫 프레임에서 저장)
+    assert saved_offsets(recorder, name) == [3, 4, 5, 6, 7, 8]
+    assert read_clip(os.path.join(recorder.clip_dir, name))[0][1] == b"jpeg-3"
+    assert recorder.saved == 1
+
+
+def test_trigger_while_recording_extends_post_roll(tmp_path):
+    recorder = ClipRecorder(str(tmp_path), pre_seconds=1, post_seconds=2)
+    recorder.start()
+    try:
+        push(recorder, 1, 0, 1)
+        name = recorder.trigger(1, T0 + 1)
+        push(recorder, 1, 2)
+        assert recorder.trigger(1, T0 + 2) == name  # 새 클립 대신 연장
+        push(recorder, 1, 3, 4, 5)
+    finally:
+        recorder.stop()
+    assert saved_offsets(recorder, name) == [0, 1, 2, 3, 4]
+    assert os.listdir(tmp_path) == [name]
+
+
+def test_stop_saves_clip_in_progress(tmp_path):
+    recorder = ClipRecorder(str(tmp_path), pre_seconds=1, post_seconds=10)
+    recorder.start()
+    push(recorder, 1, 0)
+    name = recorder.trigger(1, T0)
+    push(recorder, 1, 1)
+    recorder.stop()
+    assert saved_offsets(recorder, name) == [0, 1]
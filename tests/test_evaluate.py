@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from evaluate import evaluate, match_all
+
+
+def predictions():
+    # 이미지 한 장, 칼(cls 0) 정답 2개 / 예측 3개: conf 순서로 정답, 오검출, 정답
+    return {
+        "pred_offsets": np.array([0, 3]),
+        "gt_offsets": np.array([0, 2]),
+        "pred_boxes": np.array([[0, 0, 10, 10], [50, 50, 60, 60], [20, 20, 30, 30]], dtype=np.float32),
+        "pred_cls": np.array([0, 0, 0]),
+        "pred_conf": np.array([0.9, 0.8, 0.7], dtype=np.float32),
+        "gt_boxes": np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float32),
+        "gt_cls": np.array([0, 0]),
+    }
+
+
+def test_ap_matches_hand_computed_value():
+    preds = predictions()
+    correct = match_all(preds)
+    assert correct[:, 0].tolist() == [True, False, True]
+
+    result = evaluate(preds, correct, conf=0.5)
+    # recall 0.5까지는 precision 1 (101점 중 51점), 그 뒤 recall 1.0까지는 2/3 (50점)
+    expected = (51 * 1.0 + 50 * 2 / 3) / 101
+    assert result["map50"] == pytest.approx(expected)
+    assert result["map50_95"] == pytest.approx(expected)  # 박스가 정확히 겹쳐 모든 IoU 임계값에서 같음
+    assert result["precision"] == pytest.approx(2 / 3)
+    assert result["recall"] == pytest.approx(1.0)
+    assert result["classes"][0]["fp"] == 1
+
+
+def test_conf_threshold_drops_low_score_predictions():
+    preds = predictions()
+    result = evaluate(preds, match_all(preds), conf=0.85)
+    # 첫 예측만 남음: recall 0.5까지 precision 1 -> 101점 중 51점
+    assert result["map50"] == pytest.approx(51 / 101)
+    assert result["recall"] == pytest.approx(0.5)
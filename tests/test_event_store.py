@@ -0,0 +1,51 @@
+import pytest
+
+from event_store import EventStore, make_router, month_range
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"), flush_interval=0.05)
+    store.start()
+    # 같은 시각의 이벤트가 페이지 경계에 걸치도록 ts를 겹치게 넣음
+    for i, ts in enumerate([100.0, 101.0, 101.0, 101.0, 102.0, 103.0]):
+        store.add(camera=i % 2, location="1층", type="knife", message=str(i), ts=ts)
+    store.stop()  # 큐에 남은 이벤트까지 저장
+    return store
+
+
+def test_keyset_pages_cover_every_event_once(store):
+    pages, cursor = [], None
+    while True:
+        events, cursor = store.query(type="knife", limit=2, cursor=cursor)
+        pages.append([event["message"] for event in events])
+        if cursor is None:
+            break
+    assert pages == [["5", "4"], ["3", "2"], ["1", "0"]]
+
+
+def test_cursor_respects_filters(store):
+    events, cursor = store.query(camera=1, limit=1)
+    assert [event["message"] for event in events] == ["5"]
+    events, cursor = store.query(camera=1, limit=5, cursor=cursor)
+    assert [event["message"] for event in events] == ["3", "1"]
+    assert cursor is None
+
+
+def test_invalid_cursor_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.query(cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        month_range("2025/06")
+
+
+def test_router_turns_bad_input_into_400(store):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.include_router(make_router(store))
+    client = TestClient(app)
+    assert client.get("/events", params={"month": "2025/06"}).status_code == 400
+    assert client.get("/events", params={"cursor": "x"}).status_code == 400
+    assert len(client.get("/events", params={"limit": 2}).json()["events"]) == 2
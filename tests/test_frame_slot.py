@@ -0,0 +1,28 @@
+from queue import Empty
+
+import pytest
+
+from frame_slot import FrameSlot
+
+
+def test_overflow_keeps_newest_and_counts_drops():
+    slot = FrameSlot(depth=2)
+    for i in range(5):
+        slot.put(i)
+    assert slot.qsize() == 2
+    assert slot.get_nowait() == 3
+    assert slot.get_nowait() == 4
+    assert slot.stats() == {"depth": 2, "size": 0, "dropped": 3, "delivered": 2}
+
+
+def test_empty_get_raises():
+    slot = FrameSlot()
+    with pytest.raises(Empty):
+        slot.get_nowait()
+    with pytest.raises(Empty):
+        slot.get(timeout=0.01)
+
+
+def test_depth_must_be_positive():
+    with pytest.raises(ValueError):
+        FrameSlot(0)
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from inference_scheduler import InferenceScheduler
+
+
+class Runner:
+    # 배치마다 받은 항목을 기록하고 항목을 그대로 결과로 돌려줌
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, items):
+        with self.lock:
+            self.batches.append(list(items))
+        return [f"out-{item}" for item in items]
+
+
+@pytest.fixture
+def runner():
+    return Runner()
+
+
+def test_batch_forms_at_max_batch_size(runner):
+    scheduler = InferenceScheduler(runner, max_batch_size=2, max_wait=5.0)
+    for cam_id in (1, 2, 3):
+        scheduler.register(cam_id)
+    futures = [scheduler.submit(1, "a"), scheduler.submit(2, "b")]
+    started = time.monotonic()
+    scheduler.start()
+    try:
+        assert [future.result(timeout=1) for future in futures] == ["out-a", "out-b"]
+        assert time.monotonic() - started < 1.0  # max_wait(5초)까지 기다리지 않음
+        assert runner.batches == [["a", "b"]]
+    finally:
+        scheduler.stop()
+
+
+def test_partial_batch_runs_after_max_wait(runner):
+    scheduler = InferenceScheduler(runner, max_batch_size=4, max_wait=0.1)
+    for cam_id in (1, 2, 3):
+        scheduler.register(cam_id)
+    scheduler.start()
+    try:
+        started = time.monotonic()
+        assert scheduler.infer(1, "a", timeout=1) == "out-a"
+        assert time.monotonic() - started >= 0.09  # 다른 카메라 프레임을 max_wait 동안 기다린 뒤 실행
+        assert runner.batches == [["a"]]
+    finally:
+        scheduler.stop()
+
+
+def test_newer_frame_replaces_pending_frame(runner):
+    scheduler = InferenceScheduler(runner, max_batch_size=4, max_wait=0.01)
+    old = scheduler.submit(1, "old")
+    new = scheduler.submit(1, "new")
+    assert old.cancelled()
+    scheduler.start()
+    try:
+        assert new.result(timeout=1) == "out-new"
+        assert runner.batches == [["new"]]
+    finally:
+        scheduler.stop()
+
+
+def test_unregister_cancels_pending_future(runner):
+    scheduler = InferenceScheduler(runner, max_batch_size=4, max_wait=0.01)
+    future = scheduler.submit(1, "a")
+    scheduler.unregister(1)
+    assert future.cancelled()
+    scheduler.start()
+    scheduler.stop()
+    assert runner.batches == []
+
+
+def test_runner_error_is_set_on_every_future():
+    def failing(items):
+        raise RuntimeError("boom")
+
+    scheduler = InferenceScheduler(failing, max_batch_size=2, max_wait=0.01)
+    futures = [scheduler.submit(1, "a"), scheduler.submit(2, "b")]
+    scheduler.start()
+    try:
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=1)
+    finally:
+        scheduler.stop()
@@ -0,0 +1,57 @@
+import pytest
+
+from load_controller import LoadController
+
+LEVELS = [{}, {"interval": 2}, {"interval": 3, "imgsz": 320}]
+
+
+def make_controller():
+    # smoothing=1.0: 보고한 지연을 그대로 사용
+    controller = LoadController(LEVELS, target=0.5, headroom=0.6, smoothing=1.0)
+    controller.register("low", priority=0)
+    controller.register("high", priority=1)
+    return controller
+
+
+def report(controller, latency):
+    for cam_id in controller.cameras:
+        controller.report(cam_id, latency)
+
+
+def test_degrades_low_priority_first_then_restores_high_priority_first():
+    controller = make_controller()
+    report(controller, 1.0)
+    steps = [controller.step() for _ in range(5)]
+    assert [(e["camera"], e["to"]) for e in steps[:4]] == [("low", 1), ("low", 2), ("high", 1), ("high", 2)]
+    assert steps[4] is None  # 모두 최저 품질
+    assert controller.settings("low") == LEVELS[2]
+
+    report(controller, 0.1)
+    steps = [controller.step() for _ in range(5)]
+    assert [(e["camera"], e["to"]) for e in steps[:4]] == [("high", 1), ("high", 0), ("low", 1), ("low", 0)]
+    assert steps[4] is None
+    assert controller.adjustments == {"degrade": 4, "restore": 4}
+
+
+def test_holds_inside_headroom_band():
+    controller = make_controller()
+    report(controller, 1.0)
+    controller.step()
+    report(controller, 0.4)  # 목표 이하지만 목표 x headroom(0.3)보다 높음
+    assert controller.step() is None
+    assert controller.level("low") == 1
+
+
+def test_unmeasured_cameras_do_not_trigger_changes():
+    controller = make_controller()
+    assert controller.step() is None
+
+
+def test_reports_each_frame_once():
+    controller = make_controller()
+    controller.report("low", 1.0, captured_at=100.0)
+    controller.report("low", 5.0, captured_at=100.0)  # 같은 프레임을 보낸 두 번째 시청자
+    controller.report("low", 5.0, captured_at=99.0)  # 늦게 따라오는 시청자의 이전 프레임
+    assert controller.cameras["low"].latency == 1.0
+    controller.report("low", 0.2, captured_at=100.1)
+    assert controller.cameras["low"].latency == pytest.approx(0.2)
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from model_registry import ModelRegistry
+
+SPECS = {"person": ("yolov8n.pt", {}), "knife": ("knife_v1.pt", {})}
+
+
+class FakeLoader:
+    # specs마다 runner를 만들어 주는 loader, fail에 든 가중치는 로드 실패
+    def __init__(self):
+        self.loaded = []
+        self.closed = []
+        self.fail = set()
+
+    def __call__(self, specs):
+        weights = specs["knife"][0]
+        if weights in self.fail:
+            raise RuntimeError(f"{weights} warm-up 실패")
+        self.loaded.append(weights)
+        return (lambda items: [(weights, item) for item in items]), (lambda: self.closed.append(weights))
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_loads_lazily_on_first_batch():
+    loader = FakeLoader()
+    registry = ModelRegistry(SPECS, loader)
+    assert registry.state == "idle" and loader.loaded == []
+    assert registry(["a"]) == [("knife_v1.pt", "a")]
+    assert registry.state == "ready" and registry.version == 1
+    assert registry.time_to_first_frame is not None
+    registry(["b"])
+    assert loader.loaded == ["knife_v1.pt"]
+
+
+def test_swap_replaces_model_and_closes_old_one():
+    loader = FakeLoader()
+    registry = ModelRegistry(SPECS, loader)
+    registry(["a"])
+    assert registry.swap({"knife": ("knife_v2.pt", {})})
+    assert registry(["a"]) == [("knife_v2.pt", "a")]
+    assert loader.closed == ["knife_v1.pt"]
+    assert registry.version == 2 and registry.previous_specs == SPECS
+    assert registry.swaps == {"ok": 1, "failed": 0}
+
+
+def test_failed_swap_keeps_old_model():
+    loader = FakeLoader()
+    loader.fail.add("broken.pt")
+    registry = ModelRegistry(SPECS, loader)
+    registry(["a"])
+    assert not registry.swap({"knife": ("broken.pt", {})})
+    assert registry(["a"]) == [("knife_v1.pt", "a")]
+    assert registry.state == "ready" and registry.version == 1 and registry.specs == SPECS
+    assert loader.closed == []
+    assert registry.last_swap["ok"] is False and "warm-up 실패" in registry.last_swap["error"]
+
+
+def test_rollback_restores_previous_specs():
+    loader = FakeLoader()
+    registry = ModelRegistry(SPECS, loader)
+    assert not registry.rollback()  # 이전 버전 없음
+    registry(["a"])
+    registry.swap({"knife": ("knife_v2.pt", {})})
+    assert registry.rollback()
+    wait_until(lambda: registry.version == 3)
+    assert registry(["a"]) == [("knife_v1.pt", "a")]
+    assert registry.specs == SPECS
+
+
+def test_batch_on_stale_handle_is_retried_on_new_model():
+    loader = FakeLoader()
+    registry = ModelRegistry(SPECS, loader)
+    registry(["a"])
+
+    def closed_runner(items):
+        # 배치가 이전 모델로 들어간 사이에 교체가 끝나 모델이 닫힘
+        registry.swap({"knife": ("knife_v2.pt", {})})
+        raise RuntimeError("모델이 닫혔습니다.")
+
+    registry._handle = (closed_runner, lambda: None)
+    assert registry(["a"]) == [("knife_v2.pt", "a")]
+
+
+def test_runtime_error_on_current_model_is_raised():
+    registry = ModelRegistry(SPECS, FakeLoader())
+
+    def failing_runner(items):
+        raise RuntimeError("추론 실패")
+
+    registry._handle = (failing_runner, lambda: None)
+    with pytest.raises(RuntimeError, match="추론 실패"):
+        registry(["a"])
@@ -0,0 +1,38 @@
+import numpy as np
+
+from motion_gate import MotionGate, region_mask
+
+W, H = 160, 120
+
+
+def frame_with_square(x, y, value=255):
+    frame = np.zeros((H, W, 3), dtype=np.uint8)
+    frame[y:y + 40, x:x + 40] = value
+    return frame
+
+
+def test_region_mask_uses_relative_coordinates():
+    mask = region_mask([(0.5, 0.0, 1.0, 0.5)], (8, 6))
+    assert mask[:3, 4:].all() and mask.sum() == 12
+    assert region_mask(None, (8, 6)) is None
+
+
+def test_change_inside_region_trips_the_gate():
+    gate = MotionGate(threshold=0.05, keyframe_interval=100, size=(W // 2, H // 2), regions=[(0.5, 0.0, 1.0, 1.0)])
+    assert gate.check(np.zeros((H, W, 3), dtype=np.uint8))  # 첫 프레임은 항상 추론
+    assert not gate.check(frame_with_square(10, 40))  # 감시 영역(오른쪽 절반) 밖의 변화는 무시
+    assert gate.last_motion == 0.0
+    assert gate.check(frame_with_square(110, 40))  # 영역 안의 변화
+    assert gate.last_motion >= 0.05
+    assert gate.stats()["skipped"] == 1
+
+
+def test_without_regions_any_change_counts_and_keyframe_forces_inference():
+    gate = MotionGate(threshold=0.05, keyframe_interval=3, size=(W // 2, H // 2))
+    still = np.zeros((H, W, 3), dtype=np.uint8)
+    assert gate.check(still)
+    assert gate.check(frame_with_square(10, 40))
+    reference = frame_with_square(10, 40)
+    assert not gate.check(reference)  # 마지막으로 추론한 프레임과 같음
+    gate.tick()  # 추론 차례가 아닌 프레임도 keyframe 간격에 포함
+    assert gate.check(reference)  # 3프레임째: 움직임이 없어도 keyframe으로 추론
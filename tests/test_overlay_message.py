@@ -0,0 +1,23 @@
+import json
+
+import numpy as np
+
+from detections import empty_boxes
+from pipeline import overlay_message
+
+FRAME = np.zeros((240, 320, 3), dtype=np.uint8)
+
+
+def test_boxes_are_integer_xyxy_with_class():
+    persons = np.array([[10.4, 20.6, 100.2, 200.9, 0.9]], dtype=np.float32)
+    knives = np.array([[50, 60, 70, 80, 0.8], [1, 2, 3, 4, 0.7]], dtype=np.float32)
+    message = overlay_message(7, FRAME, persons, knives)
+    assert " " not in message  # 프레임마다 보내므로 공백 없이
+    # annotate()와 같이 소수점은 버림, 사람 먼저 (cls 0) 다음 칼 (cls 1)
+    assert json.loads(message) == {"seq": 7, "w": 320, "h": 240,
+                                   "boxes": [[10, 20, 100, 200, 0], [50, 60, 70, 80, 1], [1, 2, 3, 4, 1]]}
+
+
+def test_no_detections_gives_empty_box_list():
+    assert json.loads(overlay_message(1, FRAME, empty_boxes(), empty_boxes())) == {
+        "seq": 1, "w": 320, "h": 240, "boxes": []}
@@ -0,0 +1,71 @@
+import os
+
+import cv2
+import numpy as np
+
+from pack_dataset import PackedDataset, hamming, pack, phash, similar_pairs
+
+
+def gradient(seed: int):
+    # 부드러운 32x32 흑백 이미지 (seed마다 다른 무늬)
+    rng = np.random.default_rng(seed)
+    small = rng.uniform(0, 255, (4, 4)).astype(np.float32)
+    return cv2.resize(small, (32, 32), interpolation=cv2.INTER_CUBIC)
+
+
+def test_phash_is_stable_under_small_changes():
+    base = gradient(0)
+    hashes = phash(np.stack([base, base * 0.9 + 10, gradient(1)]))
+    distance = hamming(hashes, hashes)
+    assert distance[0, 0] == 0
+    assert distance[0, 1] <= 4  # 밝기/대비만 바뀐 이미지
+    assert distance[0, 2] > 10  # 다른 이미지
+
+
+def test_hamming_counts_differing_bits():
+    a = np.array([0, 0xFF], dtype=np.uint64)
+    b = np.array([0, 1, 0xFFFFFFFFFFFFFFFF], dtype=np.uint64)
+    assert hamming(a, b).tolist() == [[0, 1, 64], [8, 7, 56]]
+
+
+def test_similar_pairs_threshold_is_inclusive():
+    hashes = np.array([0b0000, 0b0011, 0b1111, 0b0001], dtype=np.uint64)
+    assert similar_pairs(hashes, hashes, threshold=1, same=True) == [(0, 3, 1), (1, 3, 1)]
+    assert similar_pairs(hashes, hashes, threshold=2, same=True) == [(0, 1, 2), (0, 3, 1), (1, 2, 2), (1, 3, 1)]
+    # same=False: 모든 (i, j) 쌍, chunk 경계와 무관
+    assert similar_pairs(hashes[:1], hashes, threshold=0, chunk=1) == [(0, 0, 0)]
+    assert similar_pairs(hashes, hashes[2:], threshold=2, chunk=3) == [(0, 1, 1), (1, 0, 2), (1, 1, 1), (2, 0, 0), (3, 1, 0)]
+
+
+def write_sample(split_dir, name, color, labels="0 0.5 0.5 0.2 0.4\n"):
+    os.makedirs(os.path.join(split_dir, "images"), exist_ok=True)
+    os.makedirs(os.path.join(split_dir, "labels"), exist_ok=True)
+    cv2.imwrite(os.path.join(split_dir, "images", name + ".png"), np.full((20, 40, 3), color, dtype=np.uint8))
+    with open(os.path.join(split_dir, "labels", name + ".txt"), "w") as f:
+        f.write(labels)
+
+
+def test_pack_reuses_unchanged_images(tmp_path):
+    split_dir, out_dir = str(tmp_path / "train"), str(tmp_path / "cache")
+    write_sample(split_dir, "a", 10)
+    write_sample(split_dir, "b", 20, labels="")
+    assert pack(split_dir, out_dir, imgsz=32, workers=1) == {"images": 2, "decoded": 2, "reused": 0}
+    assert pack(split_dir, out_dir, imgsz=32, workers=1) == {"images": 2, "decoded": 0, "reused": 2}
+
+    write_sample(split_dir, "c", 30)
+    assert pack(split_dir, out_dir, imgsz=32, workers=1) == {"images": 3, "decoded": 1, "reused": 2}
+    dataset = PackedDataset(out_dir)
+    try:
+        assert len(dataset) == 3 and dataset.images.shape == (3, 32, 32, 3)
+        image, labels = dataset[0]
+        # 40x20 -> 32x16으로 줄이고 위아래 8픽셀씩 채움: 세로 좌표/높이가 절반으로
+        assert image[16, 16].tolist() == [10, 10, 10] and image[0, 0].tolist() == [114, 114, 114]
+        np.testing.assert_allclose(labels, [[0, 0.5, 0.5, 0.2, 0.2]], atol=1e-6)
+        assert len(dataset.labels_of(1)) == 0
+        assert dataset[2][0][16, 16].tolist() == [30, 30, 30]
+        assert dataset.shapes.tolist() == [[20, 40]] * 3
+    finally:
+        dataset.close()
+
+    # imgsz가 바뀌면 전부 다시 디코딩
+    assert pack(split_dir, out_dir, imgsz=64, workers=1) == {"images": 3, "decoded": 3, "reused": 0}
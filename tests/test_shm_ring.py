@@ -0,0 +1,72 @@
+import threading
+
+import numpy as np
+import pytest
+
+from shm_ring import FrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing.create((4, 6, 3), slots=2)
+    yield ring
+    ring.unlink()
+    ring.close()
+
+
+def frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_read_returns_written_frame(ring):
+    slot = ring.write(frame(7), frame_seq=1, timestamp=12.5, boxes=[[1, 2, 3, 4, 0.9, 1]])
+    view = ring.read(slot)
+    assert view.frame_seq == 1 and view.timestamp == 12.5
+    assert (view.frame == 7).all()
+    np.testing.assert_allclose(view.boxes, [[1, 2, 3, 4, 0.9, 1]])
+    assert view.valid()
+
+
+def test_read_rejects_slot_being_written(ring):
+    slot = ring.write(frame(1), 1, 0.0)
+    ring._version[slot] += 1  # 생산자가 쓰는 중 (버전 홀수)
+    assert ring.read(slot, retries=3) is None
+    ring._version[slot] += 1
+    assert ring.read(slot) is not None
+
+
+def test_overwritten_view_is_invalid(ring):
+    slot = ring.write(frame(1), 1, 0.0)
+    view = ring.read(slot)
+    version = ring.version(slot)
+    for seq in (2, 3):  # 링이 한 바퀴 돌아 같은 슬롯을 덮어씀
+        ring.write(frame(seq), seq, 0.0)
+    assert not view.valid()
+    assert ring.version(slot) != version
+
+
+def test_closed_ring_reads_nothing():
+    ring = FrameRing.create((4, 6, 3), slots=2)
+    ring.write(frame(1), 1, 0.0)
+    ring.unlink()
+    ring.close()
+    assert ring.closed
+    assert ring.latest() is None
+
+
+
+def test_close_while_view_is_held():
+    ring = FrameRing.create((4, 6, 3), slots=2)
+    ring.write(frame(1), 1, 0.0)
+    ring.unlink()
+    closer = threading.Thread(target=ring.close)
+    with ring.reading():
+        view = ring.latest()
+        closer.start()
+        closer.join(0.1)
+        assert closer.is_alive()  # 읽는 중에는 close()가 기다림
+        assert (view.frame == 1).all() and view.valid()
+    closer.join(1)
+    assert ring.closed
+    assert not view.valid()  # 닫힌 링의 view는 TypeError 없이 무효
+    assert ring.read(view.slot) is None and ring.latest() is None
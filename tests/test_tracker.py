@@ -0,0 +1,46 @@
+import numpy as np
+
+from tracker import Tracker
+
+BOX = [10, 10, 50, 90]
+
+
+def dets(*scores):
+    return np.array([BOX + [score] for score in scores], dtype=np.float32).reshape(-1, 5)
+
+
+def test_confirmed_after_k_of_m_hits():
+    tracker = Tracker(high_thresh=0.7, low_thresh=0.1, confirm_k=3, confirm_m=5)
+    tracker.update(dets(0.9))
+    assert not tracker.new_confirmed()
+    tracker.update(dets())  # 놓친 추론
+    tracker.update(dets(0.9))
+    assert not tracker.new_confirmed()
+    tracker.update(dets(0.9))  # 최근 4번 중 3번
+    confirmed = tracker.new_confirmed()
+    assert len(confirmed) == 1
+    tracker.update(dets(0.9))
+    assert not tracker.new_confirmed()  # 같은 트랙은 한 번만 알림
+
+
+def test_hits_outside_window_do_not_count():
+    tracker = Tracker(high_thresh=0.7, low_thresh=0.1, max_age=10, confirm_k=2, confirm_m=3)
+    tracker.update(dets(0.9))
+    tracker.update(dets())
+    tracker.update(dets())
+    tracker.update(dets(0.9))  # 최근 3번: 놓침, 놓침, 검출
+    assert not tracker.new_confirmed()
+    assert len(tracker.tracks) == 1
+
+
+def test_low_score_only_extends_existing_tracks():
+    tracker = Tracker(high_thresh=0.7, low_thresh=0.1, confirm_k=3, confirm_m=5)
+    tracker.update(dets(0.3))
+    assert not tracker.tracks  # 낮은 점수만으로는 새 트랙을 만들지 않음
+    tracker.update(dets(0.9))
+    tracker.update(dets(0.3))
+    tracker.update(dets(0.2))
+    assert len(tracker.tracks) == 1
+    assert tracker.tracks[0].hits() == 3
+    boxes, ids = tracker.boxes()
+    assert boxes.shape == (1, 5) and len(ids) == 1
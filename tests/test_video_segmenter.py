@@ -0,0 +1,47 @@
+import io
+import struct
+
+from video_segmenter import codec_string, read_boxes
+
+
+def box(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(body), kind) + body
+
+
+def large_box(kind: bytes, body: bytes) -> bytes:
+    # size == 1이면 뒤에 64비트 크기
+    return struct.pack(">I4sQ", 1, kind, 16 + len(body)) + body
+
+
+# avcC: configurationVersion(1), profile(0x42 baseline), compatibility(0xc0), level(0x1f 3.1), 나머지는 생략
+AVCC = box(b"avcC", bytes([1, 0x42, 0xC0, 0x1F, 0xFF, 0xE1]))
+INIT = box(b"ftyp", b"isom\x00\x00\x02\x00isomiso6") + box(
+    b"moov", box(b"trak", box(b"mdia", box(b"minf", box(b"stbl", box(b"stsd", box(b"avc1", AVCC)))))))
+
+
+def test_codec_string_from_init_segment():
+    assert codec_string(INIT) == "avc1.42c01f"
+
+
+def test_codec_string_defaults_without_avcc():
+    assert codec_string(box(b"ftyp", b"isom")) == "avc1.42e01f"
+
+
+def test_read_boxes_splits_top_level_boxes():
+    fragment = box(b"moof", b"\x00" * 12) + large_box(b"mdat", b"frame-data")
+    boxes = list(read_boxes(io.BytesIO(INIT + fragment)))
+    assert [kind for kind, _ in boxes] == [b"ftyp", b"moov", b"moof", b"mdat"]
+    assert b"".join(data for _, data in boxes) == INIT + fragment
+    assert boxes[3][1].endswith(b"frame-data")
+
+
+def test_read_boxes_stops_at_truncated_box():
+    data = INIT + box(b"moof", b"\x00" * 12)
+    boxes = list(read_boxes(io.BytesIO(data[:-4])))  # ffmpeg가 조각을 쓰다가 종료
+    assert [kind for kind, _ in boxes] == [b"ftyp", b"moov"]
+    assert list(read_boxes(io.BytesIO(b"\x00\x00"))) == []
+
+
+def test_read_boxes_stops_at_invalid_size():
+    boxes = list(read_boxes(io.BytesIO(INIT + struct.pack(">I4s", 0, b"mdat") + b"rest")))
+    assert [kind for kind, _ in boxes] == [b"ftyp", b"moov"]
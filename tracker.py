@@ -0,0 +1,172 @@
+# IoU + Kalman 필터 기반 다중 객체 추적기 (ByteTrack 방식)
+# - 추론한 프레임: 높은 점수 검출 -> 낮은 점수 검출 순서로 기존 트랙과 IoU 매칭
+# - 추론하지 않은 프레임: Kalman 예측으로 박스를 이어서 표시
+# - 칼 알림은 트랙이 최근 M번의 추론 중 K번 이상 검출됐을 때만 발생 (한 프레임 오검출 방지)
+import itertools
+from collections import deque
+
+import numpy as np
+
+
+def xyxy_to_xyah(box):
+    x1, y1, x2, y2 = box[:4]
+    w, h = x2 - x1, y2 - y1
+    return np.array([x1 + w / 2, y1 + h / 2, w / max(h, 1e-6), h], dtype=np.float64)
+
+
+def xyah_to_xyxy(xyah):
+    cx, cy, a, h = xyah[:4]
+    w = a * h
+    return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], dtype=np.float32)
+
+
+def iou_matrix(a, b):
+    # a: (N, 4), b: (M, 4) -> (N, M)
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-6)
+
+
+def greedy_match(iou, threshold):
+    # IoU가 큰 쌍부터 매칭 -> (매칭 쌍, 남은 행, 남은 열)
+    pairs = []
+    if iou.size:
+        rows, cols = np.nonzero(iou >= threshold)
+        order = np.argsort(-iou[rows, cols])
+        used_rows, used_cols = set(), set()
+        for r, c in zip(rows[order], cols[order]):
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            pairs.append((r, c))
+    matched_rows = {r for r, _ in pairs}
+    matched_cols = {c for _, c in pairs}
+    return (pairs,
+            [r for r in range(iou.shape[0]) if r not in matched_rows],
+            [c for c in range(iou.shape[1]) if c not in matched_cols])
+
+
+class KalmanBox:
+    # 상태: [cx, cy, a, h, vx, vy, va, vh], 등속 모델
+    _F = np.eye(8)
+    _F[:4, 4:] = np.eye(4)
+    _H = np.eye(4, 8)
+    std_position = 1 / 20
+    std_velocity = 1 / 160
+
+    def __init__(self, box):
+        z = xyxy_to_xyah(box)
+        self.mean = np.r_[z, np.zeros(4)]
+        h = z[3]
+        std = [2 * self.std_position * h, 2 * self.std_position * h, 1e-2, 2 * self.std_position * h,
+               10 * self.std_velocity * h, 10 * self.std_velocity * h, 1e-5, 10 * self.std_velocity * h]
+        self.covariance = np.diag(np.square(std))
+
+    def predict(self):
+        h = self.mean[3]
+        std = [self.std_position * h, self.std_position * h, 1e-2, self.std_position * h,
+               self.std_velocity * h, self.std_velocity * h, 1e-5, self.std_velocity * h]
+        self.mean = self._F @ self.mean
+        self.covariance = self._F @ self.covariance @ self._F.T + np.diag(np.square(std))
+
+    def update(self, box):
+        h = self.mean[3]
+        std = [self.std_position * h, self.std_position * h, 1e-1, self.std_position * h]
+        S = self._H @ self.covariance @ self._H.T + np.diag(np.square(std))
+        K = self.covariance @ self._H.T @ np.linalg.inv(S)
+        self.mean = self.mean + K @ (xyxy_to_xyah(box) - self._H @ self.mean)
+        self.covariance = (np.eye(8) - K @ self._H) @ self.covariance
+
+    def box(self):
+        return xyah_to_xyxy(self.mean)
+
+
+class Track:
+    _ids = itertools.count(1)
+
+    def __init__(self, det, confirm_window):
+        self.track_id = next(self._ids)
+        self.kf = KalmanBox(det)
+        self.score = float(det[4])
+        self.age = 0  # 마지막 매칭 이후 지난 추론 횟수
+        self.lost = False  # 마지막 추론에서 매칭되지 않음
+        self.history = deque([True], maxlen=confirm_window)  # 추론할 때마다 매칭 여부
+        self.alerted = False
+
+    def hits(self) -> int:
+        return sum(self.history)
+
+
+class Tracker:
+    def __init__(self, high_thresh=0.6, low_thresh=0.1, match_iou=0.3, max_age=30, confirm_k=3, confirm_m=5):
+        self.high_thresh = high_thresh
+        self.low_thresh = low_thresh
+        self.match_iou = match_iou
+        self.max_age = max_age
+        self.confirm_k = confirm_k
+        self.confirm_m = confirm_m
+        self.tracks = []
+
+    def predict(self):
+        # 추론하지 않은 프레임: 박스만 한 프레임 앞으로 이동
+        for track in self.tracks:
+            track.kf.predict()
+
+    def update(self, dets):
+        # 추론한 프레임: dets (N, 5) [x1, y1, x2, y2, conf]
+        for track in self.tracks:
+            track.kf.predict()
+            track.age += 1
+
+        high = dets[dets[:, 4] >= self.high_thresh]
+        low = dets[(dets[:, 4] >= self.low_thresh) & (dets[:, 4] < self.high_thresh)]
+
+        # 1단계: 높은 점수 검출과 모든 트랙 매칭
+        track_boxes = np.array([t.kf.box() for t in self.tracks]).reshape(-1, 4)
+        pairs, rest_tracks, rest_high = greedy_match(iou_matrix(track_boxes, high[:, :4]), self.match_iou)
+        for t, d in pairs:
+            self._matched(self.tracks[t], high[d])
+
+        # 2단계: 낮은 점수 검출은 남은 트랙을 이어주는 데만 사용
+        remaining = [self.tracks[t] for t in rest_tracks]
+        remaining_boxes = np.array([t.kf.box() for t in remaining]).reshape(-1, 4)
+        pairs, rest, _ = greedy_match(iou_matrix(remaining_boxes, low[:, :4]), self.match_iou)
+        for t, d in pairs:
+            self._matched(remaining[t], low[d])
+        for t in rest:
+            remaining[t].lost = True
+            remaining[t].history.append(False)
+
+        # 매칭되지 않은 높은 점수 검출은 새 트랙
+        for d in rest_high:
+            self.tracks.append(Track(high[d], self.confirm_m))
+
+        self.tracks = [t for t in self.tracks if t.age <= self.max_age]
+
+    def _matched(self, track, det):
+        track.kf.update(det)
+        track.score = float(det[4])
+        track.age = 0
+        track.lost = False
+        track.history.append(True)
+
+    def boxes(self):
+        # 화면에 표시할 트랙: (N, 5) [x1, y1, x2, y2, score], (N,) track id
+        active = [t for t in self.tracks if not t.lost]
+        boxes = np.array([np.r_[t.kf.box(), t.score] for t in active], dtype=np.float32).reshape(-1, 5)
+        return boxes, np.array([t.track_id for t in active], dtype=np.int64)
+
+    def new_confirmed(self):
+        # 최근 M번의 추론 중 K번 이상 검출되어 처음으로 확정된 트랙
+        confirmed = [t for t in self.tracks if not t.alerted and t.hits() >= self.confirm_k]
+        for track in confirmed:
+            track.alerted = True
+        return confirmed
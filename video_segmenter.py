@@ -0,0 +1,241 @@
+# 카메라별 H.264 fragmented MP4 조각 스트리밍 (JPEG 웹소켓 대신 쓰는 영상 모드, config.STREAM_MODE = "video")
+# - 박스를 그린 프레임을 카메라당 ffmpeg 프로세스 하나에 raw BGR로 넣고, 짧은 fMP4 조각(moof + mdat)을 받아옴
+#   조각마다 키프레임으로 시작하므로 중간에 접속한 시청자도 init 세그먼트 + 최신 조각부터 바로 재생
+# - 조각은 카메라당 한 번만 인코딩하고, Broadcaster로 같은 bytes를 모든 시청자에게 전달
+#   (브라우저는 Media Source Extensions로 재생, GET /video/segments/{cam_id} 웹소켓)
+# - on_segment(VideoSegment) 콜백으로 같은 조각을 클립 녹화에 그대로 사용 (clip_recorder.push_segment)
+# - 해상도가 바뀌면(재연결 등) ffmpeg를 다시 시작하고 새 init 세그먼트를 보냄
+# ffmpeg는 로컬에 설치된 실행 파일을 사용한다 (config.VIDEO_FFMPEG, -fps_mode 옵션 때문에 5.1 이상).
+import json
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import time
+from typing import NamedTuple
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from broadcaster import Broadcaster
+from frame_slot import FrameSlot
+
+
+class VideoSegment(NamedTuple):
+    cam_id: object
+    seq: int  # 카메라별 조각 번호
+    started_at: float  # 조각을 받은 시각 (클립 구간 계산용)
+    init: bytes  # 이 조각을 재생하는 데 필요한 init 세그먼트 (ftyp + moov), 같은 인코더면 같은 객체
+    codec: str  # MSE addSourceBuffer에 넘길 코덱 문자열 (예: avc1.42c01f)
+    data: bytes  # moof + mdat
+
+
+def read_boxes(stream):
+    # MP4 최상위 box를 하나씩 (종류, 전체 bytes)로 읽음
+    while True:
+        header = stream.read(8)
+        if len(header) < 8:
+            return
+        size, kind = struct.unpack(">I4s", header)
+        if size == 1:
+            large = stream.read(8)
+            size = struct.unpack(">Q", large)[0]
+            header += large
+        if size < len(header):
+            return  # 크기가 0(파일 끝까지)이거나 잘못된 box, 조각 스트림에서는 나오지 않음
+        body = stream.read(size - len(header))
+        if len(body) < size - len(header):
+            return
+        yield kind, header + body
+
+
+def codec_string(init: bytes) -> str:
+    # avcC box의 profile / compatibility / level -> "avc1.PPCCLL"
+    index = init.find(b"avcC")
+    if index < 0:
+        return "avc1.42e01f"
+    return "avc1." + init[index + 5:index + 8].hex()
+
+
+class _CameraEncoder:
+    def __init__(self, segmenter, cam_id):
+        self.segmenter = segmenter
+        self.cam_id = cam_id
+        self.slot = FrameSlot(segmenter.depth)  # 인코딩된 조각 (Broadcaster 입력)
+        self.broadcaster = Broadcaster(self.slot, depth=segmenter.depth)
+        self.frames = queue.Queue(segmenter.queue_size)  # ffmpeg에 넣을 프레임
+        self.dropped = 0  # ffmpeg가 밀려서 버린 프레임 수
+        self.restarts = 0
+        self.segments = 0
+        self.init = None
+        self.codec = None
+        self._process = None
+        self._size = None
+        self._thread = threading.Thread(target=self._loop, name=f"video-{cam_id}", daemon=True)
+        self._thread.start()
+
+    def push(self, frame):
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self.frames.put(None)
+        self._thread.join()
+        self.broadcaster.close()  # 시청 중인 웹소켓에 스트림 끝을 알림
+
+    def _loop(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            size = (frame.shape[1], frame.shape[0])
+            if self._process is None or size != self._size or self._process.poll() is not None:
+                self._restart(size)
+            try:
+                self._process.stdin.write(frame.tobytes())
+            except (BrokenPipeError, ValueError):
+                self._stop_process()  # 다음 프레임에서 다시 시작
+        self._stop_process()
+
+    def _restart(self, size):
+        self._stop_process()
+        if self._size is not None:
+            self.restarts += 1
+        self._size = size
+        self._process = subprocess.Popen(self.segmenter.command(size), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL, bufsize=0)
+        threading.Thread(target=self._read, args=(self._process,), name=f"video-read-{self.cam_id}",
+                         daemon=True).start()
+
+    def _stop_process(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def _read(self, process):
+        # ftyp + moov -> init 세그먼트, moof부터 mdat까지 -> 조각 하나
+        head, fragment, init = [], [], None
+        for kind, box in read_boxes(process.stdout):
+            if init is None:
+                head.append(box)
+                if kind == b"moov":
+                    init = b"".join(head)
+                    self.init, self.codec = init, codec_string(init)
+                continue
+            fragment.append(box)
+            if kind == b"mdat":
+                self.segments += 1
+                segment = VideoSegment(self.cam_id, self.segments, time.time(), init, self.codec, b"".join(fragment))
+                fragment = []
+                self.slot.put(segment)
+                if self.segmenter.on_segment is not None:
+                    self.segmenter.on_segment(segment)
+
+
+class VideoSegmenter:
+    def __init__(self, ffmpeg: str = "ffmpeg", segment_seconds: float = 1.0, crf: int = 28, preset: str = "veryfast",
+                 depth: int = 8, queue_size: int = 30, on_segment=None):
+        # segment_seconds: 조각 길이 (키프레임 간격), 짧을수록 지연이 줄고 용량은 늘어남
+        # depth: 카메라/시청자별로 보관할 최대 조각 수 (느린 시청자는 오래된 조각을 건너뜀)
+        # queue_size: ffmpeg가 밀렸을 때 기다리게 할 최대 프레임 수 (넘으면 버림)
+        # on_segment(VideoSegment): 조각이 나올 때마다 ffmpeg 출력 스레드에서 호출 (클립 녹화 등)
+        self.ffmpeg = ffmpeg
+        self.segment_seconds = segment_seconds
+        self.crf = crf
+        self.preset = preset
+        self.depth = depth
+        self.queue_size = queue_size
+        self.on_segment = on_segment
+        self.cameras = {}  # cam_id -> _CameraEncoder
+        self._lock = threading.Lock()
+
+    def start(self):
+        if shutil.which(self.ffmpeg) is None:
+            raise RuntimeError(f"{self.ffmpeg}를 찾을 수 없습니다. 영상 모드에는 ffmpeg 설치가 필요합니다.")
+
+    def command(self, size):
+        # 입력 시각(wallclock)을 그대로 타임스탬프로 써서 처리 FPS가 바뀌어도 재생 속도 유지
+        return [
+            self.ffmpeg, "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{size[0]}x{size[1]}",
+            "-use_wallclock_as_timestamps", "1", "-i", "pipe:0",
+            "-an", "-c:v", "libx264", "-preset", self.preset, "-tune", "zerolatency", "-crf", str(self.crf),
+            "-profile:v", "baseline", "-pix_fmt", "yuv420p", "-fps_mode", "passthrough",
+            "-force_key_frames", f"expr:gte(t,n_forced*{self.segment_seconds})",
+            "-movflags", "frag_keyframe+empty_moov+default_base_moof", "-f", "mp4", "pipe:1",
+        ]
+
+    def add(self, cam_id):
+        with self._lock:
+            if cam_id not in self.cameras:
+                self.cameras[cam_id] = _CameraEncoder(self, cam_id)
+
+    def remove(self, cam_id):
+        with self._lock:
+            encoder = self.cameras.pop(cam_id, None)
+        if encoder is not None:
+            encoder.close()
+
+    def stop(self):
+        with self._lock:
+            encoders, self.cameras = list(self.cameras.values()), {}
+        for encoder in encoders:
+            encoder.close()
+
+    def push(self, cam_id, seq, captured_at, frame):
+        # AnnotateEncoder의 on_frame 콜백 (박스를 그린 프레임), 인코딩 스레드에서 호출
+        encoder = self.cameras.get(cam_id)
+        if encoder is not None:
+            encoder.push(frame)
+
+    def broadcaster(self, cam_id):
+        encoder = self.cameras.get(cam_id)
+        return encoder.broadcaster if encoder is not None else None
+
+
+def make_router(segmenter: VideoSegmenter, on_sent=None) -> APIRouter:
+    # on_sent(cam_id, 바이트 수): 시청자에게 보낸 양 기록 (모드별 초당 전송량 비교)
+    router = APIRouter()
+
+    @router.websocket("/video/segments/{cam_id}")
+    async def segment_stream(websocket: WebSocket, cam_id: int):
+        await websocket.accept()
+        broadcaster = segmenter.broadcaster(cam_id)
+        if broadcaster is None:
+            await websocket.close(code=1008)
+            return
+        subscriber = broadcaster.subscribe()
+        init = None
+        try:
+            while True:
+                segment = await subscriber.get()
+                if segment is None:
+                    await websocket.close()  # 카메라 삭제
+                    break
+                sent = len(segment.data)
+                if segment.init is not init:
+                    # 처음이거나 ffmpeg가 다시 시작됨: 코덱 JSON -> init 세그먼트를 먼저 보냄 (브라우저가 MediaSource를 새로 만듦)
+                    init = segment.init
+                    await websocket.send_text(json.dumps({"codec": segment.codec}))
+                    await websocket.send_bytes(init)
+                    sent += len(init)
+                await websocket.send_bytes(segment.data)
+                if on_sent is not None:
+                    on_sent(cam_id, sent)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return router